@@ -1,25 +1,59 @@
 import bpy
 
-from bpy.types import PropertyGroup, AddonPreferences, Scene
-from bpy.props import StringProperty, BoolProperty, CollectionProperty, IntProperty
+from bpy.types import PropertyGroup, AddonPreferences, Scene, Object, Collection, Text
+from bpy.props import StringProperty, BoolProperty, CollectionProperty, IntProperty, EnumProperty, FloatProperty, PointerProperty
 
 from .default_sets import default_sets
-from .op import SHAPEKEY_SETS_OT_reset, SHAPEKEY_SETS_OT_add
-from .ui import (
+from .op import (
+    SHAPEKEY_SETS_OT_reset,
+    SHAPEKEY_SETS_OT_share_sets,
+    SHAPEKEY_SETS_OT_unshare_sets,
+    SHAPEKEY_SETS_OT_override_set,
+    SHAPEKEY_SETS_OT_add,
+    SHAPEKEY_SETS_OT_add_modal,
+    SHAPEKEY_SETS_OT_sync,
+    SHAPEKEY_SETS_OT_audit,
+    SHAPEKEY_SETS_OT_wire_drivers,
+    SHAPEKEY_SETS_OT_snapshot_save,
+    SHAPEKEY_SETS_OT_snapshot_restore,
+    SHAPEKEY_SETS_OT_auto_apply,
+    SHAPEKEY_SETS_OT_pose_store,
+    SHAPEKEY_SETS_OT_pose_apply,
+    SHAPEKEY_SETS_OT_library_apply,
+    SHAPEKEY_SETS_OT_library_import,
+    SHAPEKEY_SETS_OT_library_save,
+    SHAPEKEY_SETS_OT_library_refresh,
+    SHAPEKEY_SETS_OT_import_keys,
+    SHAPEKEY_SETS_OT_export_keys,
+    SHAPEKEY_SETS_OT_import_sets,
+    SHAPEKEY_SETS_OT_export_sets,
+    SHAPEKEY_SETS_OT_import_capture,
     SHAPEKEY_SETS_OT_base_list_actions,
     SHAPEKEY_SETS_OT_data_set_list_actions,
     SHAPEKEY_SETS_OT_data_key_list_actions,
-    SHAPEKEY_SETS_MT_data_set_list_context_menu,
-    SHAPEKEY_SETS_MT_data_key_list_context_menu,
     SHAPEKEY_SETS_OT_prefs_set_list_actions,
     SHAPEKEY_SETS_OT_prefs_key_list_actions,
-    SHAPEKEY_SETS_MT_prefs_set_list_context_menu,
-    SHAPEKEY_SETS_MT_prefs_key_list_context_menu,
-    SHAPEKEY_SETS_UL_set_list_items,
-    SHAPEKEY_SETS_UL_key_list_items,
-    SHAPEKEY_SETS_PT_base_ui,
-    SHAPEKEY_SETS_PT_data_ui
+    SHAPEKEY_SETS_OT_data_include_list_actions,
+    SHAPEKEY_SETS_OT_prefs_include_list_actions,
+    SHAPEKEY_SETS_OT_data_pose_list_actions,
+    SHAPEKEY_SETS_OT_data_rule_list_actions,
+    SHAPEKEY_SETS_OT_base_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_data_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_prefs_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_clear_timings,
+    library_set_items,
+    refresh_library
 )
+from .audit import audit_depsgraph_update, clear_audits, rebind_audits
+from .autoapply import auto_apply_depsgraph_update, auto_apply_load, reseed_seen, seed_seen
+from .compose import clear_resolved, invalidate_owner, invalidate_resolved
+from .drivers import DEFAULT_DRIVER_PATH
+from .listfilter import clear_filters, note_key_updates
+from .mirror import DEFAULT_MIRROR_RULES, clear_symmetry_maps
+from .scope import scope_items
+from .storage import clear_views
+from .transfer import transfer_mode_items, clear_mappings
+from .util import clear_pending_scenes
 
 bl_info = {
     "name": "Shapekey Sets",
@@ -39,22 +73,84 @@ bl_info = {
 
 
 class Shapekey(PropertyGroup):
+    name: StringProperty(update=invalidate_owner)
+    enabled: BoolProperty(default=True, update=invalidate_owner)
+    exclude: BoolProperty(
+        name="Exclude", update=invalidate_owner,
+        description="Leave this key out of the set, including when it comes from an included set")
+    aliases: StringProperty(
+        name="Aliases", update=invalidate_resolved,
+        description="Comma separated other names of this key, existing keys with one of them count as this key")
+
+
+class SetInclude(PropertyGroup):
+    name: StringProperty(
+        name="Set", update=invalidate_owner,
+        description="Shapekey Set whose keys come before this set's own keys")
+
+
+class PoseValue(PropertyGroup):
     name: StringProperty()
+    value: FloatProperty()
+
+
+class PosePreset(PropertyGroup):
+    name: StringProperty(update=invalidate_owner)
+    values: CollectionProperty(type=PoseValue)
+
+
+class AutoApplyRule(PropertyGroup):
+    name: StringProperty(
+        name="Set", description="Shapekey Set applied to the objects this rule covers")
     enabled: BoolProperty(default=True)
+    collection: PointerProperty(
+        name="Collection", type=Collection,
+        description="Apply to objects in this collection and its children")
+    pattern: StringProperty(
+        name="Name Pattern",
+        description="Apply to objects whose name matches this pattern, like Head* or *_face")
 
 
 class ShapekeySet(PropertyGroup):
-    name: StringProperty()
+    name: StringProperty(update=invalidate_resolved)
     shapekeys: CollectionProperty(type=Shapekey)
     active_shapekey_index: IntProperty()
+    includes: CollectionProperty(type=SetInclude)
+    active_include_index: IntProperty()
+    poses: CollectionProperty(type=PosePreset)
+    active_pose_index: IntProperty()
 
 
-class ShapekeySetsPreferences(AddonPreferences, SHAPEKEY_SETS_PT_base_ui):
+class ShapekeySetsPreferences(AddonPreferences):
     bl_idname = __package__
 
     shapekey_sets: CollectionProperty(type=ShapekeySet)
     active_shapekey_set_index: IntProperty()
     is_initialized: BoolProperty(default=False)
+    mirror_rules: StringProperty(
+        name="Mirror Naming", default=DEFAULT_MIRROR_RULES,
+        description="Comma separated pairs of Left/Right name endings, used to mirror keys")
+    alias_fold_case: BoolProperty(
+        name="Ignore Case", default=True,
+        description="Match existing keys whose names only differ in case")
+    alias_strip_separators: BoolProperty(
+        name="Ignore Separators", default=True,
+        description="Match existing keys whose names only differ in spaces, underscores, dots and dashes")
+    alias_canonical_sides: BoolProperty(
+        name="Match Side Suffixes", default=True,
+        description="Match existing keys that name their side with another Mirror Naming suffix")
+    library_path: StringProperty(
+        name="Set Library",
+        description="Directory of Shapekey Set JSON files, listed in the Library panel",
+        subtype='DIR_PATH', update=lambda self, context: refresh_library())
+    use_instrumentation: BoolProperty(
+        name="Record Timings",
+        description="Report what each operator did and how long it took, and list recent timings in a debug panel",
+        default=False)
+    instrumentation_log: StringProperty(
+        name="Timing Log",
+        description="Optional JSON lines file every timing is appended to",
+        subtype='FILE_PATH')
 
     def register_default_sets(self):
         shapekey_set_prefs = self.shapekey_sets
@@ -69,11 +165,33 @@ class ShapekeySetsPreferences(AddonPreferences, SHAPEKEY_SETS_PT_base_ui):
                 item.name = name
 
     def draw(self, context):
+        # ui.py is imported on demand, like in register_ui()
+        from .ui import (SHAPEKEY_SETS_PT_base_ui, SHAPEKEY_SETS_MT_prefs_set_list_context_menu,
+                         SHAPEKEY_SETS_MT_prefs_key_list_context_menu)
+
         layout = self.layout
         layout.label(
             text="Here you can set the default Shapekey Sets that load into new projects.")
-        self._draw(context, self, SHAPEKEY_SETS_OT_prefs_set_list_actions, SHAPEKEY_SETS_MT_prefs_set_list_context_menu,
-                   SHAPEKEY_SETS_OT_prefs_key_list_actions, SHAPEKEY_SETS_MT_prefs_key_list_context_menu)
+        SHAPEKEY_SETS_PT_base_ui._draw(self, context, self, SHAPEKEY_SETS_OT_prefs_set_list_actions,
+                                       SHAPEKEY_SETS_MT_prefs_set_list_context_menu,
+                                       SHAPEKEY_SETS_OT_prefs_key_list_actions,
+                                       SHAPEKEY_SETS_MT_prefs_key_list_context_menu,
+                                       SHAPEKEY_SETS_OT_prefs_include_list_actions)
+
+        layout.prop(self, "mirror_rules")
+        row = layout.row()
+        row.label(text="Similar Names:")
+        row.prop(self, "alias_fold_case")
+        row.prop(self, "alias_strip_separators")
+        row.prop(self, "alias_canonical_sides")
+        layout.prop(self, "library_path")
+
+        col = layout.box().column()
+        col.label(text="Debug", icon='TIME')
+        col.prop(self, "use_instrumentation")
+        row = col.row()
+        row.active = self.use_instrumentation
+        row.prop(self, "instrumentation_log")
 
 
 # -----------------------------------------------------------------------------
@@ -83,22 +201,96 @@ class ShapekeySetsPreferences(AddonPreferences, SHAPEKEY_SETS_PT_base_ui):
 
 classes = (
     Shapekey,
+    SetInclude,
+    PoseValue,
+    PosePreset,
+    AutoApplyRule,
     ShapekeySet,
     ShapekeySetsPreferences,
     SHAPEKEY_SETS_OT_reset,
+    SHAPEKEY_SETS_OT_share_sets,
+    SHAPEKEY_SETS_OT_unshare_sets,
+    SHAPEKEY_SETS_OT_override_set,
     SHAPEKEY_SETS_OT_add,
+    SHAPEKEY_SETS_OT_add_modal,
+    SHAPEKEY_SETS_OT_sync,
+    SHAPEKEY_SETS_OT_audit,
+    SHAPEKEY_SETS_OT_wire_drivers,
+    SHAPEKEY_SETS_OT_snapshot_save,
+    SHAPEKEY_SETS_OT_snapshot_restore,
+    SHAPEKEY_SETS_OT_auto_apply,
+    SHAPEKEY_SETS_OT_pose_store,
+    SHAPEKEY_SETS_OT_pose_apply,
+    SHAPEKEY_SETS_OT_library_apply,
+    SHAPEKEY_SETS_OT_library_import,
+    SHAPEKEY_SETS_OT_library_save,
+    SHAPEKEY_SETS_OT_library_refresh,
+    SHAPEKEY_SETS_OT_import_keys,
+    SHAPEKEY_SETS_OT_export_keys,
+    SHAPEKEY_SETS_OT_import_sets,
+    SHAPEKEY_SETS_OT_export_sets,
+    SHAPEKEY_SETS_OT_import_capture,
     SHAPEKEY_SETS_OT_base_list_actions,
     SHAPEKEY_SETS_OT_data_set_list_actions,
     SHAPEKEY_SETS_OT_data_key_list_actions,
-    SHAPEKEY_SETS_MT_data_set_list_context_menu,
-    SHAPEKEY_SETS_MT_data_key_list_context_menu,
     SHAPEKEY_SETS_OT_prefs_set_list_actions,
     SHAPEKEY_SETS_OT_prefs_key_list_actions,
-    SHAPEKEY_SETS_MT_prefs_set_list_context_menu,
-    SHAPEKEY_SETS_MT_prefs_key_list_context_menu,
-    SHAPEKEY_SETS_UL_set_list_items,
-    SHAPEKEY_SETS_UL_key_list_items,
-    SHAPEKEY_SETS_PT_data_ui,
+    SHAPEKEY_SETS_OT_data_include_list_actions,
+    SHAPEKEY_SETS_OT_prefs_include_list_actions,
+    SHAPEKEY_SETS_OT_data_pose_list_actions,
+    SHAPEKEY_SETS_OT_data_rule_list_actions,
+    SHAPEKEY_SETS_OT_base_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_data_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_prefs_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_clear_timings,
+)
+
+
+# UI classes currently registered, by register_ui()
+_registered_ui = []
+
+
+def register_ui():
+    """
+    Import ui.py and register its menus, lists and panels. Runs from a timer
+    once Blender is idle, so enabling the addon, and starting Blender with
+    it, only pays for the data types and operators. Operators, including the
+    list actions, are always registered right away so scripts can call them
+    in background mode too. The timer is persistent, so loading a file
+    before it runs doesn't drop it. Background mode draws nothing and never
+    imports the UI.
+    """
+    if not _registered_ui:
+        from . import ui
+
+        for cls in ui.classes:
+            bpy.utils.register_class(cls)
+            _registered_ui.append(cls)
+    return None
+
+
+handlers = (
+    ("load_post", clear_mappings),
+    ("load_post", clear_symmetry_maps),
+    ("load_post", clear_audits),
+    ("load_post", clear_resolved),
+    ("load_post", auto_apply_load),
+    ("load_post", clear_filters),
+    ("load_post", clear_views),
+    ("load_post", clear_pending_scenes),
+    ("undo_post", clear_resolved),
+    ("redo_post", clear_resolved),
+    ("undo_post", rebind_audits),
+    ("redo_post", rebind_audits),
+    ("undo_post", reseed_seen),
+    ("redo_post", reseed_seen),
+    ("undo_post", clear_filters),
+    ("redo_post", clear_filters),
+    ("undo_post", clear_views),
+    ("redo_post", clear_views),
+    ("depsgraph_update_post", audit_depsgraph_update),
+    ("depsgraph_update_post", auto_apply_depsgraph_update),
+    ("depsgraph_update_post", note_key_updates),
 )
 
 
@@ -106,26 +298,104 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
 
+    # Shared sets live on a Text datablock, stored once per file
+    Text.shapekey_sets = CollectionProperty(
+        type=ShapekeySet)
+    Text.active_shapekey_set_index = IntProperty()
+
     scene = Scene
 
     scene.shapekey_sets = CollectionProperty(
         type=ShapekeySet)
+    scene.shapekey_sets_shared = PointerProperty(
+        name="Shared Sets", type=Text,
+        description="Shapekey Sets shared with other Scenes. The Scene's own sets override shared sets of the same name")
+    scene.shapekey_sets_edit_overrides = BoolProperty(
+        name="Scene Overrides", default=False,
+        description="Edit the sets of this Scene, which replace shared sets of the same name, instead of the shared sets")
     scene.active_shapekey_set_index = IntProperty()
     scene.is_shapekey_sets_initialized = BoolProperty(
         default=False)
+    scene.shapekey_sets_scope = EnumProperty(
+        name="Scope", items=scope_items, default='SELECTION')
+    scene.shapekey_sets_library_set = EnumProperty(
+        name="Library Set", items=library_set_items)
+    scene.shapekey_sets_source = PointerProperty(
+        name="Source", type=Object, poll=lambda self, object: object.type == 'MESH',
+        description="Mesh whose shape keys fill the keys of the same name when applying a set")
+    scene.shapekey_sets_transfer_mode = EnumProperty(
+        name="Transfer Mode", items=transfer_mode_items, default='INDEX')
+    scene.shapekey_sets_blend_pose = StringProperty(
+        name="Blend With", description="Second pose to blend towards when applying a pose")
+    scene.shapekey_sets_blend_factor = FloatProperty(
+        name="Factor", default=0.5, min=0.0, max=1.0, subtype='FACTOR')
+    scene.shapekey_sets_use_mirror = BoolProperty(
+        name="Mirror Missing Sides", default=False,
+        description="Fill new Left/Right keys by mirroring their other side when it has shape data")
+    scene.shapekey_sets_auto_rules = CollectionProperty(
+        type=AutoApplyRule)
+    scene.active_shapekey_sets_auto_rule_index = IntProperty()
+    scene.shapekey_sets_driver_target = PointerProperty(
+        name="Driver Target", type=Object,
+        description="Object whose properties drive the Shapekey Set's keys, like a control rig")
+    scene.shapekey_sets_driver_path = StringProperty(
+        name="Property Path", default=DEFAULT_DRIVER_PATH,
+        description="Path of the driving property on the target, {name} is the key's name and {set} the set's")
+    scene.shapekey_sets_snapshot_path = StringProperty(
+        name="Snapshot Directory", default="//shapekey_snapshots", subtype='DIR_PATH',
+        description="Directory shape key snapshots are saved to and restored from")
+    scene.shapekey_sets_use_auto_apply = BoolProperty(
+        name="Auto Apply", default=False, update=lambda self, context: seed_seen(),
+        description="Apply Shapekey Sets to new objects that match a rule, such as the objects of an import")
+
+    for handler, function in handlers:
+        getattr(bpy.app.handlers, handler).append(function)
 
     prefs = bpy.context.preferences.addons[__package__].preferences
     if not prefs.is_initialized:
         prefs.register_default_sets()
         prefs.is_initialized = True
 
+    if not bpy.app.background:
+        bpy.app.timers.register(register_ui, first_interval=0, persistent=True)
+        bpy.app.timers.register(refresh_library, first_interval=0, persistent=True)
+
 
 def unregister():
+    for timer in (register_ui, refresh_library):
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+    for cls in reversed(_registered_ui):
+        bpy.utils.unregister_class(cls)
+    _registered_ui.clear()
+
+    for handler, function in handlers:
+        if function in getattr(bpy.app.handlers, handler):
+            getattr(bpy.app.handlers, handler).remove(function)
+
     scene = Scene
 
     del scene.shapekey_sets
+    del scene.shapekey_sets_shared
+    del scene.shapekey_sets_edit_overrides
     del scene.active_shapekey_set_index
     del scene.is_shapekey_sets_initialized
+    del scene.shapekey_sets_scope
+    del scene.shapekey_sets_library_set
+    del scene.shapekey_sets_source
+    del scene.shapekey_sets_transfer_mode
+    del scene.shapekey_sets_use_mirror
+    del scene.shapekey_sets_blend_pose
+    del scene.shapekey_sets_blend_factor
+    del scene.shapekey_sets_auto_rules
+    del scene.active_shapekey_sets_auto_rule_index
+    del scene.shapekey_sets_use_auto_apply
+    del scene.shapekey_sets_snapshot_path
+    del scene.shapekey_sets_driver_target
+    del scene.shapekey_sets_driver_path
+
+    del Text.shapekey_sets
+    del Text.active_shapekey_set_index
 
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
@@ -0,0 +1,181 @@
+import functools
+import re
+from typing import Dict, List, Tuple
+
+from bpy.types import Object
+
+from .compose import ResolvedSet, generation, is_current, resolve_set, set_version
+
+# -----------------------------------------------------------------------------
+#   Key Name Aliases
+# -----------------------------------------------------------------------------
+
+_separators = re.compile(r"[\s_.\-]+")
+
+
+class Normalizer():
+    """
+    Reduces a key name to a canonical form, so EyeBlink_L, eye_blink_left
+    and eyeBlinkLeft compare equal. Side suffixes are recognized from the
+    mirror naming rules, ignoring case, and replaced by a side marker before
+    separators are stripped and case is folded.
+
+    :param fold_case: Compare names ignoring case
+    :param strip_separators: Ignore spaces, underscores, dots and dashes
+    :param side_rules: Mirror naming rules, like "Left/Right, _L/_R", or an
+        empty string to leave sides alone
+    """
+
+    def __init__(self, fold_case: bool, strip_separators: bool, side_rules: str):
+        self.options = (fold_case, strip_separators, side_rules)
+        self.fold_case = fold_case
+        self.strip_separators = strip_separators
+
+        self.sides: Dict[str, str] = {}
+        for rule in side_rules.split(","):
+            pair = [side.strip() for side in rule.split("/")]
+            if len(pair) == 2 and all(pair):
+                self.sides[pair[0].casefold()] = "<L>"
+                self.sides[pair[1].casefold()] = "<R>"
+        suffixes = sorted(self.sides, key=len, reverse=True)
+        self.side_pattern = re.compile("(?:%s)$" % "|".join(map(re.escape, suffixes)),
+                                       re.IGNORECASE) if suffixes else None
+
+    def __call__(self, name: str) -> str:
+        side = ""
+        if self.side_pattern is not None:
+            match = self.side_pattern.search(name)
+            if match is not None and match.start() > 0:
+                side = self.sides[match.group().casefold()]
+                name = name[:match.start()]
+        if self.strip_separators:
+            name = _separators.sub("", name)
+        if self.fold_case:
+            name = name.casefold()
+        return name + side
+
+
+@functools.lru_cache(maxsize=8)
+def get_normalizer(fold_case: bool, strip_separators: bool, side_rules: str) -> Normalizer:
+    return Normalizer(fold_case, strip_separators, side_rules)
+
+
+def parse_aliases(text: str) -> List[str]:
+    return [alias.strip() for alias in text.split(",") if alias.strip()]
+
+
+class AliasIndex():
+    """
+    The normalized forms of every key of a set, including its explicit
+    aliases, precomputed once per set
+
+    :param names: The set's resolved key names
+    :param aliases: Explicit alternative names by key name
+    :param normalize: The Normalizer names are compared with
+    """
+
+    def __init__(self, names: List[str], aliases: Dict[str, List[str]], normalize: Normalizer):
+        self.normalize = normalize
+        self.forms: Dict[str, Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys([normalize(name), *map(normalize, aliases.get(name, ()))]))
+            for name in names}
+
+    def match(self, names: List[str], existing: List[str]) -> Dict[str, str]:
+        """
+        Existing keys that stand for set keys under another name, in one
+        pass over the mesh's keys and one over the set's. Keys that exist
+        with their exact name are never matched to another key, and every
+        existing key is matched at most once.
+        Returns existing names by set key name.
+
+        :param names: Set key names to look for
+        :param existing: The mesh's key names, without the reference key
+        """
+        exact = set(existing)
+        by_form: Dict[str, str] = {}
+        for name in existing:
+            by_form.setdefault(self.normalize(name), name)
+
+        wanted = set(names)
+        claimed = set()
+        matches = {}
+        for name in names:
+            if name in exact:
+                continue
+            for form in self.forms.get(name) or (self.normalize(name),):
+                candidate = by_form.get(form)
+                if candidate is not None and candidate not in claimed and candidate not in wanted:
+                    matches[name] = candidate
+                    claimed.add(candidate)
+                    break
+        return matches
+
+
+# Alias indices by scope, set pointer and normalizer, with the ResolvedSet and
+# the versions of the sets holding aliases they were made from. Valid for one
+# generation of sets, while the set resolves the same and those sets don't change.
+_indices: Dict[tuple, Tuple[ResolvedSet, tuple, AliasIndex]] = {}
+_indices_generation = -1
+
+
+def set_alias_index(shapekey_sets, shapekey_set, normalize: Normalizer) -> AliasIndex:
+    """
+    The cached AliasIndex of a set. Aliases are looked up by key name across
+    all sets, so keys of included sets keep the aliases given where they're
+    defined.
+    """
+    global _indices_generation
+
+    if _indices_generation != generation():
+        _indices.clear()
+        _indices_generation = generation()
+
+    key = (getattr(shapekey_sets, "key", None), shapekey_set.as_pointer(), normalize.options)
+    resolved = resolve_set(shapekey_sets, shapekey_set)
+    cached = _indices.get(key)
+    # Alias edits change the generation, key edits give the set a new ResolvedSet
+    if cached is not None and cached[0] is resolved and is_current(cached[1]):
+        return cached[2]
+
+    aliases: Dict[str, List[str]] = {}
+    sources = []
+    for item in shapekey_sets:
+        for shapekey in item.shapekeys:
+            if shapekey.aliases:
+                aliases.setdefault(shapekey.name, []).extend(parse_aliases(shapekey.aliases))
+                sources.append((item.name, set_version(item.name)))
+    index = AliasIndex(list(resolved.names), aliases, normalize)
+    _indices[key] = (resolved, tuple(dict.fromkeys(sources)), index)
+    return index
+
+
+def match_existing(object: Object, names: List[str], index: AliasIndex, rename: bool = False) -> Tuple[List[str], int]:
+    """
+    Resolve set key names against an object's existing keys through an
+    alias index. Matched keys are renamed to the set's name, or the set's
+    name is swapped for the existing one, so applying the returned names
+    skips them instead of adding near-duplicates.
+    Returns the names to apply and the number of keys matched.
+
+    :param object: A MESH object
+    :param names: Set key names, in order
+    :param index: The set's AliasIndex
+    :param rename: Rename matched keys to the set's names
+    """
+    shape_keys = object.data.shape_keys
+    if shape_keys is None:
+        return names, 0
+
+    key_blocks = shape_keys.key_blocks
+    existing_names = [key_block.name for key_block in key_blocks]
+    matches = index.match(names, existing_names[1:])
+    if not matches:
+        return names, 0
+
+    if rename:
+        # Index instead of name lookups, which are linear in RNA
+        position = {name: key_index for key_index, name in enumerate(existing_names)}
+        for name, existing in matches.items():
+            key_blocks[position[existing]].name = name
+        return names, len(matches)
+    return [matches.get(name, name) for name in names], len(matches)
@@ -0,0 +1,201 @@
+from typing import Dict, Iterable, List, Tuple
+import bpy
+
+from bpy.app.handlers import persistent
+from bpy.types import Key, Mesh
+
+from .compose import ResolvedSet, resolve_set
+from .core import AuditResult, audit_keys
+
+# -----------------------------------------------------------------------------
+#   Compliance Audit
+# -----------------------------------------------------------------------------
+
+
+class MeshAudit():
+    """
+    Cached audit of one mesh. Results are kept per fingerprint of a set's
+    resolved keys and only stay valid while the mesh's key names are the
+    ones they were made for.
+    """
+    __slots__ = ("name", "names", "results")
+
+    def __init__(self, name: str, names: Tuple[str, ...]):
+        self.name = name
+        self.names = names
+        self.results: Dict[str, AuditResult] = {}
+
+
+# Audits by mesh pointer. Empty until the first audit, so the handler stays
+# idle for users who never look at it.
+_audits: Dict[int, MeshAudit] = {}
+
+# Bumped whenever a mesh's cached audit is replaced, to invalidate reports
+_version = 0
+# Object and mesh counts at the last update, fewer means some were deleted
+_counts = (0, 0)
+_reports: Dict[str, Tuple[int, List[Tuple[str, AuditResult]]]] = {}
+
+
+def key_names(mesh: Mesh) -> Tuple[str, ...]:
+    shape_keys = mesh.shape_keys
+    if shape_keys is None:
+        return ()
+    return tuple(key_block.name for key_block in shape_keys.key_blocks)
+
+
+def refresh_mesh(mesh: Mesh) -> MeshAudit:
+    """
+    The audit of a mesh, dropping its results if its key names changed
+    """
+    global _version
+
+    key = mesh.as_pointer()
+    names = key_names(mesh)
+    audit = _audits.get(key)
+    if audit is None or audit.names != names:
+        audit = _audits[key] = MeshAudit(mesh.name, names)
+        _version += 1
+    audit.name = mesh.name
+    return audit
+
+
+def audit_mesh(audit: MeshAudit, resolved: ResolvedSet) -> AuditResult:
+    """
+    A mesh's result for a set, computed once per resolved key list
+    """
+    result = audit.results.get(resolved.fingerprint)
+    if result is None:
+        result = audit.results[resolved.fingerprint] = audit_keys(audit.names, list(resolved.names))
+    return result
+
+
+def audited_meshes() -> Iterable[Mesh]:
+    return (mesh for mesh in bpy.data.meshes if mesh.users)
+
+
+def file_counts() -> Tuple[int, int]:
+    return len(bpy.data.objects), len(bpy.data.meshes)
+
+
+def prune_audits():
+    """
+    Drop the audits of meshes that were deleted or lost their last user
+    """
+    global _version
+
+    live = {mesh.as_pointer() for mesh in audited_meshes()}
+    stale = [key for key in _audits if key not in live]
+    for key in stale:
+        del _audits[key]
+    if stale:
+        _version += 1
+
+
+def audit_all(shapekey_sets) -> Dict[str, int]:
+    """
+    Audit every mesh in the file against every set from scratch. Returns
+    the number of compliant meshes per set name.
+    """
+    global _counts
+
+    _audits.clear()
+    _reports.clear()
+    _counts = file_counts()
+
+    resolved = [(shapekey_set.name, resolve_set(shapekey_sets, shapekey_set)) for shapekey_set in shapekey_sets]
+    compliant = {name: 0 for name, _ in resolved}
+    for mesh in audited_meshes():
+        audit = refresh_mesh(mesh)
+        for name, resolved_set in resolved:
+            if audit_mesh(audit, resolved_set).compliant:
+                compliant[name] += 1
+    return compliant
+
+
+def is_audited() -> bool:
+    return bool(_audits)
+
+
+def audit_count() -> int:
+    return len(_audits)
+
+
+def failing_meshes(shapekey_sets, shapekey_set) -> List[Tuple[str, AuditResult]]:
+    """
+    Cached meshes that don't comply with a set, by mesh name. Only cached
+    audits are read, so drawing the report never scans the file. The list
+    is rebuilt only after a result changed.
+    """
+    resolved = resolve_set(shapekey_sets, shapekey_set)
+    cached = _reports.get(resolved.fingerprint)
+    if cached is not None and cached[0] == _version:
+        return cached[1]
+
+    failing = []
+    for audit in _audits.values():
+        result = audit_mesh(audit, resolved)
+        if not result.compliant:
+            failing.append((audit.name, result))
+    failing.sort(key=lambda item: item[0])
+
+    _reports[resolved.fingerprint] = (_version, failing)
+    return failing
+
+
+@persistent
+def audit_depsgraph_update(scene, depsgraph):
+    """
+    Re-check only the meshes whose shape keys were touched by an update.
+    The file is only scanned for deleted meshes when it has fewer objects
+    or meshes than at the last update.
+    """
+    global _counts
+
+    if not _audits:
+        return
+
+    counts = file_counts()
+    if counts[0] < _counts[0] or counts[1] < _counts[1]:
+        prune_audits()
+    _counts = counts
+
+    for update in depsgraph.updates:
+        id = update.id.original
+        if isinstance(id, Key):
+            id = id.user
+        if isinstance(id, Mesh):
+            refresh_mesh(id)
+
+
+@persistent
+def rebind_audits(*args):
+    """
+    Undo and redo reallocate meshes, so audits are looked up again by mesh
+    name. Results survive for meshes whose key names are unchanged.
+    """
+    global _version
+
+    if not _audits:
+        return
+
+    by_name = {audit.name: audit for audit in _audits.values()}
+    _audits.clear()
+    for mesh in audited_meshes():
+        audit = by_name.get(mesh.name)
+        if audit is not None:
+            _audits[mesh.as_pointer()] = audit
+            refresh_mesh(mesh)
+    _version += 1
+
+
+@persistent
+def clear_audits(*args):
+    """
+    Audits of another file don't apply, so they start over on load
+    """
+    global _version
+
+    _audits.clear()
+    _reports.clear()
+    _version += 1
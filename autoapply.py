@@ -0,0 +1,228 @@
+import fnmatch
+import time
+from typing import Callable, Dict, Iterable, Set
+import bpy
+
+from bpy.app.handlers import persistent
+from bpy.types import Object, Scene
+
+from .bulk import apply_key_names
+from .compose import resolved_key_names
+from .instrument import Timing, history, is_enabled
+from .scope import group_by_mesh
+from .storage import scene_sets
+
+# -----------------------------------------------------------------------------
+#   Auto Apply Rules
+# -----------------------------------------------------------------------------
+
+# Seconds without newly queued objects before the queue is applied, so an
+# import that adds objects over several updates is handled as one batch
+AUTO_APPLY_DELAY = 0.5
+
+# Names of new MESH objects waiting to be applied, by scene name. Names
+# rather than objects, which may be freed before the timer runs.
+_queue: Dict[str, Set[str]] = {}
+# Pointers of objects handlers have seen, only unseen objects are queued
+_seen: Set[int] = set()
+# Number of objects in the file when _seen was last pruned or grown
+_object_count = 0
+_last_queued = 0.0
+
+
+def rule_matcher(rule) -> Callable[[Object], bool]:
+    """
+    Test for the objects an AutoApplyRule covers. A rule with both a
+    collection and a pattern needs both to match, one without either
+    matches nothing. Collection members are gathered once per matcher.
+
+    :param rule: An AutoApplyRule property group
+    """
+    members = {object.name for object in rule.collection.all_objects} if rule.collection else None
+    pattern = rule.pattern.strip()
+    if members is None and not pattern:
+        return lambda object: False
+
+    def matches(object: Object) -> bool:
+        if members is not None and object.name not in members:
+            return False
+        return not pattern or fnmatch.fnmatchcase(object.name, pattern)
+    return matches
+
+
+def apply_rules(scene: Scene, objects: Iterable[Object], timing: Timing) -> int:
+    """
+    Apply the set of every enabled rule of a scene to the objects it covers.
+    Rules apply in list order, so an object matched by several rules gets
+    each set's keys in that order.
+    Returns the number of keys created.
+
+    :param scene: The Scene whose rules and sets are used
+    :param objects: Objects of any type, usually new ones
+    :param timing: Records counts and cost per object
+    """
+    shapekey_sets = scene_sets(scene)
+    sets_by_name = {}
+    for shapekey_set in shapekey_sets:
+        sets_by_name.setdefault(shapekey_set.name, shapekey_set)
+
+    objects = list(objects)
+    created_total = 0
+    for rule in scene.shapekey_sets_auto_rules:
+        shapekey_set = sets_by_name.get(rule.name)
+        if not rule.enabled or shapekey_set is None:
+            continue
+        names = resolved_key_names(shapekey_sets, shapekey_set)
+        if not names:
+            continue
+
+        matches = rule_matcher(rule)
+        for mesh, object in group_by_mesh(object for object in objects if matches(object)).items():
+            # Adding keys needs Object Mode, edited objects are queued again once they leave it
+            if object.mode == 'EDIT':
+                _seen.discard(object.as_pointer())
+                continue
+            with timing.measure(object.name):
+                created, skipped = apply_key_names(object, names)
+            timing.count("meshes")
+            timing.count("created", created)
+            created_total += created
+    return created_total
+
+
+def _queue_objects(scene: Scene, objects: Iterable[Object]) -> bool:
+    """
+    Queue the MESH objects handlers haven't seen yet. Returns whether any
+    were queued.
+    """
+    queued = _queue.get(scene.name)
+    count = len(queued) if queued is not None else 0
+    for object in objects:
+        key = object.as_pointer()
+        if key in _seen or object.type != 'MESH':
+            continue
+        _seen.add(key)
+        if queued is None:
+            queued = _queue[scene.name] = set()
+        queued.add(object.name)
+    return queued is not None and len(queued) > count
+
+
+def prune_seen():
+    """
+    Forget the pointers of deleted objects. Blender reuses freed addresses,
+    so an object created at the address of a deleted one would otherwise
+    count as seen and never be applied.
+    """
+    global _object_count
+
+    _seen.intersection_update(object.as_pointer() for object in bpy.data.objects)
+    _object_count = len(bpy.data.objects)
+
+
+def seed_seen():
+    """
+    Count every object that exists now as seen, so only objects created
+    afterwards are applied. Called when rules start being enforced, since
+    moving or editing an existing object also puts it into an update.
+    """
+    global _object_count
+
+    _seen.clear()
+    _seen.update(object.as_pointer() for object in bpy.data.objects)
+    _object_count = len(bpy.data.objects)
+
+
+def uses_rules(scene: Scene) -> bool:
+    return scene.shapekey_sets_use_auto_apply and len(scene.shapekey_sets_auto_rules) > 0
+
+
+def schedule_flush():
+    """
+    Push back the batch timer, registering it if it isn't waiting already
+    """
+    global _last_queued
+
+    _last_queued = time.monotonic()
+    if not bpy.app.timers.is_registered(flush_queue):
+        bpy.app.timers.register(flush_queue, first_interval=AUTO_APPLY_DELAY)
+
+
+def flush_queue():
+    """
+    Timer that applies every queued object in one batch, once nothing new
+    was queued for AUTO_APPLY_DELAY seconds
+    """
+    waited = time.monotonic() - _last_queued
+    if waited < AUTO_APPLY_DELAY:
+        return AUTO_APPLY_DELAY - waited
+
+    queue = dict(_queue)
+    _queue.clear()
+    prune_seen()
+
+    timing = Timing("shapekey_sets.auto_apply")
+    for scene_name, object_names in queue.items():
+        scene = bpy.data.scenes.get(scene_name)
+        if scene is None or not uses_rules(scene):
+            continue
+        objects = (scene.objects.get(name) for name in object_names)
+        apply_rules(scene, (object for object in objects if object is not None), timing)
+    timing.finish()
+
+    if timing.counters and is_enabled(bpy.context):
+        history.append(timing.as_dict())
+    return None
+
+
+@persistent
+def auto_apply_depsgraph_update(scene, depsgraph):
+    """
+    Queue MESH objects that appear in an update for the first time. Nothing
+    is applied here, the handler only collects objects for the batch timer.
+    Fewer objects than before means some were deleted, so their pointers
+    are dropped before any new object is looked at.
+    """
+    global _object_count
+
+    count = len(bpy.data.objects)
+    if count < _object_count:
+        prune_seen()
+    else:
+        _object_count = count
+
+    if not uses_rules(scene):
+        return
+
+    objects = (update.id.original for update in depsgraph.updates if isinstance(update.id, Object))
+    if _queue_objects(scene, objects):
+        schedule_flush()
+
+
+@persistent
+def auto_apply_load(*args):
+    """
+    Rules are enforced on every MESH object of a loaded file. Objects of
+    another file are all new, so the seen objects start over. Objects of
+    scenes without rules are seen too, they aren't new once rules are added.
+    """
+    _seen.clear()
+    _queue.clear()
+
+    queued = False
+    for scene in bpy.data.scenes:
+        if uses_rules(scene):
+            queued = _queue_objects(scene, scene.objects) or queued
+    # The objects just queued are among them
+    seed_seen()
+    if queued:
+        schedule_flush()
+
+
+@persistent
+def reseed_seen(*args):
+    """
+    Undo and redo reallocate objects, so every object that exists afterwards
+    counts as seen rather than as new
+    """
+    seed_seen()
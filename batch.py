@@ -0,0 +1,294 @@
+"""
+Headless batch application of Shapekey Sets to many .blend files.
+
+Run the scheduler from a background Blender:
+
+    blender -b --python batch.py -- "chars/**/*.blend" --set "ARKit Face Blendshapes" \
+        --set "VRChat Visemes" --workers 8 --summary summary.json
+
+Each file is opened in its own background Blender process, which reruns this
+script in worker mode and applies the sets to every editable mesh with the
+same core as the Apply Shapekey Set operator. The scheduler itself doesn't
+need bpy, so it can also run from a plain Python interpreter with --blender
+pointing at a Blender executable or a stand-in for one.
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.abspath(__file__)
+
+
+# -----------------------------------------------------------------------------
+#   Set Lookup
+# -----------------------------------------------------------------------------
+
+
+def load_sets(sets_file: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Shapekey Sets by name, read from a JSON file shaped like default_sets,
+    or the addon's default sets when no file is given
+
+    :param sets_file: Path to a JSON object mapping set names to key names
+    """
+    if sets_file:
+        with open(sets_file) as file:
+            return json.load(file)
+
+    spec = importlib.util.spec_from_file_location(
+        "_shapekey_sets_default_sets", os.path.join(ROOT, "default_sets.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.default_sets
+
+
+def resolve_names(sets: Dict[str, List[str]], set_names: Iterable[str]) -> List[str]:
+    """
+    Concatenate the keys of the requested sets, in order
+
+    :param sets: Shapekey Sets by name
+    :param set_names: Names of the sets to apply
+    """
+    names = []
+    for set_name in set_names:
+        if set_name not in sets:
+            raise KeyError('Unknown Shapekey Set "%s"' % set_name)
+        names.extend(sets[set_name])
+    return names
+
+
+def expand_globs(patterns: Iterable[str]) -> List[str]:
+    """
+    Expand file globs, recursively for "**", into a sorted list without repeats
+    """
+    files = set()
+    for pattern in patterns:
+        files.update(os.path.abspath(path)
+                     for path in glob.glob(pattern, recursive=True))
+    return sorted(files)
+
+
+# -----------------------------------------------------------------------------
+#   Scheduler
+# -----------------------------------------------------------------------------
+
+
+def worker_command(blender: Sequence[str], path: str, names_file: str, result_file: str,
+                   save: bool = True) -> List[str]:
+    """
+    Command line that opens one file in background Blender and runs this
+    script as a worker on it
+    """
+    command = [*blender, "-b", "--factory-startup", path,
+               "--python-exit-code", "1", "--python", SCRIPT, "--",
+               "--worker", "--names-file", names_file, "--result", result_file]
+    if not save:
+        command.append("--no-save")
+    return command
+
+
+def run_file(blender: Sequence[str], path: str, names_file: str, retries: int = 1,
+             timeout: Optional[float] = None, save: bool = True) -> dict:
+    """
+    Process one file in a child Blender, retrying failed attempts.
+    Returns the worker's result extended with timing and attempt count.
+    """
+    result = {}
+    attempts = 0
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as directory:
+        result_file = os.path.join(directory, "result.json")
+
+        while attempts <= retries:
+            attempts += 1
+            if os.path.exists(result_file):
+                os.remove(result_file)
+            try:
+                process = subprocess.run(worker_command(blender, path, names_file, result_file, save),
+                                         capture_output=True, text=True, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                result = {"error": "Timed out after %ss" % timeout}
+                continue
+            except OSError as error:
+                # The executable itself is missing, retrying won't help
+                result = {"error": str(error)}
+                break
+
+            if process.returncode == 0 and os.path.exists(result_file):
+                with open(result_file) as file:
+                    result = json.load(file)
+                break
+
+            output = (process.stderr or process.stdout).strip().splitlines()
+            result = {"error": "Exit code %d%s" % (
+                process.returncode, ": " + output[-1] if output else "")}
+
+    result.update(path=path, ok="error" not in result, attempts=attempts,
+                  seconds=time.perf_counter() - start)
+    return result
+
+
+def summarize(results: List[dict], wall_seconds: float, workers: int) -> dict:
+    """
+    Aggregate per-file results into the JSON summary
+    """
+    succeeded = [result for result in results if result["ok"]]
+    return {
+        "workers": workers,
+        "files": results,
+        "totals": {
+            "files": len(results),
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "meshes": sum(result.get("meshes", 0) for result in succeeded),
+            "created": sum(result.get("created", 0) for result in succeeded),
+            "skipped": sum(result.get("skipped", 0) for result in succeeded),
+            "seconds": sum(result["seconds"] for result in results),
+            "wall_seconds": wall_seconds,
+        },
+    }
+
+
+def run_batch(files: List[str], names: List[str], blender: Sequence[str], workers: int = 4,
+              retries: int = 1, timeout: Optional[float] = None, save: bool = True) -> dict:
+    """
+    Apply key names to every file using a pool of background Blender
+    processes, and return the aggregated summary
+
+    :param files: Paths of .blend files
+    :param names: Shape key names to ensure on every mesh
+    :param blender: Command prefix that starts Blender
+    :param workers: Number of Blender processes running at once
+    :param retries: Extra attempts for a file whose worker failed
+    :param timeout: Seconds before a worker is killed, or None
+    :param save: Save files after applying
+    """
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        names_file = os.path.join(directory, "names.json")
+        with open(names_file, "w") as file:
+            json.dump(names, file)
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            results = list(pool.map(
+                lambda path: run_file(blender, path, names_file, retries, timeout, save), files))
+
+    return summarize(results, time.perf_counter() - start, workers)
+
+
+# -----------------------------------------------------------------------------
+#   Worker
+# -----------------------------------------------------------------------------
+
+
+def load_addon():
+    """
+    Import the addon package from this file's directory, without enabling it
+    """
+    spec = importlib.util.spec_from_file_location(
+        "shapekey_sets", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_worker(names_file: str, result_file: str, save: bool = True):
+    """
+    Apply key names to every editable mesh in the open file.
+    Must run inside Blender.
+    """
+    import bpy
+
+    load_addon()
+    from shapekey_sets.bulk import apply_key_names
+    from shapekey_sets.scope import group_by_mesh
+
+    with open(names_file) as file:
+        names = json.load(file)
+
+    start = time.perf_counter()
+    meshes = group_by_mesh(bpy.data.objects)
+    created = skipped = 0
+    for object in meshes.values():
+        object_created, object_skipped = apply_key_names(object, names)
+        created += object_created
+        skipped += object_skipped
+
+    if save and created:
+        bpy.ops.wm.save_mainfile()
+
+    with open(result_file, "w") as file:
+        json.dump({"meshes": len(meshes), "created": created, "skipped": skipped,
+                   "apply_seconds": time.perf_counter() - start}, file)
+
+
+# -----------------------------------------------------------------------------
+#   Command Line
+# -----------------------------------------------------------------------------
+
+
+def default_blender() -> str:
+    try:
+        import bpy
+    except ImportError:
+        return "blender"
+    return bpy.app.binary_path
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Apply Shapekey Sets to many .blend files")
+    parser.add_argument("files", nargs="*", help="File globs, ** is recursive")
+    parser.add_argument("--set", dest="sets", action="append", default=[],
+                        help="Name of a Shapekey Set to apply, can be repeated")
+    parser.add_argument("--sets-file",
+                        help="JSON file of sets, instead of the default sets")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--timeout", type=float)
+    parser.add_argument("--blender", help="Blender command to run workers with")
+    parser.add_argument("--summary", help="Write the JSON summary to this file")
+    parser.add_argument("--no-save", dest="save", action="store_false")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--names-file", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.names_file, args.result, args.save)
+        return 0
+
+    if not args.sets:
+        parser.error("at least one --set is required")
+
+    names = resolve_names(load_sets(args.sets_file), args.sets)
+    files = expand_globs(args.files)
+    blender = shlex.split(args.blender) if args.blender else [default_blender()]
+
+    summary = run_batch(files, names, blender, args.workers,
+                        args.retries, args.timeout, args.save)
+
+    if args.summary:
+        with open(args.summary, "w") as file:
+            json.dump(summary, file, indent=2)
+
+    totals = summary["totals"]
+    print("%d/%d files, %d keys created in %.1fs" % (
+        totals["succeeded"], totals["files"], totals["created"], totals["wall_seconds"]))
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]))
@@ -0,0 +1,109 @@
+"""
+Compare the original per-key apply loop against the bulk engine in bulk.py.
+Must run inside Blender, since both paths call the real shape key API:
+
+    blender -b --factory-startup --python benchmarks/bench_apply.py -- --vertices 200000 --existing 100
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_addon():
+    """
+    Import the addon package straight from the source tree, without enabling it
+    """
+    spec = importlib.util.spec_from_file_location(
+        "shapekey_sets", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_object(vertices: int, existing: int) -> bpy.types.Object:
+    """
+    Build a point cloud mesh with a number of pre-existing shape keys
+    """
+    mesh = bpy.data.meshes.new("bench")
+    mesh.vertices.add(vertices)
+    mesh.vertices.foreach_set("co", np.random.default_rng(0).random(
+        vertices * 3, dtype=np.float32))
+    object = bpy.data.objects.new("bench", mesh)
+    bpy.context.scene.collection.objects.link(object)
+
+    if existing:
+        object.shape_key_add(name="Basis", from_mix=False)
+        for i in range(existing - 1):
+            object.shape_key_add(name="existing_%d" % i, from_mix=False)
+    return object
+
+
+def remove_object(object: bpy.types.Object):
+    mesh = object.data
+    bpy.data.objects.remove(object)
+    bpy.data.meshes.remove(mesh)
+
+
+def legacy_apply(object: bpy.types.Object, names):
+    """
+    The loop SHAPEKEY_SETS_OT_add used before the bulk engine
+    """
+    for name in names:
+        if (object.data.shape_keys is None
+                or not name in object.data.shape_keys.key_blocks):
+            object.shape_key_add(name=name)
+
+
+def measure(apply, names, vertices: int, existing: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        object = make_object(vertices, existing)
+        start = time.perf_counter()
+        apply(object, names)
+        best = min(best, time.perf_counter() - start)
+        remove_object(object)
+    return best
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vertices", type=int, nargs="+",
+                        default=[10000, 50000, 200000])
+    parser.add_argument("--existing", type=int, nargs="+", default=[0, 100])
+    parser.add_argument("--set", default="ARKit Face Blendshapes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    addon = load_addon()
+    from shapekey_sets.bulk import apply_key_names
+
+    names = addon.default_sets[args.set]
+    results = []
+    for vertices in args.vertices:
+        for existing in args.existing:
+            legacy = measure(legacy_apply, names, vertices,
+                             existing, args.repeat)
+            bulk = measure(apply_key_names, names,
+                           vertices, existing, args.repeat)
+            results.append({"vertices": vertices, "existing": existing, "keys": len(names),
+                            "legacy": legacy, "bulk": bulk, "speedup": legacy / bulk})
+            print("%8d verts %5d existing  legacy %8.3fs  bulk %8.3fs  x%.1f" %
+                  (vertices, existing, legacy, bulk, legacy / bulk))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
@@ -0,0 +1,58 @@
+"""
+Time shape data transfer between meshes of different topology, including
+building the vertex mapping and reusing it from the cache. Must run inside
+Blender, since the mapping uses mathutils.kdtree:
+
+    blender -b --factory-startup --python benchmarks/bench_transfer.py -- --target-vertices 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_apply import load_addon, make_object, remove_object  # noqa: E402
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source-vertices", type=int, default=50000)
+    parser.add_argument("--target-vertices", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--set", default="ARKit Face Blendshapes")
+    parser.add_argument("--modes", nargs="+", default=["NEAREST", "INTERPOLATED"])
+    args = parser.parse_args(argv)
+
+    addon = load_addon()
+    from shapekey_sets.transfer import ShapeTransfer, clear_mappings
+
+    names = addon.default_sets[args.set]
+    source = make_object(args.source_vertices, 1)
+    rng = np.random.default_rng(1)
+    for name in names:
+        key_block = source.shape_key_add(name=name, from_mix=False)
+        key_block.data.foreach_set("co", rng.random(args.source_vertices * 3, dtype=np.float32))
+
+    for vertices in args.target_vertices:
+        for mode in args.modes:
+            clear_mappings()
+            target = make_object(vertices, 1)
+
+            start = time.perf_counter()
+            ShapeTransfer(source, mode=mode).apply(target, names)
+            first = time.perf_counter() - start
+
+            # Same mesh pair again, the mapping comes from the cache
+            start = time.perf_counter()
+            ShapeTransfer(source, overwrite=True, mode=mode).apply(target, names)
+            cached = time.perf_counter() - start
+
+            print("%8d verts %-12s  with mapping build %7.3fs  cached mapping %7.3fs" % (
+                vertices, mode, first, cached))
+            remove_object(target)
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
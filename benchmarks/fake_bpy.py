@@ -0,0 +1,435 @@
+"""
+In-memory stand-in for the parts of bpy the addon touches, so operators and
+helpers can be timed from a plain Python interpreter.
+
+Not a full emulation. Collections behave like RNA collections backed by a
+list, and the shape key cost model follows Blender's: every added key block
+copies the reference key's coordinates, and adding from the mix evaluates
+every existing key first. Name lookups in key_blocks are linear, like RNA
+string lookups.
+"""
+import sys
+import types
+
+import numpy as np
+
+
+# -----------------------------------------------------------------------------
+#   Properties
+# -----------------------------------------------------------------------------
+
+
+class _Property():
+    def __init__(self, kind: str, **options):
+        self.kind = kind
+        self.options = options
+
+    def default(self):
+        if self.kind == "COLLECTION":
+            return Collection(self.options.get("type"))
+        if self.kind == "POINTER":
+            return None
+        if self.kind == "ENUM":
+            if "default" in self.options:
+                return self.options["default"]
+            items = self.options.get("items")
+            return items[0][0] if isinstance(items, (tuple, list)) and items else ""
+        return self.options.get("default", {
+            "STRING": "", "BOOL": False, "INT": 0, "FLOAT": 0.0}.get(self.kind))
+
+
+def _property(kind):
+    return lambda **options: _Property(kind, **options)
+
+
+def _declared_properties(cls):
+    """
+    Properties declared as annotations or assigned on a class and its bases
+    """
+    found = {}
+    for base in reversed(cls.__mro__):
+        for name, value in getattr(base, "__annotations__", {}).items():
+            if isinstance(value, _Property):
+                found[name] = value
+        for name, value in vars(base).items():
+            if isinstance(value, _Property):
+                found[name] = value
+    return found
+
+
+class _Struct():
+    """
+    Base for fake RNA structs. Declared properties get their defaults on
+    creation and can be read and written as ID properties.
+    """
+
+    def __init__(self):
+        self._keys = []
+        for name, prop in _declared_properties(type(self)).items():
+            self._keys.append(name)
+            object.__setattr__(self, name, prop.default())
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_") and name not in self._keys:
+            self._keys.append(name)
+        object.__setattr__(self, name, value)
+
+    def keys(self):
+        return list(self._keys)
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self._keys]
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        current = getattr(self, name, None)
+        if isinstance(current, Collection):
+            current.assign(value)
+        else:
+            setattr(self, name, value)
+
+    def as_pointer(self) -> int:
+        return id(self)
+
+
+class Collection():
+    """
+    CollectionProperty stand-in. Removing and moving shift the remaining
+    items like the RNA array does.
+    """
+
+    def __init__(self, type=None):
+        self.type = type
+        self._items = []
+
+    def add(self):
+        item = self.type() if self.type else _Struct()
+        self._items.append(item)
+        return item
+
+    def remove(self, index):
+        if not isinstance(index, int):
+            index = self._items.index(index)
+        del self._items[index]
+
+    def move(self, source, destination):
+        self._items.insert(destination, self._items.pop(source))
+
+    def clear(self):
+        self._items.clear()
+
+    def assign(self, other):
+        """
+        Deep copy another collection, like assigning an ID property
+        """
+        self.clear()
+        for source in other:
+            item = self.add()
+            for name, value in source.items():
+                item[name] = value
+
+    def find(self, name) -> int:
+        for index, item in enumerate(self._items):
+            if item.name == name:
+                return index
+        return -1
+
+    def get(self, name, default=None):
+        index = self.find(name)
+        return self._items[index] if index >= 0 else default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            index = self.find(key)
+            if index < 0:
+                raise KeyError(key)
+            return self._items[index]
+        return self._items[key]
+
+    def __contains__(self, name):
+        return self.find(name) >= 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __bool__(self):
+        return bool(self._items)
+
+
+# -----------------------------------------------------------------------------
+#   Shape Keys
+# -----------------------------------------------------------------------------
+
+
+class _PointData():
+    """
+    Vertex data of a mesh or key block, backed by an (n, 3) float32 array
+    """
+
+    def __init__(self, co: np.ndarray):
+        self.co = co
+
+    def foreach_get(self, attribute, buffer):
+        buffer[:] = getattr(self, attribute).reshape(-1)
+
+    def foreach_set(self, attribute, buffer):
+        getattr(self, attribute)[:] = np.asarray(
+            buffer, dtype=np.float32).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.co)
+
+
+class ShapeKey(_Struct):
+    def __init__(self, name: str, co: np.ndarray, relative_key=None):
+        super().__init__()
+        self.name = name
+        self.value = 0.0
+        self.mute = False
+        self.slider_min = 0.0
+        self.slider_max = 1.0
+        self.vertex_group = ""
+        self.interpolation = 'KEY_LINEAR'
+        self.relative_key = relative_key or self
+        self.data = _PointData(co)
+
+
+class Key(_Struct):
+    def __init__(self, user):
+        super().__init__()
+        self.user = user
+        self.use_relative = True
+        self.key_blocks = Collection(None)
+        self.animation_data = None
+
+    @property
+    def reference_key(self):
+        return self.key_blocks[0]
+
+
+class Mesh(_Struct):
+    def __init__(self, name: str, vertices: int):
+        super().__init__()
+        self.name = name
+        self.library = None
+        self.shape_keys = None
+        self.vertices = _PointData(np.random.default_rng(
+            len(name)).random((vertices, 3), dtype=np.float32))
+
+
+class Object(_Struct):
+    def __init__(self, name: str, data=None):
+        super().__init__()
+        self.name = name
+        self.data = data
+        self.type = 'MESH' if isinstance(data, Mesh) else 'EMPTY'
+        self.library = None
+        self.active_shape_key_index = 0
+        self.matrix_world = np.eye(4)
+
+    def shape_key_add(self, name="Key", from_mix=True):
+        mesh = self.data
+        if mesh.shape_keys is None:
+            mesh.shape_keys = Key(mesh)
+            co = mesh.vertices.co.copy()
+        else:
+            key_blocks = list(mesh.shape_keys.key_blocks)
+            basis = key_blocks[0].data.co
+            co = basis.copy()
+            if from_mix:
+                # Evaluating the mix touches every vertex of every key
+                for key_block in key_blocks[1:]:
+                    co += key_block.value * (key_block.data.co - basis)
+
+        key_blocks = mesh.shape_keys.key_blocks
+        key_block = ShapeKey(name, co, key_blocks[0] if key_blocks else None)
+        key_blocks._items.append(key_block)
+        return key_block
+
+    def shape_key_remove(self, key):
+        self.data.shape_keys.key_blocks.remove(key)
+
+
+class KDTree():
+    """
+    mathutils.kdtree.KDTree stand-in that searches by brute force
+    """
+
+    def __init__(self, size: int):
+        self._points = np.empty((size, 3))
+        self._indices = np.empty(size, dtype=np.int64)
+        self._count = 0
+
+    def insert(self, co, index):
+        self._points[self._count] = co
+        self._indices[self._count] = index
+        self._count += 1
+
+    def balance(self):
+        pass
+
+    def find_n(self, co, n):
+        distances = np.linalg.norm(self._points[:self._count] - co, axis=1)
+        nearest = np.argsort(distances)[:n]
+        return [(self._points[i], int(self._indices[i]), float(distances[i])) for i in nearest]
+
+    def find(self, co):
+        return self.find_n(co, 1)[0]
+
+
+# -----------------------------------------------------------------------------
+#   Context
+# -----------------------------------------------------------------------------
+
+
+class _Region():
+    def tag_redraw(self):
+        pass
+
+
+class _Addon():
+    def __init__(self, preferences):
+        self.preferences = preferences
+
+
+class _Preferences():
+    def __init__(self):
+        self.addons = {}
+
+
+_preferences = _Preferences()
+
+
+class Context():
+    def __init__(self, scene=None):
+        self.scene = scene
+        self.selected_objects = []
+        self.region = _Region()
+        # Addon preferences are global, like in Blender
+        self.preferences = _preferences
+        self.window_manager = None
+        self.view_layer = None
+
+
+class _Timers():
+    def register(self, function, first_interval=0, persistent=False):
+        pass
+
+    def is_registered(self, function):
+        return False
+
+    def unregister(self, function):
+        pass
+
+
+def _register_class(cls):
+    if issubclass(cls, AddonPreferences):
+        _module.context.preferences.addons[cls.bl_idname] = _Addon(cls())
+
+
+def _unregister_class(cls):
+    if issubclass(cls, AddonPreferences):
+        _module.context.preferences.addons.pop(cls.bl_idname, None)
+
+
+# -----------------------------------------------------------------------------
+#   Module
+# -----------------------------------------------------------------------------
+
+PropertyGroup = type("PropertyGroup", (_Struct,), {})
+AddonPreferences = type("AddonPreferences", (_Struct,), {})
+Scene = type("Scene", (_Struct,), {})
+Operator = type("Operator", (_Struct,), {"report": lambda self, level, message: None})
+
+
+class _UIType():
+    pass
+
+
+_module = types.ModuleType("bpy")
+
+
+def install() -> types.ModuleType:
+    """
+    Register the stand-in as bpy, bpy.types, bpy.props and bpy.utils
+    """
+    bpy_types = types.ModuleType("bpy.types")
+    for name, value in {
+        "PropertyGroup": PropertyGroup, "AddonPreferences": AddonPreferences,
+        "Scene": Scene, "Operator": Operator, "Object": Object, "Mesh": Mesh,
+        "Key": Key, "ShapeKey": ShapeKey, "Context": Context,
+    }.items():
+        setattr(bpy_types, name, value)
+    # Anything else only needs to exist as a base class or annotation
+    bpy_types.__getattr__ = lambda name: type(name, (_UIType,), {})
+
+    bpy_props = types.ModuleType("bpy.props")
+    for name, kind in (("StringProperty", "STRING"), ("BoolProperty", "BOOL"),
+                       ("IntProperty", "INT"), ("FloatProperty", "FLOAT"),
+                       ("EnumProperty", "ENUM"), ("CollectionProperty", "COLLECTION"),
+                       ("PointerProperty", "POINTER"), ("FloatVectorProperty", "FLOAT"),
+                       ("IntVectorProperty", "INT"), ("BoolVectorProperty", "BOOL")):
+        setattr(bpy_props, name, _property(kind))
+
+    bpy_utils = types.ModuleType("bpy.utils")
+    bpy_utils.register_class = _register_class
+    bpy_utils.unregister_class = _unregister_class
+
+    bpy_handlers = types.ModuleType("bpy.app.handlers")
+    bpy_handlers.persistent = lambda function: function
+    for name in ("load_post", "depsgraph_update_post", "undo_post", "redo_post", "save_pre"):
+        setattr(bpy_handlers, name, [])
+
+    bpy_app = types.ModuleType("bpy.app")
+    bpy_app.timers = _Timers()
+    bpy_app.handlers = bpy_handlers
+    bpy_app.version = (4, 0, 0)
+    bpy_app.binary_path = ""
+    bpy_app.background = False
+
+    _module.types = bpy_types
+    _module.props = bpy_props
+    _module.utils = bpy_utils
+    _module.app = bpy_app
+    _module.path = types.SimpleNamespace(abspath=lambda path: path)
+    _module.context = Context()
+    _module.data = types.SimpleNamespace(scenes=[], objects=[], meshes=[])
+
+    bpy_extras = types.ModuleType("bpy_extras")
+    bpy_extras.io_utils = types.ModuleType("bpy_extras.io_utils")
+    bpy_extras.io_utils.ImportHelper = type("ImportHelper", (), {})
+    bpy_extras.io_utils.ExportHelper = type("ExportHelper", (), {})
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.kdtree = types.ModuleType("mathutils.kdtree")
+    mathutils.kdtree.KDTree = KDTree
+
+    sys.modules.update({"bpy": _module, "bpy.types": bpy_types,
+                        "bpy.props": bpy_props, "bpy.utils": bpy_utils,
+                        "bpy.app": bpy_app, "bpy.app.handlers": bpy_handlers,
+                        "bpy_extras": bpy_extras, "bpy_extras.io_utils": bpy_extras.io_utils,
+                        "mathutils": mathutils, "mathutils.kdtree": mathutils.kdtree})
+    return _module
+
+
+def new_scene() -> Scene:
+    """
+    A Scene with the properties the addon registered on bpy.types.Scene
+    """
+    scene = Scene()
+    _module.context.scene = scene
+    _module.data.scenes.append(scene)
+    return scene
+
+
+def new_object(name: str, vertices: int) -> Object:
+    mesh = Mesh(name, vertices)
+    object = Object(name, mesh)
+    _module.data.meshes.append(mesh)
+    _module.data.objects.append(object)
+    return object
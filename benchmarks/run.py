@@ -0,0 +1,229 @@
+"""
+Benchmark suite that runs outside Blender against the fake_bpy stand-in.
+Times applying a set, the list actions and scene initialization as vertex,
+key, set and object counts grow, as well as enabling the addon, and writes
+machine-readable results:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --quick --compare results.json
+
+Absolute numbers only mean something relative to another run of this
+script, not to Blender itself.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_bpy  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_addon():
+    """
+    Import the addon package on top of the fake bpy, without registering it
+    """
+    fake_bpy.install()
+    spec = importlib.util.spec_from_file_location(
+        "shapekey_sets", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_addon():
+    """
+    Import the addon package on top of the fake bpy, and register it
+    """
+    module = import_addon()
+    module.register()
+    return module
+
+
+def best_of(repeat: int, setup, run) -> float:
+    """
+    Fastest of several runs, each with fresh state from setup()
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def key_names(count: int):
+    return ["key_%04d" % i for i in range(count)]
+
+
+def fill_set(shapekey_set, names):
+    for name in names:
+        shapekey_set.shapekeys.add().name = name
+
+
+# -----------------------------------------------------------------------------
+#   Cases
+# -----------------------------------------------------------------------------
+
+
+def bench_apply(addon, vertices, keys, objects, repeat):
+    from shapekey_sets.op import SHAPEKEY_SETS_OT_add
+
+    def setup():
+        scene = fake_bpy.new_scene()
+        fill_set(scene.shapekey_sets.add(), key_names(keys))
+        context = fake_bpy.Context(scene)
+        context.selected_objects = [fake_bpy.new_object("object_%d" % i, vertices)
+                                    for i in range(objects)]
+        return context
+
+    return best_of(repeat, setup, lambda context: SHAPEKEY_SETS_OT_add().execute(context))
+
+
+def bench_list_action(addon, action, items, duplicates, repeat):
+    from shapekey_sets.op import SHAPEKEY_SETS_OT_base_list_actions
+
+    def setup():
+        scene = fake_bpy.new_scene()
+        shapekey_set = scene.shapekey_sets.add()
+        unique = max(int(items * (1 - duplicates)), 1)
+        fill_set(shapekey_set, [name for name, _ in zip(
+            itertools.cycle(key_names(unique)), range(items))])
+        shapekey_set.active_shapekey_index = items // 2
+        operator = SHAPEKEY_SETS_OT_base_list_actions()
+        operator.action = action
+        return operator, shapekey_set
+
+    def run(state):
+        operator, shapekey_set = state
+        operator.list_actions(shapekey_set, "shapekeys",
+                              "active_shapekey_index")
+
+    return best_of(repeat, setup, run)
+
+
+def bench_initialize(addon, sets, keys, repeat, force=False):
+    import bpy
+    from shapekey_sets.util import initialize
+
+    def setup():
+        prefs = bpy.context.preferences.addons["shapekey_sets"].preferences
+        prefs.shapekey_sets.clear()
+        for i in range(sets):
+            shapekey_set = prefs.shapekey_sets.add()
+            shapekey_set.name = "set_%d" % i
+            fill_set(shapekey_set, key_names(keys))
+        scene = fake_bpy.new_scene()
+        if force:
+            # Time restoring defaults on a scene that is already in sync
+            initialize(fake_bpy.Context().region)
+        return scene
+
+    return best_of(repeat, setup, lambda scene: initialize(fake_bpy.Context().region, force=force))
+
+
+def cases(quick: bool):
+    """
+    Parameter grid for every benchmark, as (name, function, params)
+    """
+    scale = (lambda full, small: small) if quick else (lambda full, small: full)
+
+    for vertices, keys, objects in itertools.product(
+            scale([1000, 10000, 50000], [1000, 5000]),
+            scale([52, 200], [52]),
+            scale([1, 10, 100], [1, 10])):
+        yield "apply", bench_apply, {"vertices": vertices, "keys": keys, "objects": objects}
+
+    for action, items in itertools.product(
+            ("ADD", "REMOVE", "DEDUPE", "UP", "DOWN", "CLEAR"),
+            scale([100, 1000, 10000], [100, 1000])):
+        yield "list_actions", bench_list_action, {"action": action, "items": items, "duplicates": 0.5}
+
+    for sets, keys, force in itertools.product(
+            scale([2, 20, 100], [2, 20]), scale([50, 500], [50]), (False, True)):
+        yield "initialize", bench_initialize, {"sets": sets, "keys": keys, "force": force}
+
+    for ui in (False, True):
+        yield "register", bench_register, {"ui": ui}
+
+
+def bench_register(addon, ui, repeat):
+    """
+    Enabling the addon from a fresh import, optionally followed by the UI
+    registration Blender runs from a timer afterwards
+    """
+    def setup():
+        # Drop the addon's modules so every run imports them again
+        for name in [name for name in sys.modules if name.split(".")[0] == "shapekey_sets"]:
+            del sys.modules[name]
+        return None
+
+    def run(state):
+        module = import_addon()
+        module.register()
+        if ui:
+            module.register_ui()
+
+    seconds = best_of(repeat, setup, run)
+    # Later cases use the addon and fake bpy the benchmarks started with
+    for name in [name for name in sys.modules if name.split(".")[0] == "shapekey_sets"]:
+        del sys.modules[name]
+    load_addon()
+    return seconds
+
+
+def case_id(result) -> str:
+    return result["case"] + " " + " ".join("%s=%s" % item for item in sorted(result["params"].items()))
+
+
+def compare(results, baseline_file):
+    with open(baseline_file) as file:
+        baseline = {case_id(result): result["seconds"]
+                    for result in json.load(file)["results"]}
+
+    for result in results:
+        before = baseline.get(case_id(result))
+        if before:
+            print("%-60s %9.4fs -> %9.4fs  x%.2f" % (
+                case_id(result), before, result["seconds"], before / result["seconds"]))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    parser.add_argument("--filter", help="Only run cases with this name")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true",
+                        help="Smaller parameter grid")
+    args = parser.parse_args(argv)
+
+    addon = load_addon()
+    results = []
+    for name, function, params in cases(args.quick):
+        if args.filter and name != args.filter:
+            continue
+        seconds = function(addon, repeat=args.repeat, **params)
+        results.append({"case": name, "params": params, "seconds": seconds})
+        print("%-60s %9.4fs" % (case_id(results[-1]), seconds))
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"version": ".".join(map(str, addon.bl_info["version"])),
+                       "python": platform.python_version(), "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
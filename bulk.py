@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+from bpy.types import Mesh, Object, ShapeKey
+
+from .core import missing_key_names
+
+# -----------------------------------------------------------------------------
+#   Bulk Shape Key Creation
+# -----------------------------------------------------------------------------
+
+
+def existing_key_names(mesh: Mesh) -> Set[str]:
+    """
+    Collect the names of every shape key on a mesh in a single pass, so
+    membership checks don't go through the key_blocks RNA lookup per key.
+
+    :param mesh: The mesh datablock that owns the shape keys
+    """
+    if mesh.shape_keys is None:
+        return set()
+    return {key_block.name for key_block in mesh.shape_keys.key_blocks}
+
+
+def value_data_path(name: str) -> str:
+    """
+    Data path of a shape key's value relative to its Key, for f-curves and
+    drivers
+    """
+    return 'key_blocks["%s"].value' % name.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def read_coords(key_block: ShapeKey) -> np.ndarray:
+    """
+    Read all vertex coordinates of a shape key into a flat float32 buffer
+    """
+    buffer = np.empty(len(key_block.data) * 3, dtype=np.float32)
+    key_block.data.foreach_get("co", buffer)
+    return buffer
+
+
+def read_vertex_coords(mesh: Mesh) -> np.ndarray:
+    """
+    Read a mesh's vertex coordinates into a flat float32 buffer, for meshes
+    that don't have a reference key yet
+    """
+    buffer = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", buffer)
+    return buffer
+
+
+def reference_coords(mesh: Mesh) -> np.ndarray:
+    """
+    Coordinates of the mesh's reference key, or its vertices without one
+    """
+    if mesh.shape_keys is None:
+        return read_vertex_coords(mesh)
+    return read_coords(mesh.shape_keys.reference_key)
+
+
+def write_coords(key_block: ShapeKey, buffer: np.ndarray):
+    """
+    Write a flat float32 buffer back into a shape key's vertex coordinates
+    """
+    key_block.data.foreach_set("co", buffer)
+
+
+def add_shape_keys(object: Object, names: Iterable[str],
+                   coords: Optional[Dict[str, np.ndarray]] = None) -> List[ShapeKey]:
+    """
+    Create a batch of shape keys on an object. Keys are created from the
+    reference key instead of the evaluated mix, which is what makes each add
+    a plain copy rather than a full shape key evaluation. Coordinate buffers
+    are written afterwards in one foreach_set per key.
+
+    :param object: The object whose mesh receives the keys
+    :param names: Names of the keys to create, assumed not to exist yet
+    :param coords: Optional flat coordinate buffers to seed keys with, by name
+    """
+    created = [object.shape_key_add(name=name, from_mix=False)
+               for name in names]
+
+    if coords:
+        for key_block in created:
+            buffer = coords.get(key_block.name)
+            if buffer is not None:
+                write_coords(key_block, buffer)
+
+    return created
+
+
+def apply_key_names(object: Object, names: List[str]) -> Tuple[int, int]:
+    """
+    Add every name that is missing from an object's mesh.
+    Returns the number of keys created and skipped.
+
+    :param object: A MESH object
+    :param names: Shape key names to ensure, in order
+    """
+    missing = missing_key_names(names, existing_key_names(object.data))
+    add_shape_keys(object, missing)
+    return len(missing), len(names) - len(missing)
@@ -0,0 +1,173 @@
+import csv
+from array import array
+from typing import Dict, IO, List, Tuple
+import numpy as np
+import bpy
+
+from bpy.types import FCurve, Object
+
+from .bulk import existing_key_names, value_data_path
+
+# -----------------------------------------------------------------------------
+#   Face Capture Import
+# -----------------------------------------------------------------------------
+
+# Keyframe interpolation enums are read and written as integers in bulk,
+# 'LINEAR' is 1 after 'CONSTANT'
+INTERPOLATION_LINEAR = 1
+
+
+def parse_timecode(timecode: str, fps: float) -> float:
+    """
+    Seconds from a Live Link Face timecode, HH:MM:SS:FF with an optional
+    fraction of a frame
+
+    :param fps: The frame rate the capture was recorded at
+    """
+    hours, minutes, seconds, frames = timecode.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + float(frames) / fps
+
+
+def map_columns(header: List[str], names: List[str]) -> Dict[int, str]:
+    """
+    Match CSV columns to key names, ignoring case, since Live Link Face
+    writes EyeBlinkLeft where the ARKit set has eyeBlinkLeft.
+    Returns key names by column index.
+    """
+    by_lower = {name.lower(): name for name in names}
+    return {column: by_lower[cell.strip().lower()] for column, cell in enumerate(header)
+            if cell.strip().lower() in by_lower}
+
+
+def read_capture(file: IO[str], names: List[str], fps: float) -> Tuple[np.ndarray, Dict[str, np.ndarray], List[str]]:
+    """
+    Stream a Live Link Face CSV into one array of times and one array of
+    values per matched key. Rows are parsed one at a time into compact
+    arrays, never holding the text of the whole file.
+    Returns the times in seconds, the values by key name, and the header
+    cells that didn't match a key.
+
+    :param file: An open CSV file with a Timecode column
+    :param names: Key names to read curves for
+    :param fps: The frame rate the capture was recorded at
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if not header:
+        raise ValueError("The file is empty")
+
+    lowered = [cell.strip().lower() for cell in header]
+    if "timecode" not in lowered:
+        raise ValueError("No Timecode column, this doesn't look like a Live Link Face capture")
+    time_column = lowered.index("timecode")
+
+    columns = map_columns(header, names)
+    unmatched = [cell for column, cell in enumerate(header)
+                 if column not in columns and column != time_column]
+
+    times = array("d")
+    values = {column: array("f") for column in columns}
+    for row in reader:
+        if len(row) < len(header):
+            continue
+        times.append(parse_timecode(row[time_column], fps))
+        for column, buffer in values.items():
+            buffer.append(float(row[column]))
+
+    return (np.frombuffer(times, dtype=np.float64),
+            {columns[column]: np.frombuffer(buffer, dtype=np.float32) for column, buffer in values.items()},
+            unmatched)
+
+
+def decimate(frames: np.ndarray, values: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Indices of the samples to keep so that linear interpolation between
+    them stays within tolerance of every dropped sample, found with the
+    Ramer-Douglas-Peucker algorithm. The deviation of each span is computed
+    in one vectorized pass.
+    """
+    count = len(values)
+    if count < 3 or tolerance <= 0:
+        return np.arange(count)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    spans = [(0, count - 1)]
+    while spans:
+        first, last = spans.pop()
+        if last - first < 2:
+            continue
+        inner = slice(first + 1, last)
+        duration = frames[last] - frames[first]
+        slope = (values[last] - values[first]) / duration if duration else 0.0
+        error = np.abs(values[inner] - (values[first] + slope * (frames[inner] - frames[first])))
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            spans.append((first, split))
+            spans.append((split, last))
+    return np.flatnonzero(keep)
+
+
+def write_fcurve(fcurve: FCurve, frames: np.ndarray, values: np.ndarray):
+    """
+    Write an empty f-curve's keyframes in one shot: a single add() for all
+    points and a single foreach_set() of interleaved frame/value pairs.
+    Keyframes interpolate linearly, which is what decimate() keeps samples
+    for, where the default Bezier curves would overshoot between them.
+    """
+    points = fcurve.keyframe_points
+    points.add(len(frames))
+
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+    points.foreach_set("co", co)
+    points.foreach_set("interpolation", np.full(len(frames), INTERPOLATION_LINEAR, dtype=np.int32))
+    fcurve.update()
+
+
+def import_capture(object: Object, times: np.ndarray, curves: Dict[str, np.ndarray], frame_start: float,
+                   scene_fps: float, tolerance: float = 0.0) -> Tuple[int, int]:
+    """
+    Write captured curves onto the shape key values of an object's mesh,
+    into the action of its shape keys. Curves for keys the mesh doesn't
+    have are skipped.
+    Returns the number of curves and keyframes written.
+
+    :param times: Sample times in seconds
+    :param curves: Sample values by key name
+    :param frame_start: Frame of the first sample
+    :param scene_fps: Frames per second of the scene
+    :param tolerance: Drop samples that linear interpolation reproduces
+        within this value, 0 keeps every sample
+    """
+    shape_keys = object.data.shape_keys
+    if shape_keys is None or len(times) == 0:
+        return 0, 0
+
+    existing = existing_key_names(object.data)
+    frames = frame_start + (times - times[0]) * scene_fps
+
+    animation_data = shape_keys.animation_data or shape_keys.animation_data_create()
+    if animation_data.action is None:
+        animation_data.action = bpy.data.actions.new(name="%s Capture" % object.data.name)
+    fcurves = animation_data.action.fcurves
+
+    curve_count = keyframe_count = 0
+    for name, values in curves.items():
+        if name not in existing:
+            continue
+        data_path = value_data_path(name)
+        # Recreating a curve is cheaper than removing its keyframes one by one
+        fcurve = fcurves.find(data_path)
+        if fcurve is not None:
+            fcurves.remove(fcurve)
+        fcurve = fcurves.new(data_path)
+        keep = decimate(frames, values, tolerance)
+        write_fcurve(fcurve, frames[keep], values[keep])
+        curve_count += 1
+        keyframe_count += len(keep)
+
+    return curve_count, keyframe_count
@@ -0,0 +1,180 @@
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from bpy.app.handlers import persistent
+
+from .core import merge_names, names_fingerprint
+
+# -----------------------------------------------------------------------------
+#   Set Composition
+# -----------------------------------------------------------------------------
+
+
+class ResolvedSet(NamedTuple):
+    names: Tuple[str, ...]
+    # Digest of names, for caches keyed on what a set resolves to
+    fingerprint: str
+    # Includes that were skipped because they lead back to a set being resolved
+    cycles: Tuple[str, ...]
+    # Includes naming sets that don't exist
+    missing: Tuple[str, ...]
+    # Names and versions of the sets this was resolved from
+    versions: Tuple[Tuple[str, int], ...]
+
+
+# Resolved sets by scope and set pointer, valid while _generation is unchanged
+# and the sets they were resolved from keep their versions
+_resolved: Dict[tuple, ResolvedSet] = {}
+_generation = 0
+_resolved_generation = 0
+# Versions of sets by name, changed when a set's keys, includes or poses do
+_versions: Dict[str, int] = {}
+
+
+def invalidate_resolved(*args):
+    """
+    Forget every resolved set. Called when sets are added, removed, renamed
+    or replaced, which changes what includes refer to, and when aliases
+    change, which are looked up across all sets.
+    """
+    global _generation
+    _generation += 1
+
+
+def invalidate_set(name: str):
+    """
+    Forget what was derived from one set. Sets that include it are resolved
+    again too, since they hold its version.
+
+    :param name: The name of the ShapekeySet whose keys, includes or poses changed
+    """
+    _versions[name] = _versions.get(name, 0) + 1
+
+
+def invalidate_owner(item, context=None):
+    """
+    Update callback of keys, includes and poses, invalidating the set that
+    holds the item. Items of the addon preferences, which don't belong to an
+    ID, invalidate every set.
+    """
+    try:
+        path = item.path_from_id()
+    except ValueError:
+        invalidate_resolved()
+        return
+    invalidate_set(item.id_data.path_resolve(path.rpartition(".")[0]).name)
+
+
+def generation() -> int:
+    """
+    Counter that changes whenever sets are added, removed or renamed, for
+    caches derived from the list of sets
+    """
+    return _generation
+
+
+def set_version(name: str) -> int:
+    """
+    Counter that changes whenever the set of this name does, for caches
+    derived from one set
+    """
+    return _versions.get(name, 0)
+
+
+def is_current(versions: Iterable[Tuple[str, int]]) -> bool:
+    """
+    Whether every set in a list of names and versions is still at that version
+    """
+    return all(_versions.get(name, 0) == version for name, version in versions)
+
+
+@persistent
+def clear_resolved(*args):
+    """
+    Set pointers change on undo and file load
+    """
+    invalidate_resolved()
+    _resolved.clear()
+
+
+def _resolve(sets_by_name: dict, shapekey_set, stack: Tuple[str, ...], scope) -> ResolvedSet:
+    key = (scope, shapekey_set.as_pointer())
+    cached = _resolved.get(key)
+    # A set cut short by a cycle resolves differently from another entry
+    # point, so such results are only reused for the set that was asked for
+    if cached is not None and (not cached.cycles or not stack) and is_current(cached.versions):
+        return cached
+
+    stack = stack + (shapekey_set.name,)
+    included_names = []
+    cycles = []
+    missing = []
+    versions = [(shapekey_set.name, set_version(shapekey_set.name))]
+
+    for include in shapekey_set.includes:
+        included = sets_by_name.get(include.name)
+        if included is None:
+            missing.append(include.name)
+        elif include.name in stack:
+            cycles.append(include.name)
+        else:
+            resolved = _resolve(sets_by_name, included, stack, scope)
+            included_names.append(resolved.names)
+            cycles.extend(resolved.cycles)
+            missing.extend(resolved.missing)
+            versions.extend(resolved.versions)
+
+    resolved_names = merge_names(included_names, ((shapekey.name, shapekey.enabled, shapekey.exclude)
+                                                  for shapekey in shapekey_set.shapekeys))
+    result = ResolvedSet(resolved_names, names_fingerprint(resolved_names),
+                         tuple(dict.fromkeys(cycles)), tuple(dict.fromkeys(missing)), tuple(dict.fromkeys(versions)))
+    if not cycles or len(stack) == 1:
+        _resolved[key] = result
+    return result
+
+
+def resolve_set(shapekey_sets, shapekey_set) -> ResolvedSet:
+    """
+    Flatten a set's includes into one list of key names, in the order
+    core.merge_names() gives them.
+
+    Results are memoized until the set or one it includes changes, so
+    apply, audit and drawing don't walk the include graph every time.
+
+    :param shapekey_sets: The collection of ShapekeySets includes refer to,
+        or the SetView of a Scene using shared sets
+    :param shapekey_set: A ShapekeySet of that collection
+    """
+    global _resolved_generation
+
+    if _resolved_generation != _generation:
+        _resolved.clear()
+        _resolved_generation = _generation
+
+    # Shared sets resolve differently per Scene, whose overrides can replace what they include
+    scope = getattr(shapekey_sets, "key", None)
+    cached = _resolved.get((scope, shapekey_set.as_pointer()))
+    if cached is not None and is_current(cached.versions):
+        return cached
+
+    sets_by_name = {}
+    for item in shapekey_sets:
+        sets_by_name.setdefault(item.name, item)
+    return _resolve(sets_by_name, shapekey_set, (), scope)
+
+
+def resolved_key_names(shapekey_sets, shapekey_set) -> List[str]:
+    """
+    Names of the keys a set resolves to, in order
+    """
+    return list(resolve_set(shapekey_sets, shapekey_set).names)
+
+
+def flattened_keys(shapekey_sets, shapekey_set) -> List[Tuple[str, bool]]:
+    """
+    A set's keys as (name, enabled) pairs for files, which can't refer to
+    other sets. Sets without includes or exclusions keep their disabled
+    keys, composed sets are written as the keys they resolve to.
+    """
+    if not shapekey_set.includes and not any(shapekey.exclude for shapekey in shapekey_set.shapekeys):
+        return [(shapekey.name, shapekey.enabled) for shapekey in shapekey_set.shapekeys]
+    return [(name, True) for name in resolve_set(shapekey_sets, shapekey_set).names]
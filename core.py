@@ -0,0 +1,266 @@
+import hashlib
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+# Nothing here may import bpy: these are the parts of the addon that work on
+# plain names and tuples, so they run and can be tested outside Blender
+
+# -----------------------------------------------------------------------------
+#   Set Model
+# -----------------------------------------------------------------------------
+
+
+class SetSpec(NamedTuple):
+    """
+    A Shapekey Set as plain data
+
+    :param name: The set's name
+    :param keys: (name, enabled, exclude) per key, in list order
+    :param includes: Names of the sets whose keys come first
+    """
+    name: str
+    keys: Tuple[Tuple[str, bool, bool], ...] = ()
+    includes: Tuple[str, ...] = ()
+
+
+class Resolution(NamedTuple):
+    names: Tuple[str, ...]
+    # Includes that were skipped because they lead back to a set being resolved
+    cycles: Tuple[str, ...]
+    # Includes naming sets that don't exist
+    missing: Tuple[str, ...]
+
+
+def spec_from_names(name: str, names: Iterable[str]) -> SetSpec:
+    """
+    A set of enabled keys, like the premade sets of default_sets
+    """
+    return SetSpec(name, tuple((key_name, True, False) for key_name in names))
+
+
+def missing_key_names(names: Iterable[str], existing: Set[str]) -> List[str]:
+    """
+    Names that still have to be created, in set order and without repeats.
+
+    :param names: Shape key names requested by a Shapekey Set
+    :param existing: Names already present on the mesh
+    """
+    seen = set(existing)
+    missing = []
+    for name in names:
+        if name not in seen:
+            seen.add(name)
+            missing.append(name)
+    return missing
+
+
+def duplicate_indices(names: Iterable[str]) -> List[int]:
+    """
+    Indices of every name that already occurred earlier, in order
+    """
+    seen = set()
+    duplicates = []
+    for index, name in enumerate(names):
+        if name in seen:
+            duplicates.append(index)
+        else:
+            seen.add(name)
+    return duplicates
+
+
+# -----------------------------------------------------------------------------
+#   Composition
+# -----------------------------------------------------------------------------
+
+
+def names_fingerprint(names: Tuple[str, ...]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for name in names:
+        digest.update(name.encode() + b"\0")
+    return digest.hexdigest()
+
+
+def merge_names(included: Iterable[Iterable[str]], keys: Iterable[Tuple[str, bool, bool]]) -> Tuple[str, ...]:
+    """
+    The names a set resolves to, given what its includes resolved to. Included
+    names come first, in include order, followed by the set's own enabled
+    keys. Excluded keys are left out wherever they came from, and every name
+    is kept at its first occurrence only.
+
+    :param included: The resolved names of each include, in order
+    :param keys: The set's own (name, enabled, exclude) keys
+    """
+    names: Dict[str, None] = {}
+    for included_names in included:
+        names.update(dict.fromkeys(included_names))
+
+    excluded = set()
+    for name, enabled, exclude in keys:
+        if exclude:
+            excluded.add(name)
+        elif enabled:
+            names.setdefault(name)
+
+    return tuple(name for name in names if name not in excluded)
+
+
+def resolve_specs(specs: Dict[str, SetSpec], name: str, stack: Tuple[str, ...] = ()) -> Resolution:
+    """
+    Flatten a set's includes the way compose.resolve_set() does, for sets
+    given as plain data. Includes that would loop back to a set being
+    resolved are skipped and reported.
+
+    :param specs: Every set includes can refer to, by name
+    :param name: The name of the set to resolve, must be in specs
+    """
+    spec = specs[name]
+    stack = stack + (name,)
+    included = []
+    cycles = []
+    missing = []
+
+    for include in spec.includes:
+        if include not in specs:
+            missing.append(include)
+        elif include in stack:
+            cycles.append(include)
+        else:
+            resolved = resolve_specs(specs, include, stack)
+            included.append(resolved.names)
+            cycles.extend(resolved.cycles)
+            missing.extend(resolved.missing)
+
+    return Resolution(merge_names(included, spec.keys),
+                      tuple(dict.fromkeys(cycles)), tuple(dict.fromkeys(missing)))
+
+
+# -----------------------------------------------------------------------------
+#   Key Order Planning
+# -----------------------------------------------------------------------------
+
+
+def longest_increasing_subsequence(values: List[int]) -> Set[int]:
+    """
+    Positions in values that form a longest strictly increasing subsequence,
+    found in O(n log n)
+    """
+    tails = []
+    tail_positions = []
+    previous = [-1] * len(values)
+    for position, value in enumerate(values):
+        slot = bisect_left(tails, value)
+        if slot == len(tails):
+            tails.append(value)
+            tail_positions.append(position)
+        else:
+            tails[slot] = value
+            tail_positions[slot] = position
+        previous[position] = tail_positions[slot - 1] if slot > 0 else -1
+
+    kept = set()
+    position = tail_positions[-1] if tail_positions else -1
+    while position >= 0:
+        kept.add(position)
+        position = previous[position]
+    return kept
+
+
+def plan_moves(current: List[str], desired: List[str]) -> List[Tuple[str, int, int]]:
+    """
+    Moves that reorder current into desired, leaving the longest run of keys
+    that are already in the right relative order in place. Every other key
+    is moved once, to just behind its predecessor in desired.
+    Returns (name, from, to) tuples, with indices as they are at the time
+    of each move.
+
+    :param current: Key names in their current order
+    :param desired: The same names in the order they should end up in
+    """
+    position = {name: index for index, name in enumerate(current)}
+    fixed = longest_increasing_subsequence([position[name] for name in desired])
+
+    order = list(current)
+    moves = []
+    for index, name in enumerate(desired):
+        if index in fixed:
+            continue
+        source = order.index(name)
+        order.pop(source)
+        target = order.index(desired[index - 1]) + 1 if index > 0 else 0
+        order.insert(target, name)
+        if source != target:
+            moves.append((name, source, target))
+    return moves
+
+
+def desired_order(current: List[str], names: List[str], remove_extra: bool) -> List[str]:
+    """
+    The order a mesh's keys should have after syncing to a set. The first
+    key is the reference key and stays first. Set keys follow in set order,
+    then any keys that aren't in the set, in their current order.
+
+    :param current: Key names in their current order
+    :param names: Key names of the set
+    :param remove_extra: Leave out keys that aren't in the set
+    """
+    present = set(current[1:])
+    wanted = set(names)
+    order = current[:1]
+    order.extend(name for name in dict.fromkeys(names) if name in present)
+    if not remove_extra:
+        order.extend(name for name in current[1:] if name not in wanted)
+    return order
+
+
+def move_steps(source: int, target: int, last: int) -> List[str]:
+    """
+    The cheapest sequence of shape_key_move operations taking a key from one
+    index to another, for keys below the reference key. TOP moves a key to
+    index 1 and BOTTOM to the last index, UP and DOWN move by one.
+
+    :param last: The highest key index
+    """
+    options = [
+        ['UP'] * (source - target) if source > target else ['DOWN'] * (target - source),
+        ['TOP'] + ['DOWN'] * (target - 1),
+        ['BOTTOM'] + ['UP'] * (last - target),
+    ]
+    return min(options, key=len)
+
+
+# -----------------------------------------------------------------------------
+#   Compliance Diff
+# -----------------------------------------------------------------------------
+
+
+class AuditResult(NamedTuple):
+    missing: Tuple[str, ...]
+    extra: Tuple[str, ...]
+    out_of_order: Tuple[str, ...]
+
+    @property
+    def compliant(self) -> bool:
+        return not (self.missing or self.extra or self.out_of_order)
+
+
+def audit_keys(names: Tuple[str, ...], set_names: List[str]) -> AuditResult:
+    """
+    Compare a mesh's key names against a set's enabled keys. The reference
+    key is never counted as extra. Out of order are the keys that would
+    have to move to follow the set, so keys that are already in the right
+    relative order don't count.
+
+    :param names: The mesh's key names, reference key first
+    :param set_names: The set's enabled key names, in order
+    """
+    position = {name: index for index, name in enumerate(names)}
+    wanted = set(set_names)
+
+    missing = tuple(name for name in set_names if name not in position)
+    extra = tuple(name for name in names[1:] if name not in wanted)
+
+    present = [name for name in dict.fromkeys(set_names) if position.get(name, 0) > 0]
+    in_order = longest_increasing_subsequence([position[name] for name in present])
+    out_of_order = tuple(name for index, name in enumerate(present) if index not in in_order)
+
+    return AuditResult(missing, extra, out_of_order)
@@ -0,0 +1,145 @@
+import re
+from typing import Dict, List
+
+from bpy.types import Driver, FCurve, Object
+
+from .bulk import existing_key_names, value_data_path
+
+# -----------------------------------------------------------------------------
+#   Driver Wiring
+# -----------------------------------------------------------------------------
+
+DEFAULT_DRIVER_PATH = '["{name}"]'
+
+# Key value drivers, found by their data path
+_value_path = re.compile(r'^key_blocks\[".*"\]\.value$')
+# Paths naming a custom property of the target itself
+_custom_property = re.compile(r'^\["((?:[^"\\]|\\.)*)"\]$')
+
+
+def expand_path(template: str, name: str, set_name: str) -> str:
+    """
+    The target data path driving a key, from a template where {name} stands
+    for the key's name and {set} for the set's
+
+    :raises KeyError: For placeholders other than {name} and {set}
+    """
+    return template.format(name=name, set=set_name)
+
+
+def is_wired(driver: Driver, target: Object, data_path: str) -> bool:
+    """
+    Whether a driver already passes a single property of the target through
+    """
+    if driver.type != 'AVERAGE' or len(driver.variables) != 1:
+        return False
+    variable = driver.variables[0]
+    if variable.type != 'SINGLE_PROP':
+        return False
+    variable_target = variable.targets[0]
+    return (variable_target.id_type == 'OBJECT' and variable_target.id == target
+            and variable_target.data_path == data_path)
+
+
+def wire(driver: Driver, target: Object, data_path: str):
+    """
+    Make a driver pass a single property of the target through, replacing
+    whatever it did before
+    """
+    driver.type = 'AVERAGE'
+    variables = driver.variables
+    while len(variables) > 0:
+        variables.remove(variables[0])
+    variable = variables.new()
+    variable.name = "value"
+    variable.type = 'SINGLE_PROP'
+    variable_target = variable.targets[0]
+    variable_target.id_type = 'OBJECT'
+    variable_target.id = target
+    variable_target.data_path = data_path
+
+
+class DriverWiring():
+    """
+    Wires shape key values to properties of one target object. Each mesh's
+    existing drivers are indexed by data path in a single pass, so every key
+    is checked with a dictionary lookup and drivers that are already correct
+    are left untouched.
+
+    :param target: The object owning the driving properties, like a control rig
+    :param template: Target data path template, see expand_path()
+    :param set_name: Name of the set, for the {set} placeholder
+    :param remove_other: Remove drivers of key values that aren't in the set
+    :param add_properties: Create missing custom properties on the target
+        when the path names one
+    """
+
+    def __init__(self, target: Object, template: str, set_name: str,
+                 remove_other: bool = False, add_properties: bool = False):
+        self.target = target
+        self.template = template
+        self.set_name = set_name
+        self.remove_other = remove_other
+        self.add_properties = add_properties
+        self.counts: Dict[str, int] = {"created": 0, "reused": 0, "refreshed": 0, "removed": 0, "properties": 0}
+        self._paths: Dict[str, str] = {}
+
+    def target_path(self, name: str) -> str:
+        path = self._paths.get(name)
+        if path is None:
+            path = self._paths[name] = expand_path(self.template, name, self.set_name)
+            if self.add_properties:
+                self._add_property(path)
+        return path
+
+    def _add_property(self, path: str):
+        match = _custom_property.match(path)
+        if match is None:
+            return
+        property_name = match.group(1).replace('\\"', '"').replace("\\\\", "\\")
+        if property_name not in self.target:
+            self.target[property_name] = 0.0
+            self.counts["properties"] += 1
+
+    def apply(self, object: Object, names: List[str]):
+        """
+        Create or refresh the drivers of every set key the object's mesh has
+
+        :param object: A MESH object
+        :param names: The set's key names
+        """
+        shape_keys = object.data.shape_keys
+        if shape_keys is None:
+            return
+
+        animation_data = shape_keys.animation_data or shape_keys.animation_data_create()
+        drivers = animation_data.drivers
+        index: Dict[str, FCurve] = {fcurve.data_path: fcurve for fcurve in drivers}
+
+        existing = existing_key_names(object.data)
+        # The reference key's value does nothing, so it's never driven
+        existing.discard(shape_keys.reference_key.name)
+        wanted = set()
+        for name in names:
+            if name not in existing:
+                continue
+            data_path = value_data_path(name)
+            wanted.add(data_path)
+            target_path = self.target_path(name)
+
+            fcurve = index.get(data_path)
+            if fcurve is None:
+                fcurve = drivers.new(data_path)
+                wire(fcurve.driver, self.target, target_path)
+                self.counts["created"] += 1
+            elif is_wired(fcurve.driver, self.target, target_path):
+                self.counts["reused"] += 1
+            else:
+                wire(fcurve.driver, self.target, target_path)
+                self.counts["refreshed"] += 1
+
+        if self.remove_other:
+            for data_path, fcurve in index.items():
+                if data_path not in wanted and _value_path.match(data_path):
+                    drivers.remove(fcurve)
+                    self.counts["removed"] += 1
@@ -0,0 +1,115 @@
+import heapq
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import bpy
+from bpy.types import Context, Operator
+
+# Most recent timings, newest last, shown in the debug panel
+history = deque(maxlen=50)
+
+# -----------------------------------------------------------------------------
+#   Instrumentation
+# -----------------------------------------------------------------------------
+
+
+class Timing():
+    """
+    What a single operator run did and how long it took. Collecting is cheap
+    enough to always happen, publish() decides whether anyone sees it.
+
+    :param operator: The operator's bl_idname
+    """
+
+    def __init__(self, operator: str):
+        self.operator = operator
+        self.message = ""
+        self.counters: Dict[str, int] = {}
+        self.costs: Dict[str, float] = {}
+        self.seconds = 0.0
+        self._start = time.perf_counter()
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+        Add the time spent in the block to the cost of an object
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.costs[name] = self.costs.get(
+                name, 0.0) + time.perf_counter() - start
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._start
+
+    def slowest(self, count: int = 5) -> List[Tuple[str, float]]:
+        return heapq.nlargest(count, self.costs.items(), key=lambda item: item[1])
+
+    def summary(self) -> str:
+        parts = ["%.1f ms" % (self.seconds * 1000)]
+        parts.extend("%s %d" % item for item in self.counters.items())
+        if self.message:
+            parts.append(self.message)
+        return ", ".join(parts)
+
+    def as_dict(self) -> dict:
+        return {
+            "operator": self.operator,
+            "time": time.time(),
+            "seconds": self.seconds,
+            "counters": self.counters,
+            "slowest": self.slowest(),
+            "message": self.message,
+        }
+
+
+def is_enabled(context: Context) -> bool:
+    prefs = context.preferences.addons[__package__].preferences
+    return prefs.use_instrumentation
+
+
+def publish(operator: Operator, context: Context, timing: Timing):
+    """
+    Report a finished timing, keep it in the history and append it to the
+    log file when instrumentation is enabled in the addon preferences
+
+    :param operator: The operator that ran, used for reporting
+    :param context: The operator's context
+    :param timing: The finished timing
+    """
+    prefs = context.preferences.addons[__package__].preferences
+    if not prefs.use_instrumentation:
+        return
+
+    operator.report({'INFO'}, timing.summary())
+
+    entry = timing.as_dict()
+    history.append(entry)
+
+    if prefs.instrumentation_log:
+        try:
+            with open(bpy.path.abspath(prefs.instrumentation_log), "a") as file:
+                file.write(json.dumps(entry) + "\n")
+        except OSError as error:
+            operator.report({'WARNING'}, "Could not write timing log: %s" % error)
+
+
+@contextmanager
+def instrumented(operator: Operator, context: Context) -> Iterator[Timing]:
+    """
+    Time the block and publish the result when it exits
+    """
+    timing = Timing(operator.bl_idname)
+    try:
+        yield timing
+    finally:
+        timing.finish()
+        publish(operator, context, timing)
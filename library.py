@@ -0,0 +1,180 @@
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+# -----------------------------------------------------------------------------
+#   Shapekey Set Library
+# -----------------------------------------------------------------------------
+
+# One library per directory, so the index and cache survive between operators
+_libraries = {}
+
+
+def parse_keys(keys: list) -> List[Tuple[str, bool]]:
+    """
+    Read a set's keys from a library file. Keys are plain names, or objects
+    with a name and an enabled flag for disabled keys.
+    """
+    return [(key, True) if isinstance(key, str) else (key["name"], key.get("enabled", True))
+            for key in keys]
+
+
+def dump_keys(keys: List[Tuple[str, bool]]) -> list:
+    return [name if enabled else {"name": name, "enabled": False} for name, enabled in keys]
+
+
+class SetLibrary():
+    """
+    A directory of Shapekey Set files, shaped like default_sets: a JSON
+    object mapping set names to their keys. A file may hold any number of
+    sets.
+
+    The names and key counts of all sets are kept in a small index file, so
+    listing the library never reads the set files. Only files whose
+    modification time changed are read again when the index is refreshed,
+    and a set's keys are only loaded when they're asked for, through an LRU
+    cache.
+
+    :param directory: The library directory
+    :param cache_size: Number of loaded sets kept in memory
+    """
+    INDEX = "index.json"
+
+    def __init__(self, directory: str, cache_size: int = 32):
+        self.directory = directory
+        self.cache_size = cache_size
+        self._index = None
+        self._directory_mtime = None
+        self._cache: "OrderedDict[str, Tuple[float, List[Tuple[str, bool]]]]" = OrderedDict()
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+    def _set_files(self) -> Dict[str, float]:
+        return {entry.name: entry.stat().st_mtime for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".json") and entry.name != self.INDEX}
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._path(self.INDEX)) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return {"files": {}, "sets": {}}
+        return index if index.get("version") == 1 else {"files": {}, "sets": {}}
+
+    def _write_index(self):
+        with open(self._path(self.INDEX), "w") as file:
+            json.dump(dict(self._index, version=1), file, indent=1)
+
+    def refresh(self, force: bool = False) -> Dict[str, dict]:
+        """
+        Bring the index up to date with the directory. Set files are only
+        read when they were added or modified since the index was written.
+        """
+        index = self._read_index() if self._index is None or force else self._index
+        files = self._set_files()
+
+        stale = {name for name, mtime in files.items()
+                 if index["files"].get(name) != mtime}
+        removed = set(index["files"]) - set(files)
+
+        if stale or removed or self._index is None:
+            sets = {name: entry for name, entry in index["sets"].items()
+                    if entry["file"] not in stale and entry["file"] not in removed}
+            for file_name in sorted(stale):
+                try:
+                    with open(self._path(file_name)) as file:
+                        content = json.load(file)
+                except (OSError, ValueError):
+                    continue
+                if not isinstance(content, dict):
+                    continue
+                for set_name, keys in content.items():
+                    sets[set_name] = {"file": file_name, "keys": len(keys)}
+
+            changed = bool(stale or removed)
+            self._index = {"files": files, "sets": sets}
+            if changed:
+                self._write_index()
+
+        self._directory_mtime = os.stat(self.directory).st_mtime
+        return self._index["sets"]
+
+    def index(self) -> Dict[str, dict]:
+        """
+        Set names mapped to their file and key count. The directory is only
+        rescanned when its own modification time changed, which happens when
+        files are added, removed or renamed.
+        """
+        if self._index is None or os.stat(self.directory).st_mtime != self._directory_mtime:
+            return self.refresh()
+        return self._index["sets"]
+
+    def cached_index(self) -> Dict[str, dict]:
+        """
+        The index as of the last refresh, without touching the disk. Empty
+        until the library was refreshed once.
+        """
+        return self._index["sets"] if self._index is not None else {}
+
+    def load(self, set_name: str) -> List[Tuple[str, bool]]:
+        """
+        The keys of a set as (name, enabled) pairs, from the cache when the
+        file hasn't changed since it was last read
+        """
+        entry = self.index()[set_name]
+        path = self._path(entry["file"])
+        mtime = os.stat(path).st_mtime
+
+        cached = self._cache.get(set_name)
+        if cached is not None and cached[0] == mtime:
+            self._cache.move_to_end(set_name)
+            return cached[1]
+
+        with open(path) as file:
+            keys = parse_keys(json.load(file)[set_name])
+
+        self._cache[set_name] = (mtime, keys)
+        self._cache.move_to_end(set_name)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return keys
+
+    def save(self, set_name: str, keys: List[Tuple[str, bool]]) -> str:
+        """
+        Write a set to the library. A set already in the library is
+        replaced in the file that holds it, which is rewritten with the
+        other sets it contains. A new set gets a new file named after it.
+        Returns the file name.
+        """
+        entry = self.index().get(set_name)
+        if entry is not None:
+            with open(self._path(entry["file"])) as file:
+                content = json.load(file)
+            file_name = entry["file"]
+        else:
+            content = {}
+            file_name = "".join(c if c.isalnum() or c in "-_." else "_"
+                                for c in set_name) + ".json"
+            while os.path.exists(self._path(file_name)):
+                file_name = "_" + file_name
+
+        content[set_name] = dump_keys(keys)
+        with open(self._path(file_name), "w") as file:
+            json.dump(content, file, indent=1)
+
+        self._cache.pop(set_name, None)
+        self.refresh()
+        return file_name
+
+
+def get_library(directory: str) -> SetLibrary:
+    """
+    The shared SetLibrary for a directory
+    """
+    directory = os.path.abspath(directory)
+    library = _libraries.get(directory)
+    if library is None:
+        library = _libraries[directory] = SetLibrary(directory)
+    return library
@@ -0,0 +1,131 @@
+import fnmatch
+import functools
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from bpy.app.handlers import persistent
+from bpy.types import Key
+
+# -----------------------------------------------------------------------------
+#   List Filtering
+# -----------------------------------------------------------------------------
+
+search_mode_items = (
+    ('SUBSTRING', "Contains", "Names containing the text, ignoring case"),
+    ('GLOB', "Wildcard", "Names matching a pattern with * and ?, ignoring case"),
+    ('REGEX', "Regex", "Names matching a regular expression, ignoring case"))
+
+# Last filter result per list, with the signature it was computed for
+_filters: Dict[tuple, Tuple[tuple, Tuple[List[int], List[int]]]] = {}
+# Counter bumped by every depsgraph update that touches shape keys
+_key_version = 0
+
+
+@functools.lru_cache(maxsize=32)
+def compile_search(text: str, mode: str) -> Optional[Callable[[str], bool]]:
+    """
+    Name test for a search text, or None when there is nothing to search
+    for. Compiled once per distinct text and mode.
+
+    :param text: The list's filter text
+    :param mode: One of the identifiers in search_mode_items
+    """
+    if not text:
+        return None
+    if mode == 'REGEX':
+        try:
+            pattern = re.compile(text, re.IGNORECASE)
+        except re.error:
+            # Half typed expressions match nothing rather than raising on every redraw
+            return lambda name: False
+        return lambda name: pattern.search(name) is not None
+    if mode == 'GLOB':
+        # Without wildcards a pattern searches for its text anywhere, like Blender's own filter
+        if not any(character in text for character in "*?["):
+            text = "*%s*" % text
+        pattern = re.compile(fnmatch.translate(text), re.IGNORECASE)
+        return lambda name: pattern.match(name) is not None
+    folded = text.casefold()
+    return lambda name: folded in name.casefold()
+
+
+def filter_names(names: Sequence[str], visible: int, search: Optional[Callable[[str], bool]],
+                 invert: bool = False, keep: Optional[Sequence[bool]] = None,
+                 sort_alpha: bool = False, reverse: bool = False) -> Tuple[List[int], List[int]]:
+    """
+    Filter flags and order in the shape UIList.filter_items() returns.
+    Returns a flag per item, visible for shown items, and the new position
+    of every item, or an empty list to keep the original order.
+
+    :param names: Item names, in list order
+    :param visible: The UIList's bitflag_filter_item
+    :param search: Name test from compile_search()
+    :param invert: Show the items the search doesn't match instead
+    :param keep: Per item results of other filters, which invert doesn't affect
+    :param sort_alpha: Order items by name, ignoring case
+    :param reverse: Reverse the order
+    """
+    flags = []
+    for index, name in enumerate(names):
+        shown = search is None or search(name)
+        if invert:
+            shown = not shown
+        if shown and keep is not None and not keep[index]:
+            shown = False
+        flags.append(visible if shown else 0)
+
+    if not sort_alpha and not reverse:
+        return flags, []
+    positions = sorted(range(len(names)), key=lambda index: names[index].casefold()) \
+        if sort_alpha else list(range(len(names)))
+    if reverse:
+        positions.reverse()
+    order = [0] * len(names)
+    for position, index in enumerate(positions):
+        order[index] = position
+    return flags, order
+
+
+def cached_filter(key: tuple, signature: tuple,
+                  compute: Callable[[], Tuple[List[int], List[int]]]) -> Tuple[List[int], List[int]]:
+    """
+    The last result computed for a list while its signature is unchanged.
+    Signatures are built from change counters, so checking one doesn't
+    read any item.
+
+    :param key: Identifies the list, such as its owner's pointer and property name
+    :param signature: Everything the result depends on
+    :param compute: Computes the result when the cached one is stale
+    """
+    cached = _filters.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    result = compute()
+    _filters[key] = (signature, result)
+    return result
+
+
+def key_version() -> int:
+    return _key_version
+
+
+@persistent
+def note_key_updates(scene, depsgraph):
+    """
+    Count updates of shape keys, which can add, remove or rename keys the
+    "missing on active object" filter depends on
+    """
+    global _key_version
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, Key):
+            _key_version += 1
+            return
+
+
+@persistent
+def clear_filters(*args):
+    """
+    Lists are identified by pointers, which change on undo and file load
+    """
+    _filters.clear()
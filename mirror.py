@@ -0,0 +1,167 @@
+import functools
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+
+from bpy.app.handlers import persistent
+from bpy.types import Mesh, Object
+from mathutils.kdtree import KDTree
+
+from .bulk import read_coords, write_coords
+
+# -----------------------------------------------------------------------------
+#   Left/Right Mirroring
+# -----------------------------------------------------------------------------
+
+DEFAULT_MIRROR_RULES = "Left/Right, _L/_R, .L/.R, _l/_r, .l/.r"
+
+# Vertices further than this from the mirrored position of any other vertex
+# have no counterpart and keep their reference position
+MIRROR_TOLERANCE = 1e-4
+
+# X-symmetry maps by mesh, see symmetry_map()
+_symmetry_maps: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+SYMMETRY_CACHE_SIZE = 16
+
+
+class MirrorRules():
+    """
+    Naming rules for the two sides of a mirrored key, matched at the end of
+    a name. All rules are compiled into a single pattern.
+
+    :param pairs: Suffix pairs such as ("Left", "Right")
+    """
+
+    def __init__(self, pairs: List[tuple]):
+        self.counterparts: Dict[str, str] = {}
+        for left, right in pairs:
+            self.counterparts[left] = right
+            self.counterparts[right] = left
+        # Longest suffixes first, so "Left" wins over a shorter rule it ends with
+        suffixes = sorted(self.counterparts, key=len, reverse=True)
+        self.pattern = re.compile("(?:%s)$" % "|".join(map(re.escape, suffixes))) if suffixes else None
+
+    def counterpart(self, name: str) -> Optional[str]:
+        """
+        The name of the other side of a key, or None for keys without a side
+        """
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(name)
+        if match is None or match.start() == 0:
+            return None
+        return name[:match.start()] + self.counterparts[match.group()]
+
+
+@functools.lru_cache(maxsize=8)
+def compile_rules(text: str) -> MirrorRules:
+    """
+    Rules from a comma separated list of side pairs, like "Left/Right, _L/_R".
+    Compiled once per distinct text.
+    """
+    pairs = []
+    for rule in text.split(","):
+        sides = [side.strip() for side in rule.split("/")]
+        if len(sides) == 2 and all(sides):
+            pairs.append(tuple(sides))
+    return MirrorRules(pairs)
+
+
+def build_symmetry_map(co: np.ndarray, tolerance: float = MIRROR_TOLERANCE) -> np.ndarray:
+    """
+    Index of the vertex at the X-mirrored position of every vertex, found
+    with a KD-tree, or -1 where there is none within tolerance.
+
+    :param co: (n, 3) vertex positions in the mesh's local space
+    """
+    tree = KDTree(len(co))
+    for index, point in enumerate(co.tolist()):
+        tree.insert(point, index)
+    tree.balance()
+
+    mirrored = co * np.array([-1.0, 1.0, 1.0], dtype=co.dtype)
+    indices = np.full(len(co), -1, dtype=np.int32)
+    for row, point in enumerate(mirrored.tolist()):
+        _, index, distance = tree.find(point)
+        if distance <= tolerance:
+            indices[row] = index
+    return indices
+
+
+def symmetry_map(mesh: Mesh, reference: np.ndarray) -> np.ndarray:
+    """
+    The cached symmetry map of a mesh, built on first use. Maps are keyed by
+    the mesh and a digest of its reference coordinates, so editing the basis
+    builds a new one.
+
+    :param reference: Flat reference key coordinates of the mesh
+    """
+    key = (mesh.as_pointer(), len(reference) // 3,
+           hashlib.blake2b(reference.tobytes(), digest_size=16).digest())
+    mapping = _symmetry_maps.get(key)
+    if mapping is not None:
+        _symmetry_maps.move_to_end(key)
+        return mapping
+
+    mapping = _symmetry_maps[key] = build_symmetry_map(reference.reshape(-1, 3))
+    while len(_symmetry_maps) > SYMMETRY_CACHE_SIZE:
+        _symmetry_maps.popitem(last=False)
+    return mapping
+
+
+@persistent
+def clear_symmetry_maps(*args):
+    """
+    Mesh pointers are reused once a file is loaded, so maps can't be trusted
+    """
+    _symmetry_maps.clear()
+
+
+def mirror_offsets(delta: np.ndarray, mapping: np.ndarray) -> np.ndarray:
+    """
+    Mirror flat per-vertex offsets across X with a single gather. Vertices
+    without a counterpart get no offset.
+    """
+    offsets = delta.reshape(-1, 3)[mapping] * np.array([-1.0, 1.0, 1.0], dtype=np.float32)
+    offsets[mapping < 0] = 0.0
+    return offsets.ravel()
+
+
+def mirror_fill(object: Object, names: List[str], rules: MirrorRules) -> int:
+    """
+    Fill keys that are still empty with the mirrored shape of their other
+    side, for keys whose other side has data. Returns the number of keys
+    filled.
+
+    :param object: A MESH object
+    :param names: Keys to consider, usually the ones an apply just created
+    :param rules: Naming rules that pair the two sides
+    """
+    shape_keys = object.data.shape_keys
+    if shape_keys is None:
+        return 0
+
+    key_blocks = shape_keys.key_blocks
+    reference = read_coords(shape_keys.reference_key)
+    mapping = None
+    filled = 0
+
+    for name in names:
+        counterpart = rules.counterpart(name)
+        key_block = key_blocks.get(name)
+        source = key_blocks.get(counterpart) if counterpart is not None else None
+        if key_block is None or source is None:
+            continue
+
+        source_co = read_coords(source)
+        if np.array_equal(source_co, reference) or not np.array_equal(read_coords(key_block), reference):
+            continue
+
+        if mapping is None:
+            mapping = symmetry_map(object.data, reference)
+        write_coords(key_block, reference + mirror_offsets(source_co - reference, mapping))
+        filled += 1
+
+    return filled
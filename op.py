@@ -1,12 +1,117 @@
-from typing import Set
-from bpy.types import Context, Operator
-from .util import initialize
+from typing import List, Optional, Set, Tuple
+import bpy
+import fnmatch
+import io
+from bpy.types import Context, Event, Object, Operator
+from bpy.props import BoolProperty, EnumProperty, FloatProperty, IntProperty, StringProperty
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+
+from .alias import AliasIndex, get_normalizer, match_existing, set_alias_index
+from .audit import audit_all, audit_count
+from .autoapply import apply_rules, seed_seen, uses_rules
+from .bulk import apply_key_names, existing_key_names
+from .capture import import_capture, read_capture
+from .core import duplicate_indices
+from .compose import flattened_keys, invalidate_resolved, invalidate_set, resolved_key_names
+from .drivers import DEFAULT_DRIVER_PATH, DriverWiring, expand_path
+from .instrument import Timing, history, instrumented, publish
+from .library import SetLibrary, get_library
+from .mirror import MirrorRules, compile_rules, mirror_fill
+from .pose import PoseWriter, blend_values, capture_pose, preset_values, store_pose
+from .scope import scope_items, scoped_objects, group_by_mesh
+from .set_io import add_keys, read_keys, read_sets, write_keys, write_sets
+from .slicing import TimeSlicer
+from .snapshot import SnapshotStore, mesh_entry, restore_mesh
+from .storage import (active_set, edited_set, file_shared_sets, new_shared_sets, override_of, scene_sets,
+                      sets_root, shares_sets)
+from .sync import sync_key_order
+from .transfer import ShapeTransfer, transfer_mode_items
+from .util import compact, copy_set, initialize, insert_after, remove_indices, set_fingerprint, sync_sets
 
 # -----------------------------------------------------------------------------
 #   Core Operators
 # -----------------------------------------------------------------------------
 
 
+def scoped_targets(context: Context, scope: str, timing: Timing) -> List[Object]:
+    """
+    One object per editable mesh in scope, counting what was visited
+    """
+    objects = list(scoped_objects(context, scope))
+    meshes = group_by_mesh(objects)
+    timing.count("objects", len(objects))
+    timing.count("meshes", len(meshes))
+    return list(meshes.values())
+
+
+def apply_timed(timing: Timing, object: Object, names: List[str], transfer: Optional[ShapeTransfer] = None,
+                mirror: Optional[MirrorRules] = None, aliases: Optional[Tuple[AliasIndex, bool]] = None):
+    """
+    Apply key names to an object's mesh, recording counts and cost
+
+    :param transfer: Fills the keys with shape data from a source object
+    :param mirror: Fills new keys that are still empty from their other side
+    :param aliases: An AliasIndex matching existing keys under other names,
+        and whether to rename them
+    """
+    with timing.measure(object.name):
+        if aliases is not None:
+            names, matched = match_existing(object, names, *aliases)
+            timing.count("matched", matched)
+        existing = existing_key_names(object.data) if mirror is not None else None
+        if transfer is None:
+            created, skipped = apply_key_names(object, names)
+        else:
+            created, skipped, filled = transfer.apply(object, names)
+            timing.count("filled", filled)
+        if mirror is not None:
+            timing.count("mirrored", mirror_fill(object, [name for name in names if name not in existing], mirror))
+    timing.count("created", created)
+    timing.count("skipped", skipped)
+
+
+def source_transfer(operator: Operator, context: Context) -> Optional[ShapeTransfer]:
+    """
+    The shape data transfer an apply operator asked for, if any
+    """
+    source = context.scene.shapekey_sets_source
+    if not operator.use_source_data or source is None:
+        return None
+    return ShapeTransfer(source, operator.overwrite_existing, operator.transfer_mode, operator.neighbours)
+
+
+def alias_matching(operator: Operator, context: Context) -> Optional[Tuple[AliasIndex, bool]]:
+    """
+    The alias index of the active set for an apply operator that matches
+    existing keys, with the normalization from the addon preferences
+    """
+    if not operator.match_aliases:
+        return None
+    prefs = context.preferences.addons[__package__].preferences
+    normalize = get_normalizer(prefs.alias_fold_case, prefs.alias_strip_separators,
+                               prefs.mirror_rules if prefs.alias_canonical_sides else "")
+    scene = context.scene
+    return (set_alias_index(scene_sets(scene), active_set(scene), normalize),
+            operator.rename_matches)
+
+
+def mirror_rules(operator: Operator, context: Context) -> Optional[MirrorRules]:
+    """
+    The mirroring an apply operator asked for, with the naming rules from
+    the addon preferences
+    """
+    if not operator.use_mirror:
+        return None
+    return compile_rules(context.preferences.addons[__package__].preferences.mirror_rules)
+
+
+def report_transfer(operator: Operator, transfer: Optional[ShapeTransfer]):
+    if transfer is not None and transfer.mismatched:
+        operator.report({'WARNING'}, "%d meshes have a different vertex count than %s and only got empty keys, "
+                        "use a Nearest Vertex or Interpolated transfer for them" % (
+                            transfer.mismatched, transfer.source.name))
+
+
 class SHAPEKEY_SETS_OT_reset(Operator):
     bl_idname = "object.shapekey_set_reset"
     bl_label = "Reset Default Shapekey Sets"
@@ -14,27 +119,1374 @@ class SHAPEKEY_SETS_OT_reset(Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context: Context) -> Set[str] | Set[int]:
-        initialize(context.region, force=True)
+        with instrumented(self, context):
+            initialize(context.region, force=True)
+        return {"FINISHED"}
+
+
+# -----------------------------------------------------------------------------
+#   Shared Storage Operators
+# -----------------------------------------------------------------------------
+
+
+class SHAPEKEY_SETS_OT_share_sets(Operator):
+    """
+    Moves the Scene's sets into one container every Scene of the file
+    refers to. Scene sets equal to a shared set are removed, and the ones
+    that differ are kept as overrides of it.
+    """
+    bl_idname = "shapekey_sets.share_sets"
+    bl_label = "Share Sets Across Scenes"
+    bl_description = "Store the Shapekey Sets once for the whole file, keeping only sets that differ in each Scene"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.shapekey_sets_shared is None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        with instrumented(self, context) as timing:
+            shared = file_shared_sets()
+            if shared is None:
+                shared = new_shared_sets()
+                sync_sets(context.scene.shapekey_sets, shared.shapekey_sets)
+
+            shared_sets = {shapekey_set.name: set_fingerprint(shapekey_set)
+                           for shapekey_set in shared.shapekey_sets}
+            for scene in bpy.data.scenes:
+                if scene.shapekey_sets_shared is not None:
+                    continue
+                scene.shapekey_sets_shared = shared
+                removed = compact(scene.shapekey_sets, lambda shapekey_set: (
+                    shared_sets.get(shapekey_set.name) != set_fingerprint(shapekey_set)))
+                scene.active_shapekey_set_index = 0
+                timing.count("scenes")
+                timing.count("removed", len(removed))
+            context.scene.shapekey_sets_edit_overrides = False
+            invalidate_resolved()
+
+        self.report({'INFO'}, "%d Scenes share %s, removed %d copied sets" % (
+            timing.counters.get("scenes", 0), shared.name, timing.counters.get("removed", 0)))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_unshare_sets(Operator):
+    """
+    Copies the shared sets the Scene doesn't override into its own list,
+    in the order the Scene saw them, and stops using the shared container
+    """
+    bl_idname = "shapekey_sets.unshare_sets"
+    bl_label = "Stop Sharing Sets"
+    bl_description = "Copy the shared Shapekey Sets into this Scene and stop using them"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.shapekey_sets_shared is not None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+        with instrumented(self, context) as timing:
+            order = [shapekey_set.name for shapekey_set in scene_sets(scene)]
+            own = {shapekey_set.name for shapekey_set in scene.shapekey_sets}
+            for shared_set in scene.shapekey_sets_shared.shapekey_sets:
+                if shared_set.name in own:
+                    continue
+                own.add(shared_set.name)
+                target_set = scene.shapekey_sets.add()
+                copy_set(shared_set, target_set)
+                timing.count("copied")
+
+            for position, name in enumerate(order):
+                index = scene.shapekey_sets.find(name)
+                if index > position:
+                    scene.shapekey_sets.move(index, position)
+
+            scene.shapekey_sets_shared = None
+            scene.shapekey_sets_edit_overrides = False
+            scene.active_shapekey_set_index = 0
+            invalidate_resolved()
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_override_set(Operator):
+    """
+    Copies the active shared set into the Scene, where changing it only
+    affects this Scene, and switches the panel to the Scene's overrides
+    """
+    bl_idname = "shapekey_sets.override_set"
+    bl_label = "Override in Scene"
+    bl_description = "Copy the active shared Shapekey Set into this Scene to change it for this Scene only"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return shares_sets(context.scene) and edited_set(context.scene) is not None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+        with instrumented(self, context):
+            shared_set = edited_set(scene)
+            if override_of(scene, shared_set) is None:
+                target_set = scene.shapekey_sets.add()
+                copy_set(shared_set, target_set)
+            scene.active_shapekey_set_index = scene.shapekey_sets.find(shared_set.name)
+            scene.shapekey_sets_edit_overrides = True
+            invalidate_resolved()
         return {"FINISHED"}
 
 
 class SHAPEKEY_SETS_OT_add(Operator):
     bl_idname = "object.shapekey_set_add"
     bl_label = "Apply Shapekey Set"
-    bl_description = "Apply Shapekey Set to selected Objects"
+    bl_description = "Apply Shapekey Set to Objects in scope"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+    use_source_data: BoolProperty(name="Transfer Shape Data",
+                                  description="Fill keys with the shape data of same-named keys on the Scene's source object")
+    overwrite_existing: BoolProperty(name="Overwrite Existing",
+                                     description="Also replace the shape data of keys the targets already have")
+    transfer_mode: EnumProperty(name="Transfer Mode", items=transfer_mode_items, default='INDEX')
+    neighbours: IntProperty(name="Neighbours", default=4, min=2, max=16,
+                            description="Source vertices blended per target vertex when interpolating")
+    use_mirror: BoolProperty(name="Mirror Missing Sides",
+                             description="Fill new Left/Right keys by mirroring their other side when it has shape data")
+    match_aliases: BoolProperty(name="Match Similar Names", default=True,
+                                description="Treat existing keys with an alias or a differently written name, like EyeBlink_L for eyeBlinkLeft, as present")
+    rename_matches: BoolProperty(name="Rename Matches",
+                                 description="Rename matched keys to the Shapekey Set's names")
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+
+        active_shapekey_set = active_set(scene)
+        if active_shapekey_set is not None:
+            names = resolved_key_names(scene_sets(scene), active_shapekey_set)
+            transfer = source_transfer(self, context)
+            mirror = mirror_rules(self, context)
+            aliases = alias_matching(self, context)
+            with instrumented(self, context) as timing:
+                for object in scoped_targets(context, self.scope, timing):
+                    apply_timed(timing, object, names, transfer, mirror, aliases)
+            report_transfer(self, transfer)
+        return {"FINISHED"}
+
+
+# Events the modal apply lets through, so the view can be moved while it runs
+NAVIGATION_EVENTS = {'MIDDLEMOUSE', 'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MOUSEROTATE'}
+NAVIGATION_PREFIXES = ('WHEEL', 'TRACKPAD', 'NDOF')
+
+
+class SHAPEKEY_SETS_OT_add_modal(Operator):
+    """
+    Applies the active Shapekey Set a few meshes at a time from a modal
+    timer, keeping Blender responsive on large scopes. Stopping with Esc
+    keeps the meshes finished so far, as a single undo step.
+    """
+    bl_idname = "object.shapekey_set_add_modal"
+    bl_label = "Apply Shapekey Set Incrementally"
+    bl_description = "Apply Shapekey Set to Objects in scope without freezing the UI. Press Esc to stop"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+    use_source_data: BoolProperty(name="Transfer Shape Data",
+                                  description="Fill keys with the shape data of same-named keys on the Scene's source object")
+    overwrite_existing: BoolProperty(name="Overwrite Existing",
+                                     description="Also replace the shape data of keys the targets already have")
+    transfer_mode: EnumProperty(name="Transfer Mode", items=transfer_mode_items, default='INDEX')
+    neighbours: IntProperty(name="Neighbours", default=4, min=2, max=16,
+                            description="Source vertices blended per target vertex when interpolating")
+    use_mirror: BoolProperty(name="Mirror Missing Sides",
+                             description="Fill new Left/Right keys by mirroring their other side when it has shape data")
+    match_aliases: BoolProperty(name="Match Similar Names", default=True,
+                                description="Treat existing keys with an alias or a differently written name, like EyeBlink_L for eyeBlinkLeft, as present")
+    rename_matches: BoolProperty(name="Rename Matches",
+                                 description="Rename matched keys to the Shapekey Set's names")
+    budget: FloatProperty(name="Time Budget", description="Seconds of work per UI update",
+                          default=0.05, min=0.005, max=1.0)
+
+    _slicer = None
+    _timer = None
+    _timing = None
+    _transfer = None
+
+    def _prepare(self, context: Context) -> bool:
+        scene = context.scene
+        active_shapekey_set = active_set(scene)
+        if active_shapekey_set is None:
+            return False
+
+        names = resolved_key_names(scene_sets(scene), active_shapekey_set)
+        timing = self._timing = Timing(self.bl_idname)
+        transfer = self._transfer = source_transfer(self, context)
+        mirror = mirror_rules(self, context)
+        aliases = alias_matching(self, context)
+        self._slicer = TimeSlicer(scoped_targets(context, self.scope, timing),
+                                  lambda object: apply_timed(timing, object, names, transfer, mirror, aliases),
+                                  self.budget)
+        return True
+
+    def _finish(self, context: Context, cancelled: bool = False) -> Set[str] | Set[int]:
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self._timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+        slicer = self._slicer
+        self.report({'INFO'}, "%s %d of %d meshes (%.1f meshes/s)" % (
+            "Stopped after" if cancelled else "Applied to", slicer.done, slicer.total, slicer.rate))
+
+        self._timing.finish()
+        publish(self, context, self._timing)
+        report_transfer(self, self._transfer)
+
+        # Partial work is kept and finished as one undo step
+        return {"FINISHED"} if slicer.done else {"CANCELLED"}
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        if self._prepare(context):
+            self._slicer.run()
+            self._timing.finish()
+            publish(self, context, self._timing)
+            report_transfer(self, self._transfer)
+        return {"FINISHED"}
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if not self._prepare(context):
+            return {"CANCELLED"}
+
+        window_manager = context.window_manager
+        window_manager.progress_begin(0, max(self._slicer.total, 1))
+        self._timer = window_manager.event_timer_add(
+            0.01, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if event.type == 'ESC':
+            return self._finish(context, cancelled=True)
+
+        if event.type == 'TIMER':
+            slicer = self._slicer
+            slicer.step()
+            context.window_manager.progress_update(slicer.done)
+            context.workspace.status_text_set("Applying Shapekey Set: %d/%d meshes, %.1f meshes/s (Esc to stop)" % (
+                slicer.done, slicer.total, slicer.rate))
+            if slicer.finished:
+                return self._finish(context)
+            return {"RUNNING_MODAL"}
+
+        if event.type in NAVIGATION_EVENTS or event.type.startswith(NAVIGATION_PREFIXES):
+            return {"PASS_THROUGH"}
+
+        # Swallow other events so the targets can't change under the operator
+        return {"RUNNING_MODAL"}
+
+
+class SHAPEKEY_SETS_OT_sync(Operator):
+    """
+    Makes the shape keys of meshes in scope follow the active Shapekey Set:
+    missing keys are added, keys are moved into the set's order and keys
+    that aren't in the set are optionally removed
+    """
+    bl_idname = "object.shapekey_set_sync"
+    bl_label = "Sync Shapekey Set"
+    bl_description = "Add missing keys and reorder the shape keys of Objects in scope to match the Shapekey Set"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+    add_missing: BoolProperty(name="Add Missing", default=True,
+                              description="Add keys of the set that the meshes don't have yet")
+    remove_extra: BoolProperty(name="Remove Extra",
+                               description="Remove shape keys that aren't in the set, except the reference key")
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+
+        active_shapekey_set = active_set(scene)
+        if active_shapekey_set is not None:
+            names = resolved_key_names(scene_sets(scene), active_shapekey_set)
+            with instrumented(self, context) as timing:
+                for object in scoped_targets(context, self.scope, timing):
+                    # Edit Mode keeps its own copy of the key blocks
+                    if object.mode == 'EDIT':
+                        timing.count("in edit mode")
+                        continue
+                    if self.add_missing:
+                        apply_timed(timing, object, names)
+                    with timing.measure(object.name):
+                        moved, removed = sync_key_order(context, object, names, self.remove_extra)
+                    timing.count("moved", moved)
+                    timing.count("removed", removed)
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_wire_drivers(Operator):
+    """
+    Drives every key of the active Shapekey Set on the meshes in scope from
+    a property of the Scene's driver target, found through a data path
+    template. Drivers that are already wired that way are kept.
+    """
+    bl_idname = "object.shapekey_set_wire_drivers"
+    bl_label = "Wire Drivers"
+    bl_description = "Drive the Shapekey Set's keys on the meshes in scope from properties of the driver target"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+    data_path: StringProperty(name="Property Path", default=DEFAULT_DRIVER_PATH,
+                              description="Path of the driving property on the target, {name} is the key's name and {set} the set's")
+    remove_other: BoolProperty(name="Remove Other Drivers",
+                               description="Remove drivers of shape key values that aren't in the set")
+    add_properties: BoolProperty(name="Add Missing Properties", default=True,
+                                 description="Create custom properties the path names on the target when they don't exist")
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.shapekey_sets_driver_target is not None and active_set(context.scene) is not None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+        shapekey_set = active_set(scene)
+        names = resolved_key_names(scene_sets(scene), shapekey_set)
+
+        try:
+            expand_path(self.data_path, "", "")
+        except (KeyError, IndexError, ValueError) as error:
+            self.report({'ERROR'}, "Invalid property path: %s" % error)
+            return {"CANCELLED"}
+        wiring = DriverWiring(scene.shapekey_sets_driver_target, self.data_path, shapekey_set.name,
+                              self.remove_other, self.add_properties)
+
+        with instrumented(self, context) as timing:
+            for object in scoped_targets(context, self.scope, timing):
+                with timing.measure(object.name):
+                    wiring.apply(object, names)
+            for counter, count in wiring.counts.items():
+                timing.count(counter, count)
+
+        self.report({'INFO'}, "Drivers created %(created)d, reused %(reused)d, refreshed %(refreshed)d, "
+                              "removed %(removed)d" % wiring.counts)
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_audit(Operator):
+    """
+    Checks every mesh in the file against every Shapekey Set of the Scene.
+    Results are cached and kept up to date as shape keys change, for the
+    audit panel.
+    """
+    bl_idname = "shapekey_sets.audit"
+    bl_label = "Audit Meshes"
+    bl_description = "Find meshes with missing, extra or out of order keys for each Shapekey Set"
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        shapekey_sets = scene_sets(context.scene)
+        with instrumented(self, context) as timing:
+            compliant = audit_all(shapekey_sets)
+            timing.count("meshes", audit_count())
+        self.report({'INFO'}, "Audited %d meshes, compliant per set: %s" % (audit_count(), ", ".join(
+            "%s %d" % item for item in compliant.items()) or "no Shapekey Sets"))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_auto_apply(Operator):
+    """
+    Applies the Scene's auto apply rules to every Object they cover now,
+    instead of waiting for new objects
+    """
+    bl_idname = "object.shapekey_set_auto_apply"
+    bl_label = "Apply Rules Now"
+    bl_description = "Apply the Shapekey Set of every auto apply rule to all matching objects in the Scene"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.shapekey_sets_auto_rules) > 0
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        with instrumented(self, context) as timing:
+            created = apply_rules(context.scene, context.scene.objects, timing)
+        self.report({'INFO'}, "Created %d keys on %d meshes" % (created, timing.counters.get("meshes", 0)))
+        return {"FINISHED"}
+
+
+# -----------------------------------------------------------------------------
+#   Snapshot Operators
+# -----------------------------------------------------------------------------
+
+
+def snapshot_store(operator: Operator, context: Context) -> Optional[SnapshotStore]:
+    """
+    The store at the Scene's snapshot directory, or None after reporting why
+    it can't be used
+    """
+    path = context.scene.shapekey_sets_snapshot_path
+    if not path:
+        operator.report({'ERROR'}, "Set a snapshot directory first")
+        return None
+    if path.startswith("//") and not bpy.data.filepath:
+        operator.report({'ERROR'}, "Save the file first, the snapshot directory is relative to it")
+        return None
+    return SnapshotStore(bpy.path.abspath(path))
+
+
+class SHAPEKEY_SETS_OT_snapshot_save(Operator):
+    """
+    Saves the shape keys of every mesh in scope to the snapshot directory,
+    so they can be restored after applying or syncing sets
+    """
+    bl_idname = "object.shapekey_set_snapshot_save"
+    bl_label = "Save Snapshot"
+    bl_description = "Save the shape keys of the meshes in scope to the snapshot directory"
+    bl_options = {'REGISTER'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        store = snapshot_store(self, context)
+        if store is None:
+            return {"CANCELLED"}
+
+        with instrumented(self, context) as timing:
+            meshes = []
+            for object in scoped_targets(context, self.scope, timing):
+                # Edit Mode keeps its own copy of the key blocks
+                if object.mode == 'EDIT':
+                    timing.count("in edit mode")
+                    continue
+                meshes.append(object.data)
+            try:
+                saved, unchanged, written = store.save(meshes)
+            except OSError as error:
+                self.report({'ERROR'}, "Could not save snapshot: %s" % error)
+                return {"CANCELLED"}
+            timing.count("saved", saved)
+            timing.count("unchanged", unchanged)
+            timing.count("blobs written", written)
+
+        self.report({'INFO'}, "Saved %d meshes, %d unchanged" % (saved, unchanged))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_snapshot_restore(Operator):
+    """
+    Restores the shape keys of every mesh in scope from the snapshot
+    directory. Meshes that still match their snapshot are left alone.
+    """
+    bl_idname = "object.shapekey_set_snapshot_restore"
+    bl_label = "Restore Snapshot"
+    bl_description = "Give the meshes in scope back the shape keys saved in the snapshot directory"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        store = snapshot_store(self, context)
+        if store is None:
+            return {"CANCELLED"}
+
+        with instrumented(self, context) as timing:
+            for object in scoped_targets(context, self.scope, timing):
+                entry = store.entry(object.data.name)
+                if entry is None:
+                    timing.count("not in snapshot")
+                    continue
+                if object.mode == 'EDIT':
+                    timing.count("in edit mode")
+                    continue
+                with timing.measure(object.name):
+                    if mesh_entry(object.data)[0]["digest"] == entry["digest"]:
+                        timing.count("unchanged")
+                    elif restore_mesh(context, object, entry, store):
+                        timing.count("restored")
+                    else:
+                        timing.count("not restorable")
+
+        self.report({'INFO'}, "Restored %d meshes, %d unchanged" % (
+            timing.counters.get("restored", 0), timing.counters.get("unchanged", 0)))
+        if timing.counters.get("not restorable"):
+            self.report({'WARNING'}, "%d meshes no longer match their snapshot and were left unchanged" % (
+                timing.counters["not restorable"]))
+        return {"FINISHED"}
+
+
+# -----------------------------------------------------------------------------
+#   Pose Operators
+# -----------------------------------------------------------------------------
+
+
+def active_set_poses(context: Context):
+    shapekey_set = edited_set(context.scene)
+    if shapekey_set is None:
+        return None
+    return shapekey_set.poses
+
+
+class SHAPEKEY_SETS_OT_pose_store(Operator):
+    """
+    Stores the active Object's current values of the set's keys as a pose
+    of the active Shapekey Set, replacing a pose with the same name
+    """
+    bl_idname = "object.shapekey_set_pose_store"
+    bl_label = "Store Pose"
+    bl_description = "Store the active Object's shape key values as a pose of the Shapekey Set"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name: StringProperty(name="Name", default="Pose")
+
+    @classmethod
+    def poll(cls, context):
+        object = context.active_object
+        return (active_set_poses(context) is not None and object is not None and object.type == 'MESH'
+                and object.data.shape_keys is not None)
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+        shapekey_set = edited_set(scene)
+        values = capture_pose(context.active_object.data.shape_keys,
+                              resolved_key_names(scene_sets(scene), shapekey_set))
+
+        index = shapekey_set.poses.find(self.name)
+        if index < 0:
+            shapekey_set.poses.add().name = self.name
+            index = len(shapekey_set.poses) - 1
+        store_pose(shapekey_set.poses[index], values)
+        shapekey_set.active_pose_index = index
+        invalidate_set(shapekey_set.name)
+
+        self.report({'INFO'}, 'Stored %d values as "%s"' % (len(values), self.name))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_pose_apply(Operator):
+    """
+    Sets the shape key values of every mesh in scope to a pose of the active
+    Shapekey Set, or to a blend of two poses
+    """
+    bl_idname = "object.shapekey_set_pose_apply"
+    bl_label = "Apply Pose"
+    bl_description = "Set the shape key values of Objects in scope to a pose, optionally blended with another"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+    pose: StringProperty(name="Pose")
+    blend_pose: StringProperty(name="Blend With",
+                               description="Second pose to blend towards, the first pose alone when empty")
+    factor: FloatProperty(name="Factor", default=0.5, min=0.0, max=1.0, subtype='FACTOR')
+    reset_others: BoolProperty(name="Reset Other Keys", default=True,
+                               description="Set keys the pose doesn't store to 0")
+
+    @classmethod
+    def poll(cls, context):
+        poses = active_set_poses(context)
+        return poses is not None and len(poses) > 0
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        poses = active_set_poses(context)
+        pose = poses.get(self.pose)
+        if pose is None:
+            self.report({'ERROR'}, 'There is no pose "%s"' % self.pose)
+            return {"CANCELLED"}
+
+        values = preset_values(pose)
+        if self.blend_pose:
+            blend_pose = poses.get(self.blend_pose)
+            if blend_pose is None:
+                self.report({'ERROR'}, 'There is no pose "%s"' % self.blend_pose)
+                return {"CANCELLED"}
+            values = blend_values(values, preset_values(blend_pose), self.factor)
+
+        writer = PoseWriter(values, self.reset_others)
+        with instrumented(self, context) as timing:
+            for object in scoped_targets(context, self.scope, timing):
+                shape_keys = object.data.shape_keys
+                if shape_keys is None:
+                    continue
+                with timing.measure(object.name):
+                    timing.count("values", writer.apply(shape_keys))
+        return {"FINISHED"}
+
+
+# -----------------------------------------------------------------------------
+#   Library Operators
+# -----------------------------------------------------------------------------
+
+# Seconds between checks of the library directory for changes
+LIBRARY_REFRESH_INTERVAL = 2.0
+
+# Blender doesn't keep the strings of dynamic enum items alive by itself
+_library_set_items = []
+# The index _library_set_items were made from
+_library_items_sets = None
+
+
+def active_library(context: Context) -> Optional[SetLibrary]:
+    """
+    The library in the directory configured in the addon preferences
+    """
+    prefs = context.preferences.addons[__package__].preferences
+    if not prefs.library_path:
+        return None
+    return get_library(bpy.path.abspath(prefs.library_path))
+
+
+def library_set_items(self, context: Context):
+    """
+    Enum items for the library's sets. Runs on every redraw, so it only
+    reads the index refresh_library() and the operators keep, and never
+    touches the disk.
+    """
+    global _library_items_sets
+
+    library = active_library(context)
+    sets = library.cached_index() if library is not None else {}
+    if sets is not _library_items_sets:
+        _library_set_items.clear()
+        _library_set_items.extend((name, name, "%d keys" % entry["keys"])
+                                  for name, entry in sorted(sets.items()))
+        _library_items_sets = sets
+    return _library_set_items
+
+
+def refresh_library():
+    """
+    Timer keeping the index of the library in the preferences current.
+    index() only rescans the directory when its modification time changed,
+    so most runs cost a single stat.
+    """
+    library = active_library(bpy.context)
+    if library is not None:
+        try:
+            library.index()
+        except OSError:
+            # The directory doesn't exist (yet), the set list stays as it was
+            pass
+    return LIBRARY_REFRESH_INTERVAL
+
+
+class SHAPEKEY_SETS_OT_library_base():
+    """
+    Shared lookup of the selected library set
+    """
+
+    @classmethod
+    def poll(cls, context):
+        return active_library(context) is not None and bool(context.scene.shapekey_sets_library_set)
+
+    def load_selected(self, context: Context):
+        """
+        The selected set's keys as (name, enabled) pairs, or None after
+        reporting why they couldn't be loaded
+        """
+        set_name = context.scene.shapekey_sets_library_set
+        try:
+            return active_library(context).load(set_name)
+        except KeyError:
+            self.report({'ERROR'}, 'Library set "%s" no longer exists' % set_name)
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, 'Could not load library set "%s": %s' % (set_name, error))
+        return None
+
+
+class SHAPEKEY_SETS_OT_library_apply(SHAPEKEY_SETS_OT_library_base, Operator):
+    bl_idname = "object.shapekey_set_library_apply"
+    bl_label = "Apply Library Set"
+    bl_description = "Apply the selected library Shapekey Set to Objects in scope"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(items=scope_items, default='SELECTION')
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        keys = self.load_selected(context)
+        if keys is None:
+            return {"CANCELLED"}
+
+        names = [name for name, enabled in keys if enabled]
+        with instrumented(self, context) as timing:
+            for object in scoped_targets(context, self.scope, timing):
+                apply_timed(timing, object, names)
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_library_import(SHAPEKEY_SETS_OT_library_base, Operator):
+    bl_idname = "shapekey_sets.library_import"
+    bl_label = "Copy to Scene"
+    bl_description = "Copy the selected library Shapekey Set into the Scene's sets, replacing one with the same name"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        keys = self.load_selected(context)
+        if keys is None:
+            return {"CANCELLED"}
+
+        root = sets_root(context.scene)
+        set_name = context.scene.shapekey_sets_library_set
+        index = root.shapekey_sets.find(set_name)
+        if index < 0:
+            shapekey_set = root.shapekey_sets.add()
+            shapekey_set.name = set_name
+            index = len(root.shapekey_sets) - 1
+        shapekey_set = root.shapekey_sets[index]
+
+        shapekey_set.shapekeys.clear()
+        for name, enabled in keys:
+            item = shapekey_set.shapekeys.add()
+            item.name = name
+            item.enabled = enabled
+        invalidate_set(set_name)
+
+        root.active_shapekey_set_index = index
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_library_save(Operator):
+    bl_idname = "shapekey_sets.library_save"
+    bl_label = "Save to Library"
+    bl_description = "Save the active Shapekey Set to the library, replacing one with the same name"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return active_library(context) is not None and active_set(context.scene) is not None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        scene = context.scene
+        shapekey_set = active_set(scene)
+        try:
+            file_name = active_library(context).save(
+                shapekey_set.name, flattened_keys(scene_sets(scene), shapekey_set))
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, "Could not save to library: %s" % error)
+            return {"CANCELLED"}
+
+        self.report({'INFO'}, 'Saved "%s" to %s' % (shapekey_set.name, file_name))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_library_refresh(Operator):
+    bl_idname = "shapekey_sets.library_refresh"
+    bl_label = "Refresh Library"
+    bl_description = "Rescan the library directory for changed set files"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return active_library(context) is not None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        try:
+            index = active_library(context).refresh(force=True)
+        except OSError as error:
+            self.report({'ERROR'}, "Could not read library: %s" % error)
+            return {"CANCELLED"}
+
+        self.report({'INFO'}, "%d sets in library" % len(index))
+        return {"FINISHED"}
+
+
+# -----------------------------------------------------------------------------
+#   Import and Export Operators
+# -----------------------------------------------------------------------------
+
+target_items = (
+    ('SCENE', "Scene", "The Scene's Shapekey Sets"),
+    ('PREFS', "Preferences", "The default Shapekey Sets in the addon preferences"))
+
+
+def target_root(context: Context, target: str):
+    """
+    The object holding the Shapekey Sets an import or export works on
+    """
+    if target == 'PREFS':
+        return context.preferences.addons[__package__].preferences
+    return sets_root(context.scene)
+
+
+def looks_like_json(text: str) -> bool:
+    return text.lstrip().startswith(("[", "{"))
+
+
+class SHAPEKEY_SETS_OT_import_keys(Operator, ImportHelper):
+    bl_idname = "shapekey_sets.import_keys"
+    bl_label = "Import Keys"
+    bl_description = "Add keys to the active Shapekey Set from a name list, CSV or JSON file, or the clipboard"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: StringProperty(default="*.txt;*.csv;*.json", options={'HIDDEN'})
+    target: EnumProperty(items=target_items, options={'HIDDEN'})
+    use_clipboard: BoolProperty(name="From Clipboard", options={'HIDDEN'})
+    skip_duplicates: BoolProperty(name="Skip Duplicates", default=True,
+                                  description="Leave out keys that are already in the set")
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if self.use_clipboard:
+            return self.execute(context)
+        return ImportHelper.invoke(self, context, event)
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        root = target_root(context, self.target)
+        if len(root.shapekey_sets) == 0:
+            self.report({'ERROR'}, "There is no Shapekey Set to import into")
+            return {"CANCELLED"}
+
+        shapekey_set = root.shapekey_sets[root.active_shapekey_set_index]
+        shapekeys = shapekey_set.shapekeys
+        before = len(shapekeys)
+        try:
+            with instrumented(self, context) as timing:
+                if self.use_clipboard:
+                    text = context.window_manager.clipboard
+                    added, skipped = add_keys(shapekeys, read_keys(io.StringIO(text), looks_like_json(text)),
+                                              self.skip_duplicates)
+                else:
+                    with open(self.filepath, newline="") as file:
+                        added, skipped = add_keys(shapekeys, read_keys(file, self.filepath.lower().endswith(".json")),
+                                                  self.skip_duplicates)
+                timing.count("created", added)
+                timing.count("skipped", skipped)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            self.report({'ERROR'}, "Could not import keys: %s" % error)
+            # Keys added before the error are kept as one undo step
+            return {"FINISHED"} if len(shapekeys) != before else {"CANCELLED"}
+        finally:
+            # add_keys() writes ID properties, which don't call update callbacks
+            invalidate_set(shapekey_set.name)
+
+        self.report({'INFO'}, "Added %d keys, skipped %d duplicates" % (added, skipped))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_export_keys(Operator, ExportHelper):
+    bl_idname = "shapekey_sets.export_keys"
+    bl_label = "Export Keys"
+    bl_description = "Write the active Shapekey Set's keys to a name list or CSV file, or the clipboard"
+    bl_options = {'REGISTER'}
+
+    filename_ext = ".txt"
+    filter_glob: StringProperty(default="*.txt;*.csv", options={'HIDDEN'})
+    check_extension = None
+    target: EnumProperty(items=target_items, options={'HIDDEN'})
+    use_clipboard: BoolProperty(name="To Clipboard", options={'HIDDEN'})
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if self.use_clipboard:
+            return self.execute(context)
+        return ExportHelper.invoke(self, context, event)
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        root = target_root(context, self.target)
+        if len(root.shapekey_sets) == 0:
+            self.report({'ERROR'}, "There is no Shapekey Set to export")
+            return {"CANCELLED"}
+
+        shapekeys = root.shapekey_sets[root.active_shapekey_set_index].shapekeys
+        if self.use_clipboard:
+            file = io.StringIO()
+            write_keys(file, shapekeys)
+            context.window_manager.clipboard = file.getvalue()
+        else:
+            try:
+                with open(self.filepath, "w", newline="") as file:
+                    write_keys(file, shapekeys,
+                               with_enabled=self.filepath.lower().endswith(".csv"))
+            except OSError as error:
+                self.report({'ERROR'}, "Could not export keys: %s" % error)
+                return {"CANCELLED"}
+
+        self.report({'INFO'}, "Exported %d keys" % len(shapekeys))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_import_sets(Operator, ImportHelper):
+    bl_idname = "shapekey_sets.import_sets"
+    bl_label = "Import Sets"
+    bl_description = "Add Shapekey Sets from a JSON file or the clipboard"
     bl_options = {'REGISTER', 'UNDO'}
 
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+    target: EnumProperty(items=target_items, options={'HIDDEN'})
+    use_clipboard: BoolProperty(name="From Clipboard", options={'HIDDEN'})
+    replace_existing: BoolProperty(name="Replace Existing",
+                                   description="Replace the keys of sets with the same name instead of adding the missing ones")
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if self.use_clipboard:
+            return self.execute(context)
+        return ImportHelper.invoke(self, context, event)
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        try:
+            if self.use_clipboard:
+                sets = read_sets(io.StringIO(context.window_manager.clipboard))
+            else:
+                with open(self.filepath) as file:
+                    sets = read_sets(file)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            self.report({'ERROR'}, "Could not import sets: %s" % error)
+            return {"CANCELLED"}
+
+        root = target_root(context, self.target)
+        existing = {shapekey_set.name: shapekey_set for shapekey_set in root.shapekey_sets}
+        with instrumented(self, context) as timing:
+            for set_name, keys in sets.items():
+                shapekey_set = existing.get(set_name)
+                if shapekey_set is None:
+                    shapekey_set = root.shapekey_sets.add()
+                    shapekey_set.name = set_name
+                    timing.count("sets created")
+                elif self.replace_existing:
+                    shapekey_set.shapekeys.clear()
+                added, skipped = add_keys(shapekey_set.shapekeys, keys)
+                timing.count("created", added)
+                timing.count("skipped", skipped)
+        invalidate_resolved()
+
+        self.report({'INFO'}, "Imported %d sets" % len(sets))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_export_sets(Operator, ExportHelper):
+    bl_idname = "shapekey_sets.export_sets"
+    bl_label = "Export Sets"
+    bl_description = "Write all Shapekey Sets to a JSON file or the clipboard"
+    bl_options = {'REGISTER'}
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+    target: EnumProperty(items=target_items, options={'HIDDEN'})
+    use_clipboard: BoolProperty(name="To Clipboard", options={'HIDDEN'})
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if self.use_clipboard:
+            return self.execute(context)
+        return ExportHelper.invoke(self, context, event)
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        shapekey_sets = target_root(context, self.target).shapekey_sets
+        if self.use_clipboard:
+            file = io.StringIO()
+            write_sets(file, shapekey_sets)
+            context.window_manager.clipboard = file.getvalue()
+        else:
+            try:
+                with open(self.filepath, "w") as file:
+                    write_sets(file, shapekey_sets)
+            except OSError as error:
+                self.report({'ERROR'}, "Could not export sets: %s" % error)
+                return {"CANCELLED"}
+
+        self.report({'INFO'}, "Exported %d sets" % len(shapekey_sets))
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_import_capture(Operator, ImportHelper):
+    """
+    Animates the active object's shape keys from a Live Link Face CSV
+    recording, matching columns to the keys of the active Shapekey Set
+    """
+    bl_idname = "shapekey_sets.import_capture"
+    bl_label = "Import Face Capture"
+    bl_description = "Keyframe the active Object's shape keys from a Live Link Face CSV, using the active Shapekey Set's keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: StringProperty(default="*.csv", options={'HIDDEN'})
+    capture_fps: FloatProperty(name="Capture Rate", default=60.0, min=1.0, max=1000.0,
+                               description="Frames per second the capture was recorded at")
+    frame_start: IntProperty(name="Start Frame", default=1,
+                             description="Frame of the first sample")
+    add_missing: BoolProperty(name="Add Missing Keys", default=True,
+                              description="Apply the Shapekey Set to the Object before keyframing")
+    use_decimate: BoolProperty(name="Decimate", default=True,
+                               description="Leave out samples that a straight line between their neighbours reproduces")
+    tolerance: FloatProperty(name="Tolerance", default=0.005, min=0.0, max=0.1, precision=4,
+                             description="Largest difference in value a left out sample may have")
+
+    @classmethod
+    def poll(cls, context):
+        object = context.active_object
+        return (object is not None and object.type == 'MESH' and object.mode != 'EDIT'
+                and active_set(context.scene) is not None)
+
     def execute(self, context: Context) -> Set[str] | Set[int]:
         scene = context.scene
+        object = context.active_object
+        names = resolved_key_names(scene_sets(scene), active_set(scene))
+
+        try:
+            with open(self.filepath, newline="") as file:
+                times, curves, unmatched = read_capture(file, names, self.capture_fps)
+        except (OSError, ValueError, IndexError) as error:
+            self.report({'ERROR'}, "Could not read capture: %s" % error)
+            return {"CANCELLED"}
+
+        if not curves:
+            self.report({'ERROR'}, "No column of the file matches a key of the Shapekey Set")
+            return {"CANCELLED"}
+
+        with instrumented(self, context) as timing:
+            if self.add_missing:
+                apply_timed(timing, object, names)
+            with timing.measure(object.name):
+                curve_count, keyframe_count = import_capture(
+                    object, times, curves, self.frame_start, scene.render.fps / scene.render.fps_base,
+                    self.tolerance if self.use_decimate else 0.0)
+            timing.count("samples", len(times) * len(curves))
+            timing.count("keyframes", keyframe_count)
+
+        self.report({'INFO'}, "Keyframed %d shape keys with %d of %d samples, %d columns unmatched" % (
+            curve_count, keyframe_count, len(times) * len(curves), len(unmatched)))
+        return {"FINISHED"}
+
+
+# -----------------------------------------------------------------------------
+#   List Operators
+# -----------------------------------------------------------------------------
+
+
+# Lists a ShapekeySet holds, edits of which only change that set
+SET_LISTS = {"shapekeys", "includes", "poses"}
 
-        if len(scene.shapekey_sets) > 0:
-            active_shapekey_set = scene.shapekey_sets[scene.active_shapekey_set_index]
-            for object in context.selected_objects:
-                if object.type == 'MESH':
-                    for shapekey in active_shapekey_set.shapekeys:
-                        if shapekey.enabled:
-                            name = shapekey.name
-                            if (object.data.shape_keys is None
-                                    or not name in object.data.shape_keys.key_blocks):
-                                object.shape_key_add(name=name)
+
+def invalidate_list(root_obj: object, list_name: str):
+    """
+    Invalidate what an edit of a list can change: the set holding it, or
+    every set when the list is one of sets
+    """
+    if list_name in SET_LISTS:
+        invalidate_set(root_obj.name)
+    else:
+        invalidate_resolved()
+
+
+class SHAPEKEY_SETS_OT_base_list_actions(Operator):
+    """
+    Move list items up and down, add, remove, dedupe, and clear
+    """
+    bl_idname = "shapekey_sets.base_list_action"
+    bl_label = "List Actions"
+    bl_description = "Manipulate list items"
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    action: EnumProperty(
+        items=(
+            ('UP', "Up", ""),
+            ('DOWN', "Down", ""),
+            ('REMOVE', "Remove", ""),
+            ('ADD', "Add", ""),
+            ('CLEAR', "CLEAR", ""),
+            ('DEDUPE', "DEDUPE", "")))
+
+    def list_actions(self, root_obj: object, list_name: str, index_name: str):
+        """
+        Generic manipulations for a UI list. Subclasses must provide access 
+        to the list's parent object through their invoke() implementation, 
+        along with names for the list and index properties.
+
+        :param root_obj: The parent object where the list is stored
+        :param list_name: The name of the list property
+        :param index_name: The name of the active index property
+        """
+        invalidate_list(root_obj, list_name)
+
+        obj = root_obj
+        list = getattr(obj, list_name)
+        index = getattr(obj, index_name)
+
+        try:
+            item = list[index]
+        except IndexError:
+            pass
+        else:
+            if self.action == 'DOWN' and index < len(list)-1:
+                list.move(index, index+1)
+                setattr(obj, index_name, index+1)
+                info = 'Item "%s" moved to position %d' % (
+                    item.name, index + 1)
+                return info
+
+            elif self.action == 'UP' and index >= 1:
+                list.move(index, index-1)
+                setattr(obj, index_name, index-1)
+                info = 'Item "%s" moved to position %d' % (
+                    item.name, index + 1)
+                return info
+
+            elif self.action == 'REMOVE':
+                item = list[index]
+                list.remove(index)
+                info = 'Item %s removed from scene' % (item)
+                if index > 0:
+                    setattr(obj, index_name, index-1)
+                return info
+
+        if self.action == 'ADD':
+            item = list.add()
+            item.id = len(list)
+            item.name = "New Item"
+            setattr(obj, index_name, len(list)-1)
+            info = '%s added to list' % (item.name)
+            return info
+
+        elif self.action == 'CLEAR':
+            if bool(list):
+                list.clear()
+                setattr(obj, index_name, 0)
+                return "All items removed"
+            else:
+                return "Nothing to remove"
+
+        elif self.action == 'DEDUPE':
+            removed_items = remove_indices(list, duplicate_indices([item.name for item in list]))
+            if removed_items:
+                setattr(obj, index_name, len(list)-1)
+                info = ', '.join(map(str, removed_items))
+                return "Removed indices: %s" % (info)
+            else:
+                return "No duplicates"
+
+
+# Implementations for each kind of list object, because passing a generic parent 
+# object through an operator argument seems impossible
+
+class SHAPEKEY_SETS_OT_data_set_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.data_set_list_action"
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(sets_root(context.scene), "shapekey_sets",
+                                               "active_shapekey_set_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_data_key_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.data_key_list_action"
+
+    @classmethod
+    def poll(cls, context):
+        return edited_set(context.scene) is not None
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        active_set = edited_set(context.scene)
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(active_set, "shapekeys", "active_shapekey_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_prefs_set_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.prefs_set_list_action"
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        prefs = bpy.context.preferences.addons[__package__].preferences
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(prefs, "shapekey_sets", "active_shapekey_set_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_prefs_key_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.prefs_key_list_action"
+
+    @classmethod
+    def poll(cls, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        return (len(prefs.shapekey_sets) > 0 and
+                prefs.shapekey_sets[prefs.active_shapekey_set_index] is not None)
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        active_set = prefs.shapekey_sets[prefs.active_shapekey_set_index]
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(active_set, "shapekeys", "active_shapekey_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_data_include_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.data_include_list_action"
+
+    @classmethod
+    def poll(cls, context):
+        return edited_set(context.scene) is not None
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        active_set = edited_set(context.scene)
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(active_set, "includes", "active_include_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_prefs_include_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.prefs_include_list_action"
+
+    @classmethod
+    def poll(cls, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        return (len(prefs.shapekey_sets) > 0 and
+                prefs.shapekey_sets[prefs.active_shapekey_set_index] is not None)
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        active_set = prefs.shapekey_sets[prefs.active_shapekey_set_index]
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(active_set, "includes", "active_include_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_data_pose_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.data_pose_list_action"
+
+    @classmethod
+    def poll(cls, context):
+        return edited_set(context.scene) is not None
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        active_set = edited_set(context.scene)
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(active_set, "poses", "active_pose_index") or ""
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_data_rule_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
+    bl_idname = "shapekey_sets.data_rule_list_action"
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        scene = context.scene
+        # Objects that exist before the first rule aren't new to it
+        starts_rules = self.action == 'ADD' and not uses_rules(scene)
+
+        with instrumented(self, context) as timing:
+            timing.message = self.list_actions(scene, "shapekey_sets_auto_rules",
+                                               "active_shapekey_sets_auto_rule_index") or ""
+        if starts_rules:
+            seed_seen()
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_base_key_list_bulk_actions(Operator):
+    """
+    Remove, keep, enable or disable every key matching a pattern in a single
+    operator call, so the whole edit is one undo step
+    """
+    bl_idname = "shapekey_sets.base_key_list_bulk_action"
+    bl_label = "Bulk Key Actions"
+    bl_description = "Manipulate all list items matching a pattern"
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    action: EnumProperty(
+        items=(
+            ('REMOVE_MATCHING', "Remove Matching", ""),
+            ('KEEP_MATCHING', "Keep Only Matching", ""),
+            ('ENABLE_MATCHING', "Enable Matching", ""),
+            ('DISABLE_MATCHING', "Disable Matching", ""),
+            ('REMOVE_DISABLED', "Remove Disabled", ""),
+            ('MIRROR_MATCHING', "Add Mirrored", "")))
+    pattern: StringProperty(
+        name="Pattern", description="Key names to match, * and ? are wildcards", default="*")
+
+    def bulk_actions(self, root_obj: object, list_name: str, index_name: str):
+        """
+        Pattern based manipulations for a UI list of shape keys. Subclasses
+        must provide access to the list's parent object through their
+        execute() implementation, along with names for the list and index
+        properties.
+
+        :param root_obj: The parent object where the list is stored
+        :param list_name: The name of the list property
+        :param index_name: The name of the active index property
+        """
+        invalidate_list(root_obj, list_name)
+
+        obj = root_obj
+        list = getattr(obj, list_name)
+
+        def matches(item):
+            return fnmatch.fnmatchcase(item.name, self.pattern)
+
+        if self.action in {'ENABLE_MATCHING', 'DISABLE_MATCHING'}:
+            enabled = self.action == 'ENABLE_MATCHING'
+            changed = 0
+            for item in list:
+                if item.enabled != enabled and matches(item):
+                    item.enabled = enabled
+                    changed += 1
+            return "%d items %s" % (changed, "enabled" if enabled else "disabled")
+
+        if self.action == 'MIRROR_MATCHING':
+            prefs = bpy.context.preferences.addons[__package__].preferences
+            rules = compile_rules(prefs.mirror_rules)
+            names = {item.name for item in list}
+            # Each counterpart goes right after the item it mirrors
+            additions = {}
+            for index, item in enumerate(list):
+                counterpart = rules.counterpart(item.name) if matches(item) else None
+                if counterpart is not None and counterpart not in names:
+                    additions[index] = [{"name": counterpart, "enabled": item.enabled}]
+                    names.add(counterpart)
+            return "%d mirrored items added" % insert_after(list, additions)
+
+        if self.action == 'REMOVE_MATCHING':
+            removed_items = compact(list, lambda item: not matches(item))
+        elif self.action == 'KEEP_MATCHING':
+            removed_items = compact(list, matches)
+        else:
+            removed_items = compact(list, lambda item: item.enabled)
+
+        setattr(obj, index_name, min(getattr(obj, index_name), max(len(list)-1, 0)))
+        return "%d items removed" % len(removed_items)
+
+    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
+        if self.action == 'REMOVE_DISABLED':
+            return self.execute(context)
+        return context.window_manager.invoke_props_dialog(self)
+
+
+class SHAPEKEY_SETS_OT_data_key_list_bulk_actions(SHAPEKEY_SETS_OT_base_key_list_bulk_actions):
+    bl_idname = "shapekey_sets.data_key_list_bulk_action"
+
+    @classmethod
+    def poll(cls, context):
+        return edited_set(context.scene) is not None
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        active_set = edited_set(context.scene)
+
+        with instrumented(self, context) as timing:
+            timing.message = self.bulk_actions(active_set, "shapekeys", "active_shapekey_index")
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_prefs_key_list_bulk_actions(SHAPEKEY_SETS_OT_base_key_list_bulk_actions):
+    bl_idname = "shapekey_sets.prefs_key_list_bulk_action"
+
+    @classmethod
+    def poll(cls, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        return (len(prefs.shapekey_sets) > 0 and
+                prefs.shapekey_sets[prefs.active_shapekey_set_index] is not None)
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        active_set = prefs.shapekey_sets[prefs.active_shapekey_set_index]
+
+        with instrumented(self, context) as timing:
+            timing.message = self.bulk_actions(active_set, "shapekeys", "active_shapekey_index")
+        return {"FINISHED"}
+
+
+class SHAPEKEY_SETS_OT_clear_timings(Operator):
+    bl_idname = "shapekey_sets.clear_timings"
+    bl_label = "Clear Timings"
+    bl_description = "Forget the recorded operator timings"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context: Context) -> Set[str] | Set[int]:
+        history.clear()
         return {"FINISHED"}
@@ -0,0 +1,109 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+from bpy.types import Key
+
+# -----------------------------------------------------------------------------
+#   Pose Presets
+# -----------------------------------------------------------------------------
+
+
+def read_values(shape_keys: Key) -> np.ndarray:
+    """
+    Values of every key block in one foreach_get
+    """
+    values = np.empty(len(shape_keys.key_blocks), dtype=np.float32)
+    shape_keys.key_blocks.foreach_get("value", values)
+    return values
+
+
+def write_values(shape_keys: Key, values: np.ndarray):
+    """
+    Write every key block's value in one foreach_set. Bulk writes skip the
+    per-property update, so the Key is tagged for the depsgraph once.
+    """
+    shape_keys.key_blocks.foreach_set("value", values)
+    shape_keys.update_tag()
+
+
+def preset_values(preset) -> Dict[str, float]:
+    return {item.name: item.value for item in preset.values}
+
+
+def blend_values(first: Dict[str, float], second: Dict[str, float], factor: float) -> Dict[str, float]:
+    """
+    Linear blend between two poses. Keys only one of them sets are blended
+    with 0.
+
+    :param factor: 0 for the first pose, 1 for the second
+    """
+    return {name: first.get(name, 0.0) * (1.0 - factor) + second.get(name, 0.0) * factor
+            for name in dict.fromkeys([*first, *second])}
+
+
+class PoseWriter():
+    """
+    Writes one pose to many meshes. A pose's names are mapped to key block
+    indices once per Key datablock, and every mesh is then written with a
+    single gather into its values array.
+
+    :param values: Key values by name
+    :param reset_others: Set keys the pose doesn't mention to 0
+    """
+
+    def __init__(self, values: Dict[str, float], reset_others: bool = True):
+        self.names = list(values)
+        self.values = np.fromiter(values.values(), dtype=np.float32, count=len(values))
+        self.reset_others = reset_others
+        self._indices: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def indices(self, shape_keys: Key) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Key block indices of the pose's keys on a Key, and which of the
+        pose's values they take
+        """
+        key = shape_keys.as_pointer()
+        cached = self._indices.get(key)
+        if cached is None:
+            position = {key_block.name: index for index, key_block in enumerate(shape_keys.key_blocks)}
+            found = [(position[name], column) for column, name in enumerate(self.names) if name in position]
+            indices = np.array([index for index, _ in found], dtype=np.int64)
+            columns = np.array([column for _, column in found], dtype=np.int64)
+            cached = self._indices[key] = (indices, columns)
+        return cached
+
+    def apply(self, shape_keys: Key) -> int:
+        """
+        Write the pose to a Key. Returns the number of the pose's keys found.
+        """
+        indices, columns = self.indices(shape_keys)
+        if self.reset_others:
+            values = np.zeros(len(shape_keys.key_blocks), dtype=np.float32)
+        else:
+            values = read_values(shape_keys)
+        values[indices] = self.values[columns]
+        write_values(shape_keys, values)
+        return len(indices)
+
+
+def capture_pose(shape_keys: Key, names: List[str]) -> Dict[str, float]:
+    """
+    Current values of the named keys a Key has, read in one foreach_get.
+    The reference key is never part of a pose.
+    """
+    values = read_values(shape_keys)
+    wanted = set(names)
+    return {key_block.name: float(values[index])
+            for index, key_block in enumerate(shape_keys.key_blocks)
+            if index > 0 and key_block.name in wanted}
+
+
+def store_pose(preset, values: Dict[str, float]):
+    """
+    Replace a PosePreset's values
+    """
+    preset.values.clear()
+    for name, value in values.items():
+        item = preset.values.add()
+        item.name = name
+        item.value = value
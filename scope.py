@@ -0,0 +1,62 @@
+from typing import Dict, Iterable
+import bpy
+
+from bpy.types import Context, Mesh, Object
+
+# -----------------------------------------------------------------------------
+#   Target Scope
+# -----------------------------------------------------------------------------
+
+scope_items = (
+    ('SELECTION', "Selection", "Selected Objects"),
+    ('COLLECTION', "Active Collection",
+     "Objects in the active Collection and its children"),
+    ('SCENE', "Scene", "All Objects in the current Scene"),
+    ('ALL_SCENES', "All Scenes", "All Objects in every Scene"))
+
+
+def scoped_objects(context: Context, scope: str) -> Iterable[Object]:
+    """
+    Objects covered by a scope, which may contain duplicates across scenes
+
+    :param context: The operator's context
+    :param scope: One of the identifiers in scope_items
+    """
+    if scope == 'COLLECTION':
+        return context.view_layer.active_layer_collection.collection.all_objects
+    elif scope == 'SCENE':
+        return context.scene.objects
+    elif scope == 'ALL_SCENES':
+        return (object for scene in bpy.data.scenes for object in scene.objects)
+    return context.selected_objects
+
+
+def group_by_mesh(objects: Iterable[Object]) -> Dict[Mesh, Object]:
+    """
+    Group MESH objects by their mesh datablock, so linked duplicates sharing
+    one mesh are only processed once. Meshes linked from a library can't be
+    edited and are left out.
+    Returns each editable mesh mapped to the first object found using it,
+    which is the object shape keys get added through.
+
+    :param objects: Objects of any type
+    """
+    targets = {}
+    for object in objects:
+        if object.type != 'MESH':
+            continue
+        mesh = object.data
+        if mesh in targets or mesh.library is not None:
+            continue
+        targets[mesh] = object
+    return targets
+
+
+def scoped_meshes(context: Context, scope: str) -> Dict[Mesh, Object]:
+    """
+    Editable meshes covered by a scope, see group_by_mesh()
+
+    :param context: The operator's context
+    :param scope: One of the identifiers in scope_items
+    """
+    return group_by_mesh(scoped_objects(context, scope))
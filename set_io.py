@@ -0,0 +1,132 @@
+import csv
+import itertools
+import json
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
+from .compose import flattened_keys
+from .library import dump_keys, parse_keys
+
+# -----------------------------------------------------------------------------
+#   Import and Export
+# -----------------------------------------------------------------------------
+
+# Number of parsed keys handed to a collection at a time
+BATCH_SIZE = 1024
+
+_booleans = {"1": True, "true": True, "yes": True, "on": True,
+             "0": False, "false": False, "no": False, "off": False}
+
+
+def iter_keys(lines: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    """
+    Stream (name, enabled) pairs out of a newline or comma separated name
+    list, one line at a time. Rows of exactly a name and a boolean are read
+    as a key and its enabled flag, every other cell is a name of its own.
+    Blank cells and lines starting with # are skipped.
+
+    :param lines: Any iterable of text lines, such as an open file
+    """
+    for row in csv.reader(lines):
+        cells = [cell.strip() for cell in row]
+        if not cells or cells[0].startswith("#"):
+            continue
+        if len(cells) == 2 and cells[0] and cells[1].lower() in _booleans:
+            yield cells[0], _booleans[cells[1].lower()]
+            continue
+        for cell in cells:
+            if cell:
+                yield cell, True
+
+
+def read_keys(file: IO[str], json_content: bool = False) -> Iterator[Tuple[str, bool]]:
+    """
+    Keys from a name list, or from a JSON list of keys or object of sets,
+    whose keys are concatenated. JSON is a single document and has to be
+    parsed whole, name lists are streamed.
+    """
+    if not json_content:
+        return iter_keys(file)
+
+    content = json.load(file)
+    if isinstance(content, dict):
+        return iter(parse_keys(list(itertools.chain.from_iterable(content.values()))))
+    return iter(parse_keys(content))
+
+
+def read_sets(file: IO[str]) -> Dict[str, List[Tuple[str, bool]]]:
+    """
+    Sets from a JSON object mapping set names to keys, the format written
+    by write_sets() and used by the set library
+    """
+    content = json.load(file)
+    if not isinstance(content, dict):
+        raise ValueError("Expected a JSON object of Shapekey Sets")
+    return {name: parse_keys(keys) for name, keys in content.items()}
+
+
+def batched(iterable: Iterable, size: int = BATCH_SIZE) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def add_keys(collection, keys: Iterable[Tuple[str, bool]], skip_duplicates: bool = True) -> Tuple[int, int]:
+    """
+    Append keys to a collection of Shapekeys in batches. Each batch adds
+    its items first and then writes their names and disabled flags as ID
+    properties, which skips the update callback every property assignment
+    would call, so callers invalidate the set once afterwards. Duplicates,
+    both of existing items and within the input, are dropped while
+    importing by looking names up in an index rather than deduplicating
+    afterwards.
+    Returns the number of keys added and skipped.
+
+    :param collection: A CollectionProperty of Shapekeys
+    :param keys: (name, enabled) pairs
+    :param skip_duplicates: Leave out names that are already in the list
+    """
+    names = {item.name for item in collection} if skip_duplicates else None
+    added = skipped = 0
+
+    for batch in batched(keys):
+        new_keys = []
+        for name, enabled in batch:
+            if names is not None:
+                if name in names:
+                    skipped += 1
+                    continue
+                names.add(name)
+            new_keys.append((name, enabled))
+
+        start = len(collection)
+        for _ in new_keys:
+            collection.add()
+        # Adding can reallocate the list, so items are looked up once all are added
+        for index, (name, enabled) in enumerate(new_keys, start):
+            item = collection[index]
+            item["name"] = name
+            if not enabled:
+                item["enabled"] = False
+        added += len(new_keys)
+
+    return added, skipped
+
+
+def write_keys(file: IO[str], collection, with_enabled: bool = False):
+    """
+    Write a key list one name per line, or as name,enabled CSV rows
+    """
+    if with_enabled:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerows((item.name, int(item.enabled)) for item in collection)
+    else:
+        file.writelines(item.name + "\n" for item in collection)
+
+
+def write_sets(file: IO[str], shapekey_sets):
+    """
+    Write a collection of ShapekeySets as a JSON object of set names to
+    keys, with composed sets flattened
+    """
+    json.dump({shapekey_set.name: dump_keys(flattened_keys(shapekey_sets, shapekey_set))
+               for shapekey_set in shapekey_sets}, file, indent=1)
@@ -0,0 +1,82 @@
+import time
+from typing import Callable, Iterable
+
+# -----------------------------------------------------------------------------
+#   Time Slicing
+# -----------------------------------------------------------------------------
+
+
+class TimeSlicer():
+    """
+    Works through a queue of items in slices that fit a per-tick time budget,
+    so a modal operator can hand control back to Blender between slices.
+    Doesn't depend on bpy, and the clock can be swapped for a fake one.
+
+    :param items: Work items, processed in order
+    :param work: Called once per item
+    :param budget: Seconds a single step may spend before yielding
+    :param clock: Monotonic clock returning seconds
+    """
+
+    def __init__(self, items: Iterable, work: Callable, budget: float = 0.05,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.items = list(items)
+        self.work = work
+        self.budget = budget
+        self.clock = clock
+        self.done = 0
+        self.started = None
+        self.elapsed = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.items)
+
+    @property
+    def finished(self) -> bool:
+        return self.done >= len(self.items)
+
+    @property
+    def progress(self) -> float:
+        return self.done / len(self.items) if self.items else 1.0
+
+    @property
+    def rate(self) -> float:
+        """
+        Items processed per second of work time so far
+        """
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    def step(self) -> int:
+        """
+        Process items until the budget is spent. At least one item is always
+        processed, so progress is made even when a single item is over budget.
+        Items are never split, so stopping between steps leaves every item
+        either fully processed or untouched.
+        Returns the number of items processed.
+        """
+        start = self.clock()
+        if self.started is None:
+            self.started = start
+
+        processed = 0
+        now = start
+        while not self.finished:
+            self.work(self.items[self.done])
+            self.done += 1
+            processed += 1
+            now = self.clock()
+            if now - start >= self.budget:
+                break
+
+        self.elapsed += now - start
+        return processed
+
+    def run(self) -> int:
+        """
+        Process every remaining item without yielding
+        """
+        processed = 0
+        while not self.finished:
+            processed += self.step()
+        return processed
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from bpy.types import Context, Key, Mesh, Object
+
+from .bulk import add_shape_keys, apply_key_names, read_coords, write_coords
+from .sync import sync_key_order
+
+# -----------------------------------------------------------------------------
+#   Shape Key Snapshots
+# -----------------------------------------------------------------------------
+
+# Per key properties read and written with foreach_get/foreach_set
+_bulk_fields = (("slider_min", np.float32), ("slider_max", np.float32),
+                ("value", np.float32), ("mute", bool))
+
+
+def blob_digest(co: np.ndarray) -> str:
+    return hashlib.blake2b(co.tobytes(), digest_size=16).hexdigest()
+
+
+def read_fields(shape_keys: Key) -> Dict[str, np.ndarray]:
+    """
+    The bulk fields of every key block, one foreach_get per field
+    """
+    key_blocks = shape_keys.key_blocks
+    fields = {}
+    for field, dtype in _bulk_fields:
+        buffer = np.empty(len(key_blocks), dtype=dtype)
+        key_blocks.foreach_get(field, buffer)
+        fields[field] = buffer
+    return fields
+
+
+def mesh_entry(mesh: Mesh) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Describe a mesh's shape keys for the manifest. Coordinates are referred
+    to by the digest of their bytes, so keys with the same shape, such as
+    untouched keys equal to the reference key, share one blob.
+    Returns the manifest entry and the coordinate arrays by digest.
+    """
+    shape_keys = mesh.shape_keys
+    blobs: Dict[str, np.ndarray] = {}
+    keys = []
+    if shape_keys is not None:
+        fields = read_fields(shape_keys)
+        for index, key_block in enumerate(shape_keys.key_blocks):
+            co = read_coords(key_block)
+            digest = blob_digest(co)
+            blobs[digest] = co
+            keys.append({
+                "name": key_block.name,
+                "relative_key": key_block.relative_key.name,
+                "vertex_group": key_block.vertex_group,
+                "interpolation": key_block.interpolation,
+                "slider_min": float(fields["slider_min"][index]),
+                "slider_max": float(fields["slider_max"][index]),
+                "value": float(fields["value"][index]),
+                "mute": bool(fields["mute"][index]),
+                "blob": digest,
+            })
+
+    entry = {"vertices": len(mesh.vertices), "keys": keys}
+    entry["digest"] = hashlib.blake2b(json.dumps(entry, sort_keys=True).encode(), digest_size=16).hexdigest()
+    return entry, blobs
+
+
+class SnapshotStore():
+    """
+    A directory holding the shape keys of any number of meshes: a JSON
+    manifest with one entry per mesh name, and one .npy file per distinct
+    coordinate array, named after its digest. Blobs that already exist are
+    never written again, and restoring memory-maps them, so only the pages
+    foreach_set reads are loaded.
+
+    :param directory: The snapshot directory, created on first save
+    """
+    MANIFEST = "manifest.json"
+    BLOBS = "blobs"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._manifest = None
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def blob_path(self, digest: str) -> str:
+        return self._path(self.BLOBS, digest + ".npy")
+
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            try:
+                with open(self._path(self.MANIFEST)) as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError):
+                manifest = {}
+            self._manifest = manifest if manifest.get("version") == 1 else {"version": 1, "meshes": {}}
+        return self._manifest
+
+    def entry(self, mesh_name: str) -> Optional[dict]:
+        return self.manifest()["meshes"].get(mesh_name)
+
+    def save(self, meshes: List[Mesh]) -> Tuple[int, int, int]:
+        """
+        Snapshot meshes, replacing their earlier entries. Meshes whose
+        entry has the same digest are skipped.
+        Returns the number of meshes saved, meshes unchanged and blobs
+        written.
+        """
+        os.makedirs(self._path(self.BLOBS), exist_ok=True)
+        manifest = self.manifest()
+        saved = unchanged = written = 0
+
+        for mesh in meshes:
+            entry, blobs = mesh_entry(mesh)
+            previous = manifest["meshes"].get(mesh.name)
+            if previous is not None and previous["digest"] == entry["digest"]:
+                unchanged += 1
+                continue
+
+            for digest, co in blobs.items():
+                path = self.blob_path(digest)
+                if os.path.exists(path):
+                    continue
+                # Write next to the blob and rename, so an interrupted save never leaves a partial blob
+                with open(path + ".tmp", "wb") as file:
+                    np.save(file, co)
+                os.replace(path + ".tmp", path)
+                written += 1
+
+            manifest["meshes"][mesh.name] = entry
+            saved += 1
+
+        if saved:
+            self._write_manifest()
+            self.prune()
+        return saved, unchanged, written
+
+    def _write_manifest(self):
+        path = self._path(self.MANIFEST)
+        with open(path + ".tmp", "w") as file:
+            json.dump(self._manifest, file, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def prune(self) -> int:
+        """
+        Delete blobs no entry refers to anymore. Returns the number deleted.
+        """
+        used = {key["blob"] for entry in self.manifest()["meshes"].values() for key in entry["keys"]}
+        removed = 0
+        for file in os.scandir(self._path(self.BLOBS)):
+            if file.name.endswith(".npy") and file.name[:-4] not in used:
+                os.remove(file.path)
+                removed += 1
+        return removed
+
+    def read_blob(self, digest: str) -> np.ndarray:
+        return np.load(self.blob_path(digest), mmap_mode='r')
+
+
+def restorable(mesh: Mesh, entry: dict, store: SnapshotStore) -> bool:
+    """
+    Whether restore_mesh() can restore an entry exactly. The vertex count
+    has to match and every blob has to exist. The reference key can't be
+    moved, so when the snapshot's reference key is another key of the mesh
+    now, its order can't be restored either.
+    """
+    if len(mesh.vertices) != entry["vertices"]:
+        return False
+    keys = entry["keys"]
+    if keys and mesh.shape_keys is not None:
+        first = keys[0]["name"]
+        key_blocks = mesh.shape_keys.key_blocks
+        if mesh.shape_keys.reference_key.name != first and first in key_blocks:
+            return False
+    return all(os.path.exists(store.blob_path(key["blob"])) for key in keys)
+
+
+def restore_mesh(context: Context, object: Object, entry: dict, store: SnapshotStore) -> bool:
+    """
+    Give an object's mesh back the shape keys of a snapshot entry: keys
+    added since are removed, removed ones are added again, keys are put
+    back in order with sync_key_order(), and every key's settings and
+    coordinates are written in bulk.
+    Returns False without changing anything when the entry isn't
+    restorable().
+
+    :param context: The operator's context, for reordering keys
+    :param object: A MESH object, not in Edit Mode
+    :param entry: The mesh's entry in the store's manifest
+    :param store: The store holding the entry's blobs
+    """
+    mesh = object.data
+    if not restorable(mesh, entry, store):
+        return False
+
+    keys = entry["keys"]
+    if not keys:
+        if mesh.shape_keys is not None:
+            object.shape_key_clear()
+        return True
+
+    names = [key["name"] for key in keys]
+    if mesh.shape_keys is None:
+        add_shape_keys(object, names[:1])
+    reference = mesh.shape_keys.reference_key
+    if reference.name != names[0] and names[0] not in mesh.shape_keys.key_blocks:
+        reference.name = names[0]
+
+    apply_key_names(object, names)
+    sync_key_order(context, object, names, remove_extra=True)
+
+    key_blocks = mesh.shape_keys.key_blocks
+    for field, dtype in _bulk_fields:
+        key_blocks.foreach_set(field, np.array([key[field] for key in keys], dtype=dtype))
+    for key_block, key in zip(key_blocks, keys):
+        key_block.relative_key = key_blocks[key["relative_key"]]
+        key_block.vertex_group = key["vertex_group"]
+        key_block.interpolation = key["interpolation"]
+        write_coords(key_block, store.read_blob(key["blob"]))
+    mesh.shape_keys.update_tag()
+    return True
@@ -0,0 +1,133 @@
+from typing import Dict, Iterable, Optional, Tuple
+import bpy
+
+from bpy.app.handlers import persistent
+from bpy.types import Scene, Text
+
+from .compose import generation
+
+# -----------------------------------------------------------------------------
+#   Shared Set Storage
+# -----------------------------------------------------------------------------
+
+# Name of the Text datablock new shared containers are created with
+SHARED_SETS_NAME = "Shapekey Sets"
+
+
+class SetView(list):
+    """
+    The ShapekeySets a Scene sees when it uses shared sets: the shared sets
+    in their order, each replaced by the Scene's set of the same name if it
+    has one, followed by the Scene's other sets.
+
+    :param key: Identifies the Scene and container, so caches of results
+        that depend on the other sets, like resolved includes, are kept
+        apart per Scene
+    """
+
+    def __init__(self, sets: Iterable, key: Tuple[int, int]):
+        super().__init__(sets)
+        self.key = key
+
+
+# Set views by scene pointer, with the signature they were built for
+_views: Dict[int, Tuple[tuple, SetView]] = {}
+
+
+def shares_sets(scene: Scene) -> bool:
+    """
+    Whether the Scene's panel edits the shared sets rather than its own
+    """
+    return scene.shapekey_sets_shared is not None and not scene.shapekey_sets_edit_overrides
+
+
+def sets_root(scene: Scene):
+    """
+    The object holding the set list the Scene's panel edits, the shared
+    container or the Scene itself
+    """
+    return scene.shapekey_sets_shared if shares_sets(scene) else scene
+
+
+def scene_sets(scene: Scene):
+    """
+    Every ShapekeySet of a Scene, for applying and resolving includes. The
+    Scene's own list when it doesn't use shared sets, a cached SetView
+    otherwise.
+    """
+    shared = scene.shapekey_sets_shared
+    if shared is None:
+        return scene.shapekey_sets
+
+    key = (scene.as_pointer(), shared.as_pointer())
+    signature = (key, generation())
+    cached = _views.get(key[0])
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    overrides = {}
+    for shapekey_set in scene.shapekey_sets:
+        overrides.setdefault(shapekey_set.name, shapekey_set)
+    sets = [overrides.pop(shapekey_set.name, shapekey_set) for shapekey_set in shared.shapekey_sets]
+    sets.extend(overrides.values())
+
+    view = SetView(sets, key)
+    _views[key[0]] = (signature, view)
+    return view
+
+
+def edited_set(scene: Scene):
+    """
+    The active set of the list the Scene's panel edits, or None
+    """
+    root = sets_root(scene)
+    if len(root.shapekey_sets) == 0:
+        return None
+    return root.shapekey_sets[min(root.active_shapekey_set_index, len(root.shapekey_sets) - 1)]
+
+
+def override_of(scene: Scene, shapekey_set):
+    """
+    The Scene's own set with the name of a shared set, or None
+    """
+    for item in scene.shapekey_sets:
+        if item.name == shapekey_set.name:
+            return item
+    return None
+
+
+def active_set(scene: Scene):
+    """
+    The set operators apply: the edited set, swapped for the Scene's
+    override when the edited set is a shared one
+    """
+    shapekey_set = edited_set(scene)
+    if shapekey_set is None or not shares_sets(scene):
+        return shapekey_set
+    return override_of(scene, shapekey_set) or shapekey_set
+
+
+def file_shared_sets() -> Optional[Text]:
+    """
+    The shared container another Scene of the file uses, if any
+    """
+    for scene in bpy.data.scenes:
+        if scene.shapekey_sets_shared is not None:
+            return scene.shapekey_sets_shared
+    return None
+
+
+def new_shared_sets() -> Text:
+    shared = bpy.data.texts.new(SHARED_SETS_NAME)
+    # The sets live in the container's properties, not its text, so nothing else uses it
+    shared.use_fake_user = True
+    shared.from_string("Shapekey Sets shared by the Scenes of this file. Edit them in Properties > Data.\n")
+    return shared
+
+
+@persistent
+def clear_views(*args):
+    """
+    Views hold Scene and set pointers, which change on undo and file load
+    """
+    _views.clear()
@@ -0,0 +1,65 @@
+from typing import List, Tuple
+import bpy
+
+from bpy.types import Context, Object
+
+from .core import desired_order, move_steps, plan_moves
+
+# -----------------------------------------------------------------------------
+#   Key Order Sync
+# -----------------------------------------------------------------------------
+
+
+def _move_key(context: Context, object: Object, index: int, direction: str):
+    object.active_shape_key_index = index
+    if not hasattr(context, "temp_override"):
+        # Blender before 3.2 takes the override as the operator's first argument
+        bpy.ops.object.shape_key_move({"object": object, "active_object": object}, type=direction)
+        return
+    with context.temp_override(object=object, active_object=object):
+        bpy.ops.object.shape_key_move(type=direction)
+
+
+def sync_key_order(context: Context, object: Object, names: List[str],
+                   remove_extra: bool = False) -> Tuple[int, int]:
+    """
+    Reorder an object's shape keys to follow a set, optionally removing keys
+    that aren't in it, with as few move operations as possible. Keys of the
+    set that are missing on the mesh are ignored, apply the set first.
+    Returns the number of keys moved and removed.
+
+    :param context: The operator's context
+    :param object: A MESH object, not in Edit Mode
+    :param names: Key names of the set, in order
+    :param remove_extra: Remove keys that aren't in the set
+    """
+    shape_keys = object.data.shape_keys
+    if shape_keys is None:
+        return 0, 0
+
+    key_blocks = shape_keys.key_blocks
+    active_name = object.active_shape_key.name if object.active_shape_key else None
+    current = [key_block.name for key_block in key_blocks]
+    desired = desired_order(current, names, remove_extra)
+
+    removed = 0
+    if remove_extra:
+        keep = set(desired)
+        for name in current[1:]:
+            if name not in keep:
+                object.shape_key_remove(key_blocks[name])
+                removed += 1
+        current = [name for name in current if name in keep]
+
+    moves = plan_moves(current, desired)
+    last = len(current) - 1
+    for name, source, target in moves:
+        index = source
+        for direction in move_steps(source, target, last):
+            _move_key(context, object, index, direction)
+            index = {'UP': index - 1, 'DOWN': index + 1, 'TOP': 1, 'BOTTOM': last}[direction]
+
+    if active_name is not None and active_name in key_blocks:
+        object.active_shape_key_index = key_blocks.find(active_name)
+
+    return len(moves), removed
@@ -0,0 +1,56 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import fake_bpy  # noqa: E402
+
+# The addon's own __init__.py makes pytest treat the repository as the
+# package of these tests and import it, which needs a bpy
+fake_bpy.install()
+
+
+def load_source(name: str, filename: str):
+    """
+    Import one file of the addon as a standalone module
+    """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def purge_addon():
+    for name in [name for name in sys.modules if name.split(".")[0] == "shapekey_sets"]:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def core(monkeypatch):
+    """
+    core.py, imported while bpy can't be imported at all
+    """
+    monkeypatch.setitem(sys.modules, "bpy", None)
+    return load_source("shapekey_sets_core", "core.py")
+
+
+@pytest.fixture
+def addon():
+    """
+    The addon package registered on a fresh fake bpy
+    """
+    purge_addon()
+    fake_bpy.install()
+    spec = importlib.util.spec_from_file_location(
+        "shapekey_sets", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    module.register()
+    yield module
+    module.unregister()
+    purge_addon()
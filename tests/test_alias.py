@@ -0,0 +1,82 @@
+from conftest import fake_bpy
+
+RULES = "Left/Right, _L/_R, .L/.R, _l/_r, .l/.r"
+
+
+def normalizer(fold_case=True, strip_separators=True, side_rules=RULES):
+    from shapekey_sets.alias import Normalizer
+
+    return Normalizer(fold_case, strip_separators, side_rules)
+
+
+def test_differently_written_names_normalize_alike(addon):
+    normalize = normalizer()
+
+    assert normalize("EyeBlink_L") == normalize("eye_blink_left") == normalize("eyeBlinkLeft")
+    assert normalize("mouthLeft") != normalize("mouthRight")
+    # A side suffix alone is a name, not a side
+    assert normalize("Left") == "left"
+
+
+def test_options_keep_case_separators_and_sides(addon):
+    assert normalizer(fold_case=False)("eye_Blink") == "eyeBlink"
+    assert normalizer(strip_separators=False)("Eye Blink") == "eye blink"
+    assert normalizer(side_rules="")("eyeBlinkLeft") == "eyeblinkleft"
+
+
+def test_existing_keys_match_set_keys_written_differently(addon):
+    from shapekey_sets.alias import AliasIndex
+
+    index = AliasIndex(["eyeBlinkLeft", "mouthLeft", "mouthRight"], {}, normalizer())
+    matches = index.match(["eyeBlinkLeft", "mouthLeft", "mouthRight"], ["EyeBlink_L", "mouth_R"])
+
+    assert matches == {"eyeBlinkLeft": "EyeBlink_L", "mouthRight": "mouth_R"}
+
+
+def test_exact_names_are_never_matched(addon):
+    from shapekey_sets.alias import AliasIndex
+
+    index = AliasIndex(["jawOpen", "jaw_open"], {}, normalizer())
+    # jawOpen exists and jaw_open is also wanted, so neither stands for the other
+    assert index.match(["jawOpen", "jaw_open"], ["jawOpen"]) == {}
+    assert index.match(["jaw_open", "JawOpen"], ["jaw_open"]) == {}
+
+
+def test_an_existing_key_is_claimed_once(addon):
+    from shapekey_sets.alias import AliasIndex
+
+    index = AliasIndex(["eyeBlinkLeft", "eye_blink_L"], {}, normalizer())
+    assert index.match(["eyeBlinkLeft", "eye_blink_L"], ["EyeBlink_L"]) == {"eyeBlinkLeft": "EyeBlink_L"}
+
+
+def test_explicit_aliases_match(addon):
+    from shapekey_sets.alias import AliasIndex
+
+    index = AliasIndex(["jawOpen"], {"jawOpen": ["MouthOpen", "A"]}, normalizer())
+    assert index.match(["jawOpen"], ["mouth_open"]) == {"jawOpen": "mouth_open"}
+    assert index.match(["jawOpen"], ["a"]) == {"jawOpen": "a"}
+
+
+def test_set_alias_index_uses_aliases_of_every_set(addon):
+    from shapekey_sets.alias import get_normalizer, set_alias_index
+    from shapekey_sets.compose import invalidate_set
+
+    sets = fake_bpy.new_scene().shapekey_sets
+    face = sets.add()
+    face.name = "Face"
+    face.shapekeys.add().name = "jawOpen"
+    other = sets.add()
+    other.name = "Visemes"
+    shapekey = other.shapekeys.add()
+    shapekey.name = "jawOpen"
+    shapekey.aliases = "MouthOpen"
+    normalize = get_normalizer(True, True, RULES)
+
+    index = set_alias_index(sets, face, normalize)
+    assert index.match(["jawOpen"], ["mouth_open"]) == {"jawOpen": "mouth_open"}
+    assert set_alias_index(sets, face, normalize) is index
+
+    # Renaming the aliased key, without the update callback the fake bpy doesn't run
+    shapekey.name = "jawForward"
+    invalidate_set("Visemes")
+    assert set_alias_index(sets, face, normalize).match(["jawOpen"], ["mouth_open"]) == {}
@@ -0,0 +1,34 @@
+import types
+
+from conftest import fake_bpy
+
+
+def mesh_object(name, *keys):
+    object = fake_bpy.new_object(name, 4)
+    object.data.users = 1
+    for key in keys:
+        object.shape_key_add(name=key)
+    return object
+
+
+def test_deleted_meshes_leave_the_report(addon):
+    import bpy
+    from shapekey_sets import audit
+
+    scene = fake_bpy.new_scene()
+    shapekey_set = scene.shapekey_sets.add()
+    shapekey_set.name = "Face"
+    shapekey_set.shapekeys.add().name = "a"
+
+    mesh_object("Head", "Basis", "a")
+    body = mesh_object("Body", "Basis")
+    mesh_object("Hands", "Basis")
+    assert audit.audit_all(scene.shapekey_sets) == {"Face": 1}
+    assert [name for name, _ in audit.failing_meshes(scene.shapekey_sets, shapekey_set)] == ["Body", "Hands"]
+
+    bpy.data.objects.remove(body)
+    bpy.data.meshes.remove(body.data)
+    audit.audit_depsgraph_update(scene, types.SimpleNamespace(updates=[]))
+
+    assert audit.audit_count() == 2
+    assert [name for name, _ in audit.failing_meshes(scene.shapekey_sets, shapekey_set)] == ["Hands"]
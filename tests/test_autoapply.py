@@ -0,0 +1,97 @@
+import types
+
+from conftest import fake_bpy
+
+
+def depsgraph(*objects):
+    for object in objects:
+        object.original = object
+    return types.SimpleNamespace(updates=[types.SimpleNamespace(id=object) for object in objects])
+
+
+def ruled_scene():
+    scene = fake_bpy.new_scene()
+    scene.name = "Scene"
+    scene.shapekey_sets_use_auto_apply = True
+    rule = scene.shapekey_sets_auto_rules.add()
+    rule.name = "Face"
+    rule.pattern = "*"
+    return scene
+
+
+def test_new_object_at_a_deleted_objects_address_is_queued(addon):
+    import bpy
+    from shapekey_sets import autoapply
+
+    scene = ruled_scene()
+    old = fake_bpy.new_object("Old", 4)
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(old))
+    assert autoapply._queue[scene.name] == {"Old"}
+    autoapply._queue.clear()
+
+    # Delete the object, which updates the depsgraph, and allocate a new one at its address
+    bpy.data.objects.remove(old)
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph())
+    new = fake_bpy.new_object("New", 4)
+    new.as_pointer = old.as_pointer
+
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(new))
+    assert autoapply._queue[scene.name] == {"New"}
+
+
+def test_flush_forgets_deleted_objects(addon):
+    import bpy
+    from shapekey_sets import autoapply
+
+    scene = ruled_scene()
+    objects = [fake_bpy.new_object("Object %d" % index, 4) for index in range(3)]
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(*objects))
+    bpy.data.objects.remove(objects[0])
+
+    # Nothing left to apply, only the pruning is tested
+    autoapply._queue.clear()
+    autoapply._last_queued = 0.0
+    autoapply.flush_queue()
+    assert autoapply._seen == {object.as_pointer() for object in objects[1:]}
+
+
+def test_existing_objects_are_not_new_to_a_first_rule(addon):
+    from shapekey_sets import autoapply
+    from shapekey_sets.op import SHAPEKEY_SETS_OT_data_rule_list_actions
+
+    scene = fake_bpy.new_scene()
+    scene.name = "Scene"
+    loaded = fake_bpy.new_object("Loaded", 4)
+    autoapply.auto_apply_load()
+    # Created after the file was opened, before Auto Apply was enabled
+    existing = fake_bpy.new_object("Existing", 4)
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(existing))
+
+    scene.shapekey_sets_use_auto_apply = True
+    operator = SHAPEKEY_SETS_OT_data_rule_list_actions()
+    operator.action = 'ADD'
+    operator.invoke(fake_bpy.Context(scene), None)
+    scene.shapekey_sets_auto_rules[0].pattern = "*"
+
+    # Moving or editing them puts them into an update
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(loaded, existing))
+    assert scene.name not in autoapply._queue
+
+    new = fake_bpy.new_object("New", 4)
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(loaded, existing, new))
+    assert autoapply._queue[scene.name] == {"New"}
+
+
+def test_enabling_auto_apply_sees_existing_objects(addon):
+    from shapekey_sets import autoapply
+
+    scene = ruled_scene()
+    scene.shapekey_sets_use_auto_apply = False
+    existing = fake_bpy.new_object("Existing", 4)
+
+    # The update callback of the Auto Apply option
+    scene.shapekey_sets_use_auto_apply = True
+    autoapply.seed_seen()
+
+    autoapply.auto_apply_depsgraph_update(scene, depsgraph(existing))
+    assert scene.name not in autoapply._queue
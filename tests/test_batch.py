@@ -0,0 +1,160 @@
+import json
+import sys
+
+import pytest
+
+from conftest import fake_bpy, load_source, purge_addon
+
+batch = load_source("shapekey_sets_batch", "batch.py")
+
+# Stands in for Blender: reads the worker arguments batch.worker_command()
+# passes and writes a result for them, or fails for files named so
+FAKE_BLENDER = '''
+import json, os, sys, time
+path = sys.argv[sys.argv.index("--factory-startup") + 1]
+args = sys.argv[sys.argv.index("--") + 1:]
+result = args[args.index("--result") + 1]
+names = json.load(open(args[args.index("--names-file") + 1]))
+name = os.path.basename(path)
+if name.startswith("broken"):
+    print("Error: broken file", file=sys.stderr)
+    sys.exit(1)
+if name.startswith("flaky") and not os.path.exists(path + ".tried"):
+    open(path + ".tried", "w").close()
+    sys.exit(1)
+if name.startswith("slow"):
+    time.sleep(5)
+json.dump({"meshes": 2, "created": 2 * len(names), "skipped": 0, "saved": "--no-save" not in args}, open(result, "w"))
+'''
+
+
+@pytest.fixture
+def blender(tmp_path):
+    script = tmp_path / "fake_blender.py"
+    script.write_text(FAKE_BLENDER)
+    return [sys.executable, str(script)]
+
+
+def blend_files(directory, *names):
+    paths = []
+    for name in names:
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+        paths.append(str(path))
+    return paths
+
+
+# -----------------------------------------------------------------------------
+#   Set Lookup
+# -----------------------------------------------------------------------------
+
+
+def test_resolve_names_concatenates_sets():
+    sets = {"a": ["x", "y"], "b": ["z"]}
+    assert batch.resolve_names(sets, ["b", "a"]) == ["z", "x", "y"]
+    with pytest.raises(KeyError):
+        batch.resolve_names(sets, ["c"])
+
+
+def test_load_sets(tmp_path):
+    assert "ARKit Face Blendshapes" in batch.load_sets()
+    sets_file = tmp_path / "sets.json"
+    sets_file.write_text(json.dumps({"mine": ["a"]}))
+    assert batch.load_sets(str(sets_file)) == {"mine": ["a"]}
+
+
+def test_expand_globs_is_recursive_and_sorted(tmp_path):
+    files = blend_files(tmp_path, "b.blend", "a/c.blend", "a/d/e.blend", "notes.txt")
+    pattern = str(tmp_path / "**" / "*.blend")
+    assert batch.expand_globs([pattern, pattern]) == sorted(path for path in files if path.endswith(".blend"))
+
+
+# -----------------------------------------------------------------------------
+#   Scheduler
+# -----------------------------------------------------------------------------
+
+
+def test_worker_command():
+    command = batch.worker_command(["blender"], "file.blend", "names.json", "result.json", save=False)
+    assert command[:4] == ["blender", "-b", "--factory-startup", "file.blend"]
+    assert command[command.index("--") + 1:] == [
+        "--worker", "--names-file", "names.json", "--result", "result.json", "--no-save"]
+
+
+def test_run_batch_summary(tmp_path, blender):
+    files = blend_files(tmp_path, "one.blend", "two.blend", "broken.blend")
+    summary = batch.run_batch(files, ["a", "b"], blender, workers=2, retries=1, save=False)
+
+    totals = summary["totals"]
+    assert (totals["files"], totals["succeeded"], totals["failed"]) == (3, 2, 1)
+    assert (totals["meshes"], totals["created"]) == (4, 8)
+
+    results = {result["path"]: result for result in summary["files"]}
+    assert [result["path"] for result in summary["files"]] == files
+    assert results[files[0]]["saved"] is False
+    broken = results[files[2]]
+    assert broken["attempts"] == 2
+    assert broken["error"] == "Exit code 1: Error: broken file"
+
+
+def test_run_batch_retries_failed_files(tmp_path, blender):
+    files = blend_files(tmp_path, "flaky.blend")
+    result, = batch.run_batch(files, ["a"], blender, retries=1)["files"]
+    assert result["ok"] and result["attempts"] == 2
+
+
+def test_run_batch_timeout(tmp_path, blender):
+    files = blend_files(tmp_path, "slow.blend")
+    result, = batch.run_batch(files, ["a"], blender, retries=0, timeout=0.5)["files"]
+    assert not result["ok"]
+    assert result["error"] == "Timed out after 0.5s"
+
+
+def test_missing_blender_is_not_retried(tmp_path):
+    files = blend_files(tmp_path, "one.blend")
+    result, = batch.run_batch(files, ["a"], [str(tmp_path / "no_blender")], retries=3)["files"]
+    assert not result["ok"] and result["attempts"] == 1
+
+
+def test_main_writes_summary(tmp_path, blender, capsys):
+    blend_files(tmp_path, "one.blend", "broken.blend")
+    summary_file = tmp_path / "summary.json"
+    code = batch.main([str(tmp_path / "*.blend"), "--set", "VRChat Visemes", "--workers", "1",
+                       "--retries", "0", "--blender", " ".join(blender), "--summary", str(summary_file)])
+    assert code == 1
+    assert json.loads(summary_file.read_text())["totals"]["succeeded"] == 1
+    assert capsys.readouterr().out.startswith("1/2 files")
+
+
+def test_main_requires_a_set(capsys):
+    with pytest.raises(SystemExit):
+        batch.main(["*.blend"])
+
+
+# -----------------------------------------------------------------------------
+#   Worker
+# -----------------------------------------------------------------------------
+
+
+def test_run_worker_applies_names_once_per_mesh(tmp_path):
+    purge_addon()
+    bpy = fake_bpy.install()
+    first = fake_bpy.new_object("first", 8)
+    # A linked duplicate, sharing the first object's mesh
+    bpy.data.objects.append(fake_bpy.Object("linked", first.data))
+    second = fake_bpy.new_object("second", 8)
+    second.shape_key_add(name="Basis")
+    second.shape_key_add(name="b")
+
+    names_file = tmp_path / "names.json"
+    names_file.write_text(json.dumps(["Basis", "a", "b"]))
+    result_file = tmp_path / "result.json"
+    try:
+        batch.run_worker(str(names_file), str(result_file), save=False)
+    finally:
+        purge_addon()
+
+    result = json.loads(result_file.read_text())
+    assert (result["meshes"], result["created"], result["skipped"]) == (2, 4, 2)
+    assert [key_block.name for key_block in second.data.shape_keys.key_blocks] == ["Basis", "b", "a"]
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class FakeKeyframePoints():
+    def __init__(self):
+        self.fields = {}
+        self.count = 0
+
+    def add(self, count):
+        self.count += count
+
+    def foreach_set(self, field, values):
+        self.fields[field] = np.array(values)
+
+
+class FakeFCurve():
+    def __init__(self):
+        self.keyframe_points = FakeKeyframePoints()
+        self.updated = False
+
+    def update(self):
+        self.updated = True
+
+
+def test_decimate_keeps_samples_linear_interpolation_needs(addon):
+    from shapekey_sets.capture import decimate
+
+    frames = np.arange(9, dtype=np.float64)
+    values = np.array([0, 1, 2, 3, 4, 3, 2, 2.01, 2])
+    assert decimate(frames, values, 0.05).tolist() == [0, 4, 6, 8]
+    assert decimate(frames, values, 0.0).tolist() == list(range(9))
+
+
+def test_write_fcurve_interpolates_linearly(addon):
+    from shapekey_sets.capture import INTERPOLATION_LINEAR, write_fcurve
+
+    fcurve = FakeFCurve()
+    write_fcurve(fcurve, np.array([1.0, 5.0, 9.0]), np.array([0.0, 1.0, 0.5]))
+
+    points = fcurve.keyframe_points
+    assert points.count == 3
+    assert points.fields["co"].tolist() == [1.0, 0.0, 5.0, 1.0, 9.0, 0.5]
+    assert points.fields["interpolation"].tolist() == [INTERPOLATION_LINEAR] * 3
+    assert fcurve.updated
@@ -0,0 +1,58 @@
+import types
+
+from conftest import fake_bpy
+
+
+def add_set(sets, name, keys, includes=()):
+    shapekey_set = sets.add()
+    shapekey_set.name = name
+    for key in keys:
+        shapekey_set.shapekeys.add().name = key
+    for include in includes:
+        shapekey_set.includes.add().name = include
+    return shapekey_set
+
+
+def test_only_changed_sets_and_their_includers_resolve_again(addon):
+    from shapekey_sets.compose import invalidate_set, resolve_set
+
+    sets = fake_bpy.new_scene().shapekey_sets
+    base = add_set(sets, "Base", ["a"])
+    face = add_set(sets, "Face", ["b"], ["Base"])
+    body = add_set(sets, "Body", ["c"])
+    resolved = {shapekey_set.name: resolve_set(sets, shapekey_set) for shapekey_set in (base, face, body)}
+
+    # Without the update callback, which the fake bpy doesn't run
+    base.shapekeys[0].name = "x"
+    invalidate_set("Base")
+
+    assert resolve_set(sets, body) is resolved["Body"]
+    assert resolve_set(sets, base).names == ("x",)
+    assert resolve_set(sets, face).names == ("x", "b")
+
+
+def test_renaming_a_set_resolves_every_set_again(addon):
+    from shapekey_sets.compose import invalidate_resolved, resolve_set
+
+    sets = fake_bpy.new_scene().shapekey_sets
+    add_set(sets, "Base", ["a"])
+    face = add_set(sets, "Face", ["b"], ["Core"])
+    assert resolve_set(sets, face).missing == ("Core",)
+
+    sets[0].name = "Core"
+    invalidate_resolved()
+    assert resolve_set(sets, face).names == ("a", "b")
+
+
+def test_item_updates_invalidate_the_set_holding_them(addon):
+    from shapekey_sets.compose import invalidate_owner, set_version
+
+    sets = fake_bpy.new_scene().shapekey_sets
+    face = add_set(sets, "Face", ["a"])
+    # What an item's RNA path leads to in Blender
+    scene = types.SimpleNamespace(path_resolve={"shapekey_sets[0]": face}.__getitem__)
+    shapekey = types.SimpleNamespace(id_data=scene, path_from_id=lambda: "shapekey_sets[0].shapekeys[0]")
+
+    invalidate_owner(shapekey, None)
+    assert set_version("Face") == 1
+    assert set_version("Body") == 0
@@ -0,0 +1,155 @@
+import pytest
+
+
+def spec(core, name, keys=(), includes=(), disabled=(), excluded=()):
+    return core.SetSpec(name, tuple((key, key not in disabled, key in excluded) for key in keys),
+                        tuple(includes))
+
+
+# -----------------------------------------------------------------------------
+#   Set Model
+# -----------------------------------------------------------------------------
+
+
+def test_spec_from_names(core):
+    assert core.spec_from_names("Visemes", ["aa", "oh"]) == core.SetSpec(
+        "Visemes", (("aa", True, False), ("oh", True, False)))
+
+
+def test_missing_key_names_keeps_order_and_drops_repeats(core):
+    assert core.missing_key_names(["a", "b", "c", "b", "d"], {"c"}) == ["a", "b", "d"]
+    assert core.missing_key_names([], {"a"}) == []
+
+
+def test_duplicate_indices(core):
+    assert core.duplicate_indices(["a", "b", "a", "c", "b", "a"]) == [2, 4, 5]
+    assert core.duplicate_indices(["a", "b"]) == []
+
+
+# -----------------------------------------------------------------------------
+#   Composition
+# -----------------------------------------------------------------------------
+
+
+def test_merge_names_puts_includes_first(core):
+    keys = (("c", True, False), ("a", True, False), ("d", False, False))
+    assert core.merge_names([("a", "b"), ("b", "e")], keys) == ("a", "b", "e", "c")
+
+
+def test_merge_names_excludes_included_keys(core):
+    keys = (("b", True, True), ("c", True, False))
+    assert core.merge_names([("a", "b")], keys) == ("a", "c")
+
+
+def test_resolve_specs_nested(core):
+    specs = {
+        "base": spec(core, "base", ["a", "b"]),
+        "middle": spec(core, "middle", ["c", "a"], includes=["base"]),
+        "top": spec(core, "top", ["d", "x", "b"], includes=["middle"], disabled=["x"], excluded=["b"]),
+    }
+    resolved = core.resolve_specs(specs, "top")
+    assert resolved == core.Resolution(("a", "c", "d"), (), ())
+
+
+def test_resolve_specs_reports_cycles(core):
+    specs = {
+        "a": spec(core, "a", ["x"], includes=["b"]),
+        "b": spec(core, "b", ["y"], includes=["a"]),
+    }
+    assert core.resolve_specs(specs, "a") == core.Resolution(("y", "x"), ("a",), ())
+    assert core.resolve_specs(specs, "b") == core.Resolution(("x", "y"), ("b",), ())
+
+
+def test_resolve_specs_self_include(core):
+    specs = {"a": spec(core, "a", ["x"], includes=["a"])}
+    assert core.resolve_specs(specs, "a") == core.Resolution(("x",), ("a",), ())
+
+
+def test_resolve_specs_reports_missing_includes(core):
+    specs = {
+        "a": spec(core, "a", ["x"], includes=["gone", "b"]),
+        "b": spec(core, "b", ["y"], includes=["gone", "also gone"]),
+    }
+    assert core.resolve_specs(specs, "a") == core.Resolution(("y", "x"), (), ("gone", "also gone"))
+
+
+def test_names_fingerprint(core):
+    assert core.names_fingerprint(("a", "b")) == core.names_fingerprint(("a", "b"))
+    assert core.names_fingerprint(("a", "b")) != core.names_fingerprint(("b", "a"))
+    # Names are separated, so splitting a name differently changes the digest
+    assert core.names_fingerprint(("ab",)) != core.names_fingerprint(("a", "b"))
+
+
+# -----------------------------------------------------------------------------
+#   Key Order Planning
+# -----------------------------------------------------------------------------
+
+
+def replay(current, moves):
+    order = list(current)
+    for name, source, target in moves:
+        assert order[source] == name
+        order.insert(target, order.pop(source))
+    return order
+
+
+@pytest.mark.parametrize("current, desired, count", [
+    ("abcd", "abcd", 0),
+    ("abcd", "dabc", 1),
+    ("abcd", "bcda", 1),
+    ("abcde", "edcba", 4),
+    ("abcdef", "acebdf", 2),
+])
+def test_plan_moves(core, current, desired, count):
+    moves = core.plan_moves(list(current), list(desired))
+    assert len(moves) == count
+    assert replay(current, moves) == list(desired)
+
+
+def test_desired_order_keeps_reference_first(core):
+    current = ["Basis", "c", "x", "a", "b"]
+    assert core.desired_order(current, ["a", "b", "c", "missing"], False) == ["Basis", "a", "b", "c", "x"]
+    assert core.desired_order(current, ["a", "b", "c", "missing"], True) == ["Basis", "a", "b", "c"]
+    # A set naming the reference key doesn't move it
+    assert core.desired_order(current, ["b", "Basis"], True) == ["Basis", "b"]
+
+
+@pytest.mark.parametrize("source, target, last, steps", [
+    (3, 2, 10, ['UP']),
+    (2, 5, 10, ['DOWN'] * 3),
+    (9, 1, 10, ['TOP']),
+    (8, 2, 10, ['TOP', 'DOWN']),
+    (1, 10, 10, ['BOTTOM']),
+    (2, 9, 10, ['BOTTOM', 'UP']),
+])
+def test_move_steps(core, source, target, last, steps):
+    assert core.move_steps(source, target, last) == steps
+
+
+# -----------------------------------------------------------------------------
+#   Compliance Diff
+# -----------------------------------------------------------------------------
+
+
+def test_audit_keys_compliant(core):
+    result = core.audit_keys(("Basis", "a", "b"), ["a", "b"])
+    assert result == core.AuditResult((), (), ())
+    assert result.compliant
+
+
+def test_audit_keys_missing_and_extra(core):
+    result = core.audit_keys(("Basis", "a", "x"), ["a", "b"])
+    assert result.missing == ("b",)
+    assert result.extra == ("x",)
+    assert not result.compliant
+
+
+def test_audit_keys_counts_only_keys_that_must_move(core):
+    result = core.audit_keys(("Basis", "d", "a", "b", "c"), ["a", "b", "c", "d"])
+    assert result.out_of_order == ("d",)
+    assert result.missing == result.extra == ()
+
+
+def test_audit_keys_ignores_reference_key(core):
+    # The reference key is neither extra nor out of order
+    assert core.audit_keys(("a", "b"), ["b", "a"]).compliant
@@ -0,0 +1,54 @@
+import json
+
+from conftest import fake_bpy
+
+
+def library_context(addon, directory):
+    context = fake_bpy.Context(fake_bpy.new_scene())
+    context.preferences.addons["shapekey_sets"].preferences.library_path = str(directory)
+    return context
+
+
+def test_set_items_only_read_the_refreshed_index(addon, tmp_path, monkeypatch):
+    import bpy
+    from shapekey_sets import op
+
+    (tmp_path / "face.json").write_text(json.dumps({"Face": ["a", "b"], "Eyes": ["c"]}))
+    context = library_context(addon, tmp_path)
+    monkeypatch.setattr(bpy, "context", context)
+    assert op.library_set_items(None, context) == []
+
+    assert op.refresh_library() == op.LIBRARY_REFRESH_INTERVAL
+    items = op.library_set_items(None, context)
+    assert items == [("Eyes", "Eyes", "1 keys"), ("Face", "Face", "2 keys")]
+
+    # Drawing never goes to the disk
+    def no_io(*args, **kwargs):
+        raise AssertionError("enum items touched the disk")
+
+    from shapekey_sets import library
+    monkeypatch.setattr(library.os, "stat", no_io)
+    monkeypatch.setattr(library.os, "scandir", no_io)
+    assert op.library_set_items(None, context) is items
+
+
+def test_refresh_library_without_directory(addon, tmp_path, monkeypatch):
+    import bpy
+    from shapekey_sets import op
+
+    context = library_context(addon, tmp_path / "missing")
+    monkeypatch.setattr(bpy, "context", context)
+    assert op.refresh_library() == op.LIBRARY_REFRESH_INTERVAL
+    assert op.library_set_items(None, context) == []
+
+
+def test_save_replaces_a_set_in_the_file_holding_it(addon, tmp_path):
+    from shapekey_sets.library import SetLibrary
+
+    (tmp_path / "face.json").write_text(json.dumps({"Face": ["a"], "Eyes": ["c"]}))
+    library = SetLibrary(str(tmp_path))
+    library.refresh()
+
+    assert library.save("Face", [("a", True), ("b", True)]) == "face.json"
+    assert library.save("Mouth", [("m", True)]) == "Mouth.json"
+    assert json.loads((tmp_path / "face.json").read_text()) == {"Face": ["a", "b"], "Eyes": ["c"]}
@@ -0,0 +1,91 @@
+import pytest
+
+from conftest import load_source
+
+VISIBLE = 1 << 30
+NAMES = ["jawOpen", "eyeBlink_L", "EyeBlink_R", "mouthSmile", "browUp"]
+
+
+@pytest.fixture
+def listfilter():
+    return load_source("shapekey_sets_listfilter", "listfilter.py")
+
+
+def shown(flags):
+    return [NAMES[index] for index, flag in enumerate(flags) if flag == VISIBLE]
+
+
+# -----------------------------------------------------------------------------
+#   Search
+# -----------------------------------------------------------------------------
+
+
+def test_no_text_searches_nothing(listfilter):
+    assert listfilter.compile_search("", 'SUBSTRING') is None
+
+
+def test_substring_ignores_case(listfilter):
+    search = listfilter.compile_search("BLINK", 'SUBSTRING')
+    assert [name for name in NAMES if search(name)] == ["eyeBlink_L", "EyeBlink_R"]
+
+
+def test_glob_without_wildcards_searches_anywhere(listfilter):
+    assert listfilter.compile_search("blink", 'GLOB')("eyeBlink_L")
+    search = listfilter.compile_search("eye*_r", 'GLOB')
+    assert [name for name in NAMES if search(name)] == ["EyeBlink_R"]
+
+
+def test_regex_ignores_case_and_survives_half_typed_expressions(listfilter):
+    search = listfilter.compile_search("^(jaw|brow)", 'REGEX')
+    assert [name for name in NAMES if search(name)] == ["jawOpen", "browUp"]
+    assert not listfilter.compile_search("eye(", 'REGEX')("eyeBlink_L")
+
+
+# -----------------------------------------------------------------------------
+#   Flags and Order
+# -----------------------------------------------------------------------------
+
+
+def test_flags_without_search_show_everything_in_place(listfilter):
+    flags, order = listfilter.filter_names(NAMES, VISIBLE, None)
+    assert shown(flags) == NAMES
+    assert order == []
+
+
+def test_invert_only_applies_to_the_search(listfilter):
+    search = listfilter.compile_search("blink", 'SUBSTRING')
+    keep = [True, True, True, False, True]
+
+    flags, _ = listfilter.filter_names(NAMES, VISIBLE, search, invert=True)
+    assert shown(flags) == ["jawOpen", "mouthSmile", "browUp"]
+    # Items other filters hide stay hidden when the search is inverted
+    flags, _ = listfilter.filter_names(NAMES, VISIBLE, search, invert=True, keep=keep)
+    assert shown(flags) == ["jawOpen", "browUp"]
+    flags, _ = listfilter.filter_names(NAMES, VISIBLE, None, keep=keep)
+    assert shown(flags) == ["jawOpen", "eyeBlink_L", "EyeBlink_R", "browUp"]
+
+
+def test_order_holds_the_new_position_of_every_item(listfilter):
+    _, order = listfilter.filter_names(NAMES, VISIBLE, None, sort_alpha=True)
+    # browUp, eyeBlink_L, EyeBlink_R, jawOpen, mouthSmile
+    assert order == [3, 1, 2, 4, 0]
+    assert [name for _, name in sorted(zip(order, NAMES))] == sorted(NAMES, key=str.casefold)
+
+
+def test_reverse_with_and_without_sorting(listfilter):
+    _, order = listfilter.filter_names(NAMES, VISIBLE, None, reverse=True)
+    assert order == [4, 3, 2, 1, 0]
+    _, order = listfilter.filter_names(NAMES, VISIBLE, None, sort_alpha=True, reverse=True)
+    assert order == [1, 3, 2, 0, 4]
+
+
+def test_cached_filter_recomputes_when_the_signature_changes(listfilter):
+    calls = []
+
+    def compute():
+        calls.append(None)
+        return [VISIBLE], []
+
+    for signature in ((1, "a"), (1, "a"), (2, "a")):
+        listfilter.cached_filter(("list",), signature, compute)
+    assert len(calls) == 2
@@ -0,0 +1,87 @@
+import types
+
+from conftest import fake_bpy
+
+
+def modal_context(objects):
+    scene = fake_bpy.new_scene()
+    shapekey_set = scene.shapekey_sets.add()
+    shapekey_set.name = "Face"
+    for name in ("a", "b"):
+        shapekey_set.shapekeys.add().name = name
+
+    context = fake_bpy.Context(scene)
+    context.selected_objects = objects
+    context.window = None
+    context.window_manager = types.SimpleNamespace(
+        progress_begin=lambda first, last: None, progress_update=lambda value: None,
+        progress_end=lambda: None, event_timer_add=lambda step, window=None: "timer",
+        event_timer_remove=lambda timer: None, modal_handler_add=lambda operator: None)
+    context.workspace = types.SimpleNamespace(status_text_set=lambda text: None)
+    return context
+
+
+def event(type):
+    return types.SimpleNamespace(type=type, value='PRESS')
+
+
+def test_modal_apply_passes_only_navigation_through(addon):
+    from shapekey_sets.op import SHAPEKEY_SETS_OT_add_modal
+
+    objects = [fake_bpy.new_object("Object %d" % index, 4) for index in range(3)]
+    context = modal_context(objects)
+    operator = SHAPEKEY_SETS_OT_add_modal()
+    # One mesh per slice
+    operator.budget = 0.0
+
+    assert operator.invoke(context, event('LEFTMOUSE')) == {"RUNNING_MODAL"}
+    for type in ('MIDDLEMOUSE', 'WHEELUPMOUSE', 'MOUSEMOVE', 'TRACKPADPAN', 'NDOF_MOTION'):
+        assert operator.modal(context, event(type)) == {"PASS_THROUGH"}
+    # Undo, deleting and mode switches would change the targets under the operator
+    for type in ('Z', 'X', 'DEL', 'TAB', 'LEFTMOUSE'):
+        assert operator.modal(context, event(type)) == {"RUNNING_MODAL"}
+    assert operator._slicer.done == 0
+
+    assert operator.modal(context, event('TIMER')) == {"RUNNING_MODAL"}
+    assert operator.modal(context, event('TIMER')) == {"RUNNING_MODAL"}
+    assert operator.modal(context, event('TIMER')) == {"FINISHED"}
+    for object in objects:
+        assert [key_block.name for key_block in object.data.shape_keys.key_blocks] == ["a", "b"]
+
+
+def test_modal_apply_stops_on_escape(addon):
+    from shapekey_sets.op import SHAPEKEY_SETS_OT_add_modal
+
+    context = modal_context([fake_bpy.new_object("Object %d" % index, 4) for index in range(3)])
+    operator = SHAPEKEY_SETS_OT_add_modal()
+    operator.budget = 0.0
+    operator.invoke(context, event('LEFTMOUSE'))
+
+    operator.modal(context, event('TIMER'))
+    assert operator.modal(context, event('ESC')) == {"FINISHED"}
+    assert operator._slicer.done == 1
+
+
+def test_add_mirrored_puts_each_counterpart_after_its_key(addon):
+    from shapekey_sets.op import SHAPEKEY_SETS_OT_data_key_list_bulk_actions
+
+    scene = fake_bpy.new_scene()
+    shapekey_set = scene.shapekey_sets.add()
+    shapekey_set.name = "Face"
+    # Enough counterparts to rebuild the list instead of moving items
+    names = ["jawOpen", "eyeBlink_R"] + ["brow%d_L" % index for index in range(12)] + ["brow3_R"]
+    for name in names:
+        shapekey_set.shapekeys.add().name = name
+    shapekey_set.shapekeys[1].enabled = False
+
+    operator = SHAPEKEY_SETS_OT_data_key_list_bulk_actions()
+    operator.action = 'MIRROR_MATCHING'
+    operator.pattern = "*"
+    assert operator.execute(fake_bpy.Context(scene)) == {"FINISHED"}
+
+    expected = ["jawOpen", "eyeBlink_R", "eyeBlink_L"]
+    for index in range(12):
+        expected += ["brow%d_L" % index] if index == 3 else ["brow%d_L" % index, "brow%d_R" % index]
+    expected += ["brow3_R"]
+    assert [shapekey.name for shapekey in shapekey_set.shapekeys] == expected
+    assert [shapekey.enabled for shapekey in shapekey_set.shapekeys[1:3]] == [False, False]
@@ -0,0 +1,11 @@
+import sys
+
+
+def test_ui_is_imported_only_when_registered(addon):
+    assert "shapekey_sets.ui" not in sys.modules
+    # The list actions are operators, registered without the UI
+    assert "SHAPEKEY_SETS_OT_data_key_list_actions" in vars(sys.modules["shapekey_sets.op"])
+
+    addon.register_ui()
+    assert "shapekey_sets.ui" in sys.modules
+    assert addon._registered_ui == list(sys.modules["shapekey_sets.ui"].classes)
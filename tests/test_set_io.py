@@ -0,0 +1,22 @@
+from conftest import fake_bpy
+
+
+def test_add_keys_skips_duplicates_across_batches(addon):
+    from shapekey_sets.set_io import BATCH_SIZE, add_keys
+
+    shapekeys = fake_bpy.new_scene().shapekey_sets.add().shapekeys
+    shapekeys.add().name = "k0"
+    keys = [("k%d" % index, index % 2 == 0) for index in range(BATCH_SIZE + 10)]
+    # A repeat in the second batch of one from the first
+    keys.append(("k5", True))
+
+    assert add_keys(shapekeys, keys) == (BATCH_SIZE + 9, 2)
+    assert [(shapekey.name, shapekey.enabled) for shapekey in shapekeys] == [("k0", True)] + keys[1:-1]
+
+
+def test_add_keys_can_keep_duplicates(addon):
+    from shapekey_sets.set_io import add_keys
+
+    shapekeys = fake_bpy.new_scene().shapekey_sets.add().shapekeys
+    assert add_keys(shapekeys, [("a", True), ("a", False)], skip_duplicates=False) == (2, 0)
+    assert [(shapekey.name, shapekey.enabled) for shapekey in shapekeys] == [("a", True), ("a", False)]
@@ -0,0 +1,71 @@
+import pytest
+
+from conftest import load_source
+
+slicing = load_source("shapekey_sets_slicing", "slicing.py")
+
+
+class FakeClock():
+    """
+    Advances by a fixed cost for every item worked on
+    """
+
+    def __init__(self, cost: float):
+        self.now = 0.0
+        self.cost = cost
+
+    def __call__(self) -> float:
+        return self.now
+
+    def work(self, item):
+        self.now += self.cost
+
+
+def test_step_stops_once_budget_is_spent():
+    clock = FakeClock(0.01)
+    done = []
+    slicer = slicing.TimeSlicer(range(10), lambda item: (done.append(item), clock.work(item)),
+                                budget=0.03, clock=clock)
+
+    assert slicer.step() == 3
+    assert done == [0, 1, 2]
+    assert slicer.progress == pytest.approx(0.3)
+    assert not slicer.finished
+
+    assert slicer.run() == 7
+    assert done == list(range(10))
+    assert slicer.finished
+    assert slicer.elapsed == pytest.approx(0.1)
+    assert slicer.rate == pytest.approx(100)
+
+
+def test_step_processes_one_item_over_budget():
+    clock = FakeClock(1.0)
+    slicer = slicing.TimeSlicer("abc", clock.work, budget=0.05, clock=clock)
+    assert [slicer.step() for _ in range(3)] == [1, 1, 1]
+    assert slicer.finished
+    assert slicer.step() == 0
+
+
+def test_empty_queue():
+    slicer = slicing.TimeSlicer([], lambda item: None)
+    assert slicer.finished
+    assert slicer.progress == 1.0
+    assert slicer.rate == 0.0
+    assert slicer.run() == 0
+
+
+def test_failing_item_is_retried_not_skipped():
+    attempts = []
+
+    def work(item):
+        attempts.append(item)
+        if item == 1 and attempts.count(1) == 1:
+            raise RuntimeError("busy")
+
+    slicer = slicing.TimeSlicer([0, 1, 2], work, budget=1.0, clock=FakeClock(0))
+    with pytest.raises(RuntimeError):
+        slicer.step()
+    assert slicer.done == 1
+    slicer.run()
+    assert attempts == [0, 1, 1, 2]
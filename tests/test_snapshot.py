@@ -0,0 +1,57 @@
+import numpy as np
+
+from conftest import fake_bpy
+
+
+def key_names(object):
+    return [key_block.name for key_block in object.data.shape_keys.key_blocks]
+
+
+def stored_entry(tmp_path, names, vertices=8):
+    """
+    A store holding one blob, and an entry whose keys all refer to it
+    """
+    from shapekey_sets.snapshot import SnapshotStore, blob_digest
+
+    store = SnapshotStore(str(tmp_path))
+    co = np.zeros(vertices * 3, dtype=np.float32)
+    digest = blob_digest(co)
+    (tmp_path / "blobs").mkdir()
+    np.save(store.blob_path(digest), co)
+    return store, {"vertices": vertices, "keys": [{"name": name, "blob": digest} for name in names]}
+
+
+def mesh_object(*names):
+    object = fake_bpy.new_object("Head", 8)
+    for name in names:
+        object.shape_key_add(name=name)
+    return object
+
+
+def test_restorable(addon, tmp_path):
+    from shapekey_sets.snapshot import restorable
+
+    store, entry = stored_entry(tmp_path, ["Basis", "a", "b"])
+    assert restorable(mesh_object("Basis", "b").data, entry, store)
+    # A reference key of another name is renamed
+    assert restorable(mesh_object("Key", "b").data, entry, store)
+    assert restorable(fake_bpy.new_object("Empty", 8).data, entry, store)
+
+    assert not restorable(fake_bpy.new_object("Other", 9).data, entry, store)
+    assert not restorable(mesh_object("Key", "Basis").data, entry, store)
+
+    for file in (tmp_path / "blobs").iterdir():
+        file.unlink()
+    assert not restorable(mesh_object("Basis").data, entry, store)
+
+
+def test_restore_leaves_mesh_alone_when_not_restorable(addon, tmp_path):
+    from shapekey_sets.snapshot import restore_mesh
+
+    store, entry = stored_entry(tmp_path, ["Basis", "a", "b"])
+    # The snapshot's reference key is now below another reference key
+    object = mesh_object("New Basis", "c", "Basis", "a")
+    before = key_names(object)
+
+    assert not restore_mesh(fake_bpy.Context(), object, entry, store)
+    assert key_names(object) == before
@@ -0,0 +1,60 @@
+import contextlib
+import types
+
+import pytest
+
+from conftest import fake_bpy
+
+
+class Moves():
+    """
+    Stands in for bpy.ops.object.shape_key_move on one object, recording
+    how the override was passed
+    """
+
+    def __init__(self, object):
+        self.object = object
+        self.overrides = []
+
+    def __call__(self, *override, type):
+        self.overrides.append(override)
+        key_blocks = self.object.data.shape_keys.key_blocks
+        index = self.object.active_shape_key_index
+        last = len(key_blocks) - 1
+        target = {'UP': index - 1, 'DOWN': index + 1, 'TOP': 1, 'BOTTOM': last}[type]
+        key_blocks.move(index, target)
+
+
+class OldContext(fake_bpy.Context):
+    """
+    A context of Blender before 3.2, without temp_override()
+    """
+
+
+class NewContext(fake_bpy.Context):
+    def temp_override(self, **override):
+        return contextlib.nullcontext()
+
+
+@pytest.mark.parametrize("context_type, passes_override", [
+    (NewContext, False),
+    (OldContext, True),
+])
+def test_sync_key_order_on_every_version(addon, monkeypatch, context_type, passes_override):
+    import bpy
+    from shapekey_sets.sync import sync_key_order
+
+    object = fake_bpy.new_object("Head", 4)
+    for name in ("Basis", "c", "a", "b"):
+        object.shape_key_add(name=name)
+    object.active_shape_key = None
+    moves = Moves(object)
+    monkeypatch.setattr(bpy, "ops", types.SimpleNamespace(object=types.SimpleNamespace(shape_key_move=moves)),
+                        raising=False)
+
+    assert sync_key_order(context_type(), object, ["a", "b", "c"]) == (1, 0)
+    assert [key_block.name for key_block in object.data.shape_keys.key_blocks] == ["Basis", "a", "b", "c"]
+    if passes_override:
+        assert moves.overrides == [({"object": object, "active_object": object},)]
+    else:
+        assert moves.overrides == [()]
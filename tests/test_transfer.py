@@ -0,0 +1,18 @@
+from conftest import fake_bpy
+
+
+def key_names(object):
+    return [key_block.name for key_block in object.data.shape_keys.key_blocks]
+
+
+def test_source_in_scope_gets_its_missing_keys(addon):
+    from shapekey_sets.transfer import ShapeTransfer
+
+    source = fake_bpy.new_object("Source", 4)
+    for name in ("Basis", "a"):
+        source.shape_key_add(name=name, from_mix=False)
+    transfer = ShapeTransfer(source)
+
+    assert transfer.apply(source, ["a", "b", "c"]) == (2, 1, 0)
+    assert key_names(source) == ["Basis", "a", "b", "c"]
+    assert transfer.apply(source, ["a", "b", "c"]) == (0, 3, 0)
@@ -0,0 +1,118 @@
+from conftest import fake_bpy
+
+
+def add_set(sets, name, keys, poses=()):
+    shapekey_set = sets.add()
+    shapekey_set.name = name
+    for key in keys:
+        shapekey_set.shapekeys.add().name = key
+    for pose_name, values in poses:
+        preset = shapekey_set.poses.add()
+        preset.name = pose_name
+        for key, value in values.items():
+            item = preset.values.add()
+            item.name = key
+            item.value = value
+    return shapekey_set
+
+
+def poses(shapekey_set):
+    return [(preset.name, {item.name: item.value for item in preset.values}) for preset in shapekey_set.poses]
+
+
+def test_sync_sets_copies_sets_that_only_differ_in_poses(addon):
+    from shapekey_sets.util import set_fingerprint, sync_sets
+
+    source = fake_bpy.new_scene().shapekey_sets
+    target = fake_bpy.new_scene().shapekey_sets
+    add_set(source, "Face", ["a", "b"], [("Smile", {"a": 1.0})])
+    add_set(target, "Face", ["a", "b"], [("Smile", {"a": 0.5}), ("Frown", {"b": 1.0})])
+    assert set_fingerprint(source[0]) != set_fingerprint(target[0])
+
+    assert sync_sets(source, target) == 1
+    assert poses(target[0]) == [("Smile", {"a": 1.0})]
+    assert set_fingerprint(source[0]) == set_fingerprint(target[0])
+    assert sync_sets(source, target) == 0
+
+
+def test_sync_sets_replaces_poses_of_overwritten_sets(addon):
+    from shapekey_sets.util import sync_sets
+
+    source = fake_bpy.new_scene().shapekey_sets
+    target = fake_bpy.new_scene().shapekey_sets
+    add_set(source, "Visemes", ["aa"])
+    add_set(target, "Face", ["a"], [("Smile", {"a": 1.0})])
+
+    sync_sets(source, target)
+    assert target[0].name == "Visemes"
+    assert poses(target[0]) == []
+
+
+def test_set_fingerprint_is_kept_until_the_set_changes(addon):
+    from shapekey_sets.compose import invalidate_set
+    from shapekey_sets.util import set_fingerprint
+
+    sets = fake_bpy.new_scene().shapekey_sets
+    shapekey_set = add_set(sets, "Face", ["a", "b"])
+    other = add_set(sets, "Body", ["c"])
+    before = set_fingerprint(shapekey_set)
+    # Without the update callback, which the fake bpy doesn't run
+    shapekey_set.shapekeys[0].name = "c"
+    other.shapekeys[0].name = "d"
+    assert set_fingerprint(shapekey_set) == before
+
+    invalidate_set("Body")
+    assert set_fingerprint(shapekey_set) == before
+    invalidate_set("Face")
+    assert set_fingerprint(shapekey_set) != before
+
+
+def test_remove_indices_keeps_the_other_items_and_their_properties(addon):
+    from shapekey_sets.util import COMPACT_THRESHOLD, remove_indices
+
+    # Below and above the count where the collection is rebuilt instead
+    for count in (2, COMPACT_THRESHOLD * 2):
+        shapekeys = add_set(fake_bpy.new_scene().shapekey_sets, "Face", ["k%d" % index for index in range(40)]).shapekeys
+        for shapekey in shapekeys[::3]:
+            shapekey.enabled = False
+        removed = list(range(count * 2, 0, -2))
+        expected = [(shapekey.name, shapekey.enabled) for index, shapekey in enumerate(shapekeys)
+                    if index not in removed]
+
+        assert remove_indices(shapekeys, removed) == sorted(removed)
+        assert [(shapekey.name, shapekey.enabled) for shapekey in shapekeys] == expected
+
+
+def test_insert_after_places_items_behind_the_ones_they_follow(addon):
+    from shapekey_sets.util import COMPACT_THRESHOLD, insert_after
+
+    # Below and above the count where the collection is rebuilt instead
+    for count in (2, COMPACT_THRESHOLD * 2):
+        shapekeys = add_set(fake_bpy.new_scene().shapekey_sets, "Face", ["k%d" % index for index in range(40)]).shapekeys
+        additions = {index: [{"name": "n%d" % index, "enabled": False}] for index in range(0, count * 2, 2)}
+        expected = []
+        for index in range(40):
+            expected.append(("k%d" % index, True))
+            if index in additions:
+                expected.append(("n%d" % index, False))
+
+        assert insert_after(shapekeys, additions) == count
+        assert [(shapekey.name, shapekey.enabled) for shapekey in shapekeys] == expected
+
+
+def test_file_load_forgets_scenes_waiting_for_initialization(addon, monkeypatch):
+    import bpy
+    from shapekey_sets.util import clear_pending_scenes, schedule_initialize
+
+    timers = []
+    monkeypatch.setattr(bpy.app.timers, "register", lambda function, **options: timers.append(options))
+    scene = fake_bpy.new_scene()
+    scene.name = "Scene"
+    schedule_initialize(scene, None)
+    schedule_initialize(scene, None)
+    assert len(timers) == 1
+
+    # The timer is dropped with the old file, and a new scene may reuse the pointer
+    clear_pending_scenes()
+    schedule_initialize(scene, None)
+    assert len(timers) == 2
@@ -0,0 +1,243 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from bpy.app.handlers import persistent
+from bpy.types import Object
+from mathutils.kdtree import KDTree
+
+from .bulk import add_shape_keys, existing_key_names, missing_key_names, read_coords, reference_coords, write_coords
+
+# -----------------------------------------------------------------------------
+#   Shape Data Transfer
+# -----------------------------------------------------------------------------
+
+transfer_mode_items = (
+    ('INDEX', "Vertex Index", "Copy by vertex index, only for targets with the source's vertex count"),
+    ('NEAREST', "Nearest Vertex", "Copy from the closest source vertex, for any topology"),
+    ('INTERPOLATED', "Interpolated",
+     "Blend the closest source vertices by inverse distance, for any topology"))
+
+# Vertex mappings by mesh pair, see mapping_for()
+_mappings: "OrderedDict[tuple, VertexMapping]" = OrderedDict()
+MAPPING_CACHE_SIZE = 16
+
+
+class VertexMapping():
+    """
+    Maps per-vertex offsets of a source mesh onto a target mesh with a
+    different topology, as a gather of the nearest source vertices followed
+    by a weighted sum and a transform into the target's local space.
+
+    :param indices: (targets, neighbours) indices of source vertices
+    :param weights: (targets, neighbours) weights summing to one per row,
+        or None for a single neighbour
+    :param rotation: 3x3 matrix taking offsets from source to target local space
+    """
+
+    def __init__(self, indices: np.ndarray, weights: Optional[np.ndarray], rotation: np.ndarray):
+        self.indices = indices
+        self.weights = weights
+        self.rotation = rotation
+
+    def map(self, delta: np.ndarray) -> np.ndarray:
+        """
+        Map a flat array of source offsets to a flat array of target offsets
+        """
+        gathered = delta.reshape(-1, 3)[self.indices]
+        if self.weights is not None:
+            gathered = np.einsum("mk,mkc->mc", self.weights, gathered)
+        return (gathered @ self.rotation.T).astype(np.float32).ravel()
+
+
+def build_mapping(source_co: np.ndarray, target_co: np.ndarray, neighbours: int = 1):
+    """
+    Find the nearest source vertices of every target vertex with a KD-tree.
+    Returns (indices, weights), with inverse distance weights when more than
+    one neighbour is asked for and None otherwise.
+
+    :param source_co: (n, 3) source vertex positions
+    :param target_co: (m, 3) target vertex positions, in the source's space
+    :param neighbours: Number of source vertices blended per target vertex
+    """
+    tree = KDTree(len(source_co))
+    for index, co in enumerate(source_co.tolist()):
+        tree.insert(co, index)
+    tree.balance()
+
+    if neighbours <= 1:
+        indices = np.fromiter((tree.find(co)[1] for co in target_co.tolist()),
+                              dtype=np.int32, count=len(target_co))
+        return indices, None
+
+    neighbours = min(neighbours, len(source_co))
+    indices = np.empty((len(target_co), neighbours), dtype=np.int32)
+    distances = np.empty((len(target_co), neighbours), dtype=np.float32)
+    for row, co in enumerate(target_co.tolist()):
+        found = tree.find_n(co, neighbours)
+        indices[row] = [index for _, index, _ in found]
+        distances[row] = [distance for _, _, distance in found]
+
+    weights = 1.0 / np.maximum(distances, 1e-6)
+    weights /= weights.sum(axis=1, keepdims=True)
+    return indices, weights.astype(np.float32)
+
+
+def mapping_for(source: Object, source_co: np.ndarray, target: Object, target_co: np.ndarray,
+                neighbours: int) -> VertexMapping:
+    """
+    The cached mapping between two objects, built on first use. Mappings are
+    keyed by the identity and vertex count of both meshes, plus their
+    relative placement, since matching happens in world space.
+    """
+    source_matrix = np.array(source.matrix_world, dtype=np.float64)
+    target_matrix = np.array(target.matrix_world, dtype=np.float64)
+    # Target local space to source local space
+    relative = np.linalg.inv(source_matrix) @ target_matrix
+
+    key = (source.data.as_pointer(), len(source_co) // 3, target.data.as_pointer(), len(target_co) // 3,
+           neighbours, tuple(np.round(relative, 6).ravel()))
+    mapping = _mappings.get(key)
+    if mapping is not None:
+        _mappings.move_to_end(key)
+        return mapping
+
+    target_points = target_co.reshape(-1, 3) @ relative[:3, :3].T + relative[:3, 3]
+    indices, weights = build_mapping(source_co.reshape(-1, 3), target_points, neighbours)
+    mapping = _mappings[key] = VertexMapping(indices, weights, np.linalg.inv(relative[:3, :3]))
+    while len(_mappings) > MAPPING_CACHE_SIZE:
+        _mappings.popitem(last=False)
+    return mapping
+
+
+@persistent
+def clear_mappings(*args):
+    """
+    Mesh pointers are reused once a file is loaded, so mappings can't be trusted
+    """
+    _mappings.clear()
+
+
+class DeltaCache():
+    """
+    Offsets of a source object's shape keys from their relative keys, read
+    on first use and kept as flat float32 arrays, so every target reuses the
+    same arrays instead of reading the source again.
+
+    :param source: A MESH object with shape keys
+    """
+
+    def __init__(self, source: Object):
+        self.source = source
+        shape_keys = source.data.shape_keys
+        self.key_blocks = shape_keys.key_blocks if shape_keys is not None else {}
+        self.vertex_count = len(source.data.vertices)
+        self._coords: Dict[str, np.ndarray] = {}
+        self._deltas: Dict[str, Optional[np.ndarray]] = {}
+
+    def _read(self, name: str) -> np.ndarray:
+        coords = self._coords.get(name)
+        if coords is None:
+            coords = self._coords[name] = read_coords(self.key_blocks[name])
+        return coords
+
+    def reference(self) -> np.ndarray:
+        """
+        Coordinates of the source's reference key
+        """
+        return self._read(self.source.data.shape_keys.reference_key.name)
+
+    def delta(self, name: str) -> Optional[np.ndarray]:
+        """
+        The offsets of the named key, or None when the source doesn't have
+        it or it's the reference key
+        """
+        if name not in self._deltas:
+            key_block = self.key_blocks.get(name)
+            if key_block is None or key_block.relative_key == key_block:
+                self._deltas[name] = None
+            else:
+                self._deltas[name] = self._read(name) - self._read(key_block.relative_key.name)
+        return self._deltas[name]
+
+
+class ShapeTransfer():
+    """
+    Applies key names to targets like bulk.apply_key_names, and fills the
+    keys with the offsets of the source's keys of the same name. In INDEX
+    mode targets must have the source's vertex count, the other modes go
+    through a cached VertexMapping.
+
+    :param source: A MESH object with shape keys
+    :param overwrite: Also replace the data of keys the targets already had
+    :param mode: One of the identifiers in transfer_mode_items
+    :param neighbours: Source vertices blended per target vertex in INTERPOLATED mode
+    """
+
+    def __init__(self, source: Object, overwrite: bool = False, mode: str = 'INDEX', neighbours: int = 4):
+        self.source = source
+        self.overwrite = overwrite
+        self.mode = mode
+        self.neighbours = neighbours if mode == 'INTERPOLATED' else 1
+        self.deltas = DeltaCache(source)
+        self.mismatched = 0
+
+    def target_offsets(self, object: Object, names: List[str], reference: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Offsets to add to the target's reference coordinates per key name,
+        or an empty dict when the target can't receive data from the source
+
+        :param reference: The target's reference coordinates
+        """
+        deltas = {name: delta for name in names
+                  if (delta := self.deltas.delta(name)) is not None}
+        if not deltas:
+            return {}
+
+        if self.mode == 'INDEX':
+            if len(object.data.vertices) != self.deltas.vertex_count:
+                self.mismatched += 1
+                return {}
+            return deltas
+
+        mapping = mapping_for(self.source, self.deltas.reference(), object,
+                              reference, self.neighbours)
+        return {name: mapping.map(delta) for name, delta in deltas.items()}
+
+    def apply(self, object: Object, names: List[str]) -> Tuple[int, int, int]:
+        """
+        Add the missing names to an object's mesh and transfer shape data.
+        Returns the number of keys created, skipped and filled with data.
+
+        :param object: A MESH object
+        :param names: Shape key names to ensure, in order
+        """
+        mesh = object.data
+        missing = missing_key_names(names, existing_key_names(mesh))
+        if mesh == self.source.data:
+            # The source has no data to receive, its missing keys are added empty
+            add_shape_keys(object, missing)
+            return len(missing), len(names) - len(missing), 0
+
+        reference = reference_coords(mesh)
+        offsets = self.target_offsets(object, names, reference)
+        if not offsets:
+            add_shape_keys(object, missing)
+            return len(missing), len(names) - len(missing), 0
+
+        # Without any keys, the first created key becomes the reference key
+        # and has to stay undeformed
+        fill = missing[1:] if mesh.shape_keys is None else missing
+        coords = {name: reference + offsets[name] for name in fill if name in offsets}
+        add_shape_keys(object, missing, coords)
+        filled = len(coords)
+
+        if self.overwrite:
+            key_blocks = mesh.shape_keys.key_blocks
+            reference_name = mesh.shape_keys.reference_key.name
+            for name in set(names).difference(missing):
+                if name in offsets and name != reference_name:
+                    write_coords(key_blocks[name], reference + offsets[name])
+                    filled += 1
+
+        return len(missing), len(names) - len(missing), filled
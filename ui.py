@@ -1,173 +1,52 @@
-from typing import Set, Type
+from typing import List, Optional, Type
 import bpy
-import functools
 
-from bpy.types import Context, Event, Menu, Operator, UIList, Panel
-from bpy.props import EnumProperty
-
-from .op import SHAPEKEY_SETS_OT_reset, SHAPEKEY_SETS_OT_add
-from .util import initialize
-
-
-# -----------------------------------------------------------------------------
-#   UI Operators
-# -----------------------------------------------------------------------------
-
-
-class SHAPEKEY_SETS_OT_base_list_actions(Operator):
-    """
-    Move list items up and down, add, remove, dedupe, and clear
-    """
-    bl_idname = "shapekey_sets.base_list_action"
-    bl_label = "List Actions"
-    bl_description = "Manipulate list items"
-    bl_options = {'INTERNAL', 'UNDO'}
-
-    action: EnumProperty(
-        items=(
-            ('UP', "Up", ""),
-            ('DOWN', "Down", ""),
-            ('REMOVE', "Remove", ""),
-            ('ADD', "Add", ""),
-            ('CLEAR', "CLEAR", ""),
-            ('DEDUPE', "DEDUPE", "")))
-
-    def find_duplicates(self, items):
-        """
-        Find all duplicates by name
-        """
-        name_lookup = {}
-        for c, i in enumerate(items):
-            name_lookup.setdefault(i.name, []).append(c)
-        duplicates = set()
-        for name, indices in name_lookup.items():
-            for i in indices[1:]:
-                duplicates.add(i)
-        return sorted(list(duplicates))
-
-    def list_actions(self, root_obj: object, list_name: str, index_name: str):
-        """
-        Generic manipulations for a UI list. Subclasses must provide access 
-        to the list's parent object through their invoke() implementation, 
-        along with names for the list and index properties.
-
-        :param root_obj: The parent object where the list is stored
-        :param list_name: The name of the list property
-        :param index_name: The name of the active index property
-        """
-        obj = root_obj
-        list = getattr(obj, list_name)
-        index = getattr(obj, index_name)
-
-        try:
-            item = list[index]
-        except IndexError:
-            pass
-        else:
-            if self.action == 'DOWN' and index < len(list)-1:
-                list.move(index, index+1)
-                setattr(obj, index_name, index+1)
-                info = 'Item "%s" moved to position %d' % (
-                    item.name, index + 1)
-                return info
-
-            elif self.action == 'UP' and index >= 1:
-                list.move(index, index-1)
-                setattr(obj, index_name, index-1)
-                info = 'Item "%s" moved to position %d' % (
-                    item.name, index + 1)
-                return info
-
-            elif self.action == 'REMOVE':
-                item = list[index]
-                list.remove(index)
-                info = 'Item %s removed from scene' % (item)
-                if index > 0:
-                    setattr(obj, index_name, index-1)
-                return info
-
-        if self.action == 'ADD':
-            item = list.add()
-            item.id = len(list)
-            item.name = "New Item"
-            setattr(obj, index_name, len(list)-1)
-            info = '%s added to list' % (item.name)
-            return info
-
-        elif self.action == 'CLEAR':
-            if bool(list):
-                list.clear()
-                setattr(obj, index_name, 0)
-                return "All items removed"
-            else:
-                return "Nothing to remove"
-
-        elif self.action == 'DEDUPE':
-            removed_items = []
-            # Reverse the list before removing the items
-            for i in self.find_duplicates(list)[::-1]:
-                list.remove(i)
-                removed_items.append(i)
-            if removed_items:
-                setattr(obj, index_name, len(list)-1)
-                info = ', '.join(map(str, removed_items))
-                return "Removed indices: %s" % (info)
-            else:
-                return "No duplicates"
-
-
-# Implementations for each kind of list object, because passing a generic parent 
-# object through an operator argument seems impossible
-
-class SHAPEKEY_SETS_OT_data_set_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
-    bl_idname = "shapekey_sets.data_set_list_action"
-
-    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
-        self.list_actions(context.scene, "shapekey_sets",
-                          "active_shapekey_set_index")
-        return {"FINISHED"}
-
-
-class SHAPEKEY_SETS_OT_data_key_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
-    bl_idname = "shapekey_sets.data_key_list_action"
-
-    @classmethod
-    def poll(cls, context):
-        return (len(context.scene.shapekey_sets) > 0 and
-                context.scene.shapekey_sets[context.scene.active_shapekey_set_index] is not None)
-
-    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
-        active_set = context.scene.shapekey_sets[context.scene.active_shapekey_set_index]
-
-        self.list_actions(active_set, "shapekeys", "active_shapekey_index")
-        return {"FINISHED"}
-
-
-class SHAPEKEY_SETS_OT_prefs_set_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
-    bl_idname = "shapekey_sets.prefs_set_list_action"
-
-    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
-        prefs = bpy.context.preferences.addons[__package__].preferences
-
-        self.list_actions(prefs, "shapekey_sets", "active_shapekey_set_index")
-        return {"FINISHED"}
-
-
-class SHAPEKEY_SETS_OT_prefs_key_list_actions(SHAPEKEY_SETS_OT_base_list_actions):
-    bl_idname = "shapekey_sets.prefs_key_list_action"
-
-    @classmethod
-    def poll(cls, context):
-        prefs = bpy.context.preferences.addons[__package__].preferences
-        return (len(prefs.shapekey_sets) > 0 and
-                prefs.shapekey_sets[prefs.active_shapekey_set_index] is not None)
-
-    def invoke(self, context: Context, event: Event) -> Set[str] | Set[int]:
-        prefs = bpy.context.preferences.addons[__package__].preferences
-        active_set = prefs.shapekey_sets[prefs.active_shapekey_set_index]
-
-        self.list_actions(active_set, "shapekeys", "active_shapekey_index")
-        return {"FINISHED"}
+from bpy.types import Menu, UIList, Panel
+from bpy.props import BoolProperty, EnumProperty
+
+from .op import (
+    SHAPEKEY_SETS_OT_reset,
+    SHAPEKEY_SETS_OT_share_sets,
+    SHAPEKEY_SETS_OT_unshare_sets,
+    SHAPEKEY_SETS_OT_override_set,
+    SHAPEKEY_SETS_OT_add,
+    SHAPEKEY_SETS_OT_add_modal,
+    SHAPEKEY_SETS_OT_sync,
+    SHAPEKEY_SETS_OT_audit,
+    SHAPEKEY_SETS_OT_wire_drivers,
+    SHAPEKEY_SETS_OT_snapshot_save,
+    SHAPEKEY_SETS_OT_snapshot_restore,
+    SHAPEKEY_SETS_OT_auto_apply,
+    SHAPEKEY_SETS_OT_pose_store,
+    SHAPEKEY_SETS_OT_pose_apply,
+    SHAPEKEY_SETS_OT_library_apply,
+    SHAPEKEY_SETS_OT_library_import,
+    SHAPEKEY_SETS_OT_library_save,
+    SHAPEKEY_SETS_OT_library_refresh,
+    SHAPEKEY_SETS_OT_import_keys,
+    SHAPEKEY_SETS_OT_export_keys,
+    SHAPEKEY_SETS_OT_import_sets,
+    SHAPEKEY_SETS_OT_export_sets,
+    SHAPEKEY_SETS_OT_import_capture,
+    SHAPEKEY_SETS_OT_data_set_list_actions,
+    SHAPEKEY_SETS_OT_data_key_list_actions,
+    SHAPEKEY_SETS_OT_prefs_set_list_actions,
+    SHAPEKEY_SETS_OT_prefs_key_list_actions,
+    SHAPEKEY_SETS_OT_data_include_list_actions,
+    SHAPEKEY_SETS_OT_data_pose_list_actions,
+    SHAPEKEY_SETS_OT_data_rule_list_actions,
+    SHAPEKEY_SETS_OT_data_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_prefs_key_list_bulk_actions,
+    SHAPEKEY_SETS_OT_clear_timings,
+    active_library
+)
+from .audit import audit_count, failing_meshes, is_audited
+from .bulk import existing_key_names
+from .compose import generation, resolve_set, set_version
+from .instrument import history, is_enabled
+from .listfilter import cached_filter, compile_search, filter_names, key_version, search_mode_items
+from .storage import active_set, edited_set, override_of, scene_sets, sets_root, shares_sets
+from .util import schedule_initialize
 
 
 # -----------------------------------------------------------------------------
@@ -176,6 +55,36 @@ class SHAPEKEY_SETS_OT_prefs_key_list_actions(SHAPEKEY_SETS_OT_base_list_actions
 
 # Special actions for each type of list, which are displayed in a dropdown menu.
 
+def draw_bulk_actions(layout, bulk_actions_class: Type):
+    layout.operator(bulk_actions_class.bl_idname,
+                    icon="CHECKBOX_HLT", text="Enable Matching...").action = 'ENABLE_MATCHING'
+    layout.operator(bulk_actions_class.bl_idname,
+                    icon="CHECKBOX_DEHLT", text="Disable Matching...").action = 'DISABLE_MATCHING'
+    layout.operator(bulk_actions_class.bl_idname,
+                    icon="REMOVE", text="Remove Matching...").action = 'REMOVE_MATCHING'
+    layout.operator(bulk_actions_class.bl_idname,
+                    icon="FILTER", text="Keep Only Matching...").action = 'KEEP_MATCHING'
+    layout.operator(bulk_actions_class.bl_idname,
+                    icon="TRASH", text="Remove Disabled").action = 'REMOVE_DISABLED'
+    layout.operator(bulk_actions_class.bl_idname,
+                    icon="MOD_MIRROR", text="Add Mirrored...").action = 'MIRROR_MATCHING'
+
+
+def draw_io_actions(layout, import_class: Type, export_class: Type, target: str):
+    layout.operator_context = 'INVOKE_DEFAULT'
+
+    props = layout.operator(import_class.bl_idname, icon="IMPORT", text="Import...")
+    props.target = target
+    props = layout.operator(import_class.bl_idname, icon="PASTEDOWN", text="Paste from Clipboard")
+    props.target = target
+    props.use_clipboard = True
+    props = layout.operator(export_class.bl_idname, icon="EXPORT", text="Export...")
+    props.target = target
+    props = layout.operator(export_class.bl_idname, icon="COPYDOWN", text="Copy to Clipboard")
+    props.target = target
+    props.use_clipboard = True
+
+
 class SHAPEKEY_SETS_MT_data_set_list_context_menu(Menu):
     bl_label = "Set List Specials"
 
@@ -186,6 +95,13 @@ class SHAPEKEY_SETS_MT_data_set_list_context_menu(Menu):
                         icon="X", text="Clear List").action = 'CLEAR'
         layout.operator(SHAPEKEY_SETS_OT_reset.bl_idname,
                         icon="RECOVER_LAST", text="Restore Defaults")
+        layout.operator(SHAPEKEY_SETS_OT_share_sets.bl_idname, icon="LINKED")
+
+        layout.separator()
+        draw_io_actions(layout, SHAPEKEY_SETS_OT_import_sets, SHAPEKEY_SETS_OT_export_sets, 'SCENE')
+
+        layout.separator()
+        layout.operator(SHAPEKEY_SETS_OT_import_capture.bl_idname, icon="ACTION", text="Import Face Capture...")
 
 
 class SHAPEKEY_SETS_MT_data_key_list_context_menu(Menu):
@@ -199,6 +115,13 @@ class SHAPEKEY_SETS_MT_data_key_list_context_menu(Menu):
         layout.operator(SHAPEKEY_SETS_OT_data_key_list_actions.bl_idname,
                         icon="GHOST_ENABLED", text="Delete Duplicates").action = 'DEDUPE'
 
+        layout.separator()
+        layout.operator_context = 'INVOKE_DEFAULT'
+        draw_bulk_actions(layout, SHAPEKEY_SETS_OT_data_key_list_bulk_actions)
+
+        layout.separator()
+        draw_io_actions(layout, SHAPEKEY_SETS_OT_import_keys, SHAPEKEY_SETS_OT_export_keys, 'SCENE')
+
 
 class SHAPEKEY_SETS_MT_prefs_set_list_context_menu(Menu):
     bl_label = "Set List Specials"
@@ -211,6 +134,9 @@ class SHAPEKEY_SETS_MT_prefs_set_list_context_menu(Menu):
         layout.operator(SHAPEKEY_SETS_OT_reset.bl_idname,
                         icon="RECOVER_LAST", text="Restore Defaults")
 
+        layout.separator()
+        draw_io_actions(layout, SHAPEKEY_SETS_OT_import_sets, SHAPEKEY_SETS_OT_export_sets, 'PREFS')
+
 
 class SHAPEKEY_SETS_MT_prefs_key_list_context_menu(Menu):
     bl_label = "Key List Specials"
@@ -223,10 +149,65 @@ class SHAPEKEY_SETS_MT_prefs_key_list_context_menu(Menu):
         layout.operator(SHAPEKEY_SETS_OT_prefs_key_list_actions.bl_idname,
                         icon="GHOST_ENABLED", text="Delete Duplicates").action = 'DEDUPE'
 
+        layout.separator()
+        layout.operator_context = 'INVOKE_DEFAULT'
+        draw_bulk_actions(layout, SHAPEKEY_SETS_OT_prefs_key_list_bulk_actions)
+
+        layout.separator()
+        draw_io_actions(layout, SHAPEKEY_SETS_OT_import_keys, SHAPEKEY_SETS_OT_export_keys, 'PREFS')
+
 # Rendering rules for individual set and shapekey items
 
 
-class SHAPEKEY_SETS_UL_set_list_items(UIList):
+class SHAPEKEY_SETS_UL_base_filtered_list():
+    """
+    Search and sorting for the set and key lists. Filter results are cached
+    per list and recomputed only when a set changes or the filter does, so
+    long lists don't rebuild them on every redraw. Subclasses add their own
+    filters through keep() and signature().
+    """
+    search_mode: EnumProperty(name="Search", items=search_mode_items, default='SUBSTRING')
+
+    def keep(self, context, items) -> Optional[List[bool]]:
+        """
+        Per item results of filters besides the search, None keeps all
+        """
+        return None
+
+    def signature(self, context, data) -> tuple:
+        """
+        Change counters and settings the subclass' filters depend on
+        """
+        return ()
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        key = (data.as_pointer(), propname, self.list_id)
+        signature = (generation(), len(items), self.filter_name, self.search_mode, self.use_filter_invert,
+                     self.use_filter_sort_alpha, self.use_filter_sort_reverse, *self.signature(context, data))
+
+        def compute():
+            return filter_names([item.name for item in items], self.bitflag_filter_item,
+                                compile_search(self.filter_name, self.search_mode), self.use_filter_invert,
+                                self.keep(context, items), self.use_filter_sort_alpha, self.use_filter_sort_reverse)
+        return cached_filter(key, signature, compute)
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row.prop(self, "search_mode", text="")
+        self.draw_filter_options(context, layout)
+        row = layout.row(align=True)
+        row.prop(self, "use_filter_sort_alpha", text="", icon='SORTALPHA')
+        row.prop(self, "use_filter_sort_reverse", text="",
+                 icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+
+    def draw_filter_options(self, context, layout):
+        pass
+
+
+class SHAPEKEY_SETS_UL_set_list_items(SHAPEKEY_SETS_UL_base_filtered_list, UIList):
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             row = layout.row()
@@ -236,14 +217,45 @@ class SHAPEKEY_SETS_UL_set_list_items(UIList):
             layout.label(text="", icon_value=icon)
 
 
-class SHAPEKEY_SETS_UL_key_list_items(UIList):
+class SHAPEKEY_SETS_UL_key_list_items(SHAPEKEY_SETS_UL_base_filtered_list, UIList):
+    use_filter_enabled: BoolProperty(
+        name="Enabled Only", description="Only show keys that are enabled and not excluded")
+    use_filter_missing: BoolProperty(
+        name="Missing Only", description="Only show keys the active Object's mesh doesn't have")
+
+    def keep(self, context, items) -> Optional[List[bool]]:
+        if not self.use_filter_enabled and not self.use_filter_missing:
+            return None
+        existing = set()
+        object = context.object
+        if self.use_filter_missing and object is not None and object.type == 'MESH':
+            existing = existing_key_names(object.data)
+        return [(not self.use_filter_enabled or (item.enabled and not item.exclude)) and
+                (not self.use_filter_missing or item.name not in existing) for item in items]
+
+    def signature(self, context, data) -> tuple:
+        # Key edits change the version of the set holding them rather than the generation
+        version = set_version(data.name)
+        if not self.use_filter_missing:
+            return (version, self.use_filter_enabled, False)
+        object = context.object
+        shape_keys = object.data.shape_keys if object is not None and object.type == 'MESH' else None
+        return (version, self.use_filter_enabled, True, shape_keys.as_pointer() if shape_keys is not None else 0,
+                key_version())
+
+    def draw_filter_options(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "use_filter_enabled", toggle=True)
+        row.prop(self, "use_filter_missing", toggle=True)
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             row = layout.row()
-            row.enabled = item.enabled
+            row.enabled = item.enabled and not item.exclude
 
             row.prop(item, "name", text="", emboss=False, icon='SHAPEKEY_DATA')
 
+            layout.prop(item, "exclude", text="", icon='CANCEL' if item.exclude else 'BLANK1', emboss=False)
             icon = 'CHECKBOX_HLT' if item.enabled else 'CHECKBOX_DEHLT'
             layout.prop(item, "enabled", text="", icon=icon, emboss=False)
         elif self.layout_type == 'GRID':
@@ -251,6 +263,40 @@ class SHAPEKEY_SETS_UL_key_list_items(UIList):
             layout.label(text="", icon_value=icon)
 
 
+class SHAPEKEY_SETS_UL_include_list_items(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            # Includes refer to sets of the same list, in the Scene or the prefs
+            root = item.id_data if isinstance(item.id_data, (bpy.types.Scene, bpy.types.Text)) else \
+                context.preferences.addons[__package__].preferences
+            layout.prop_search(item, "name", root, "shapekey_sets", text="", icon='LINKED')
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon_value=icon)
+
+
+class SHAPEKEY_SETS_UL_pose_list_items(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            layout.prop(item, "name", text="", emboss=False, icon='ARMATURE_DATA')
+            layout.label(text="%d keys" % len(item.values))
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon_value=icon)
+
+
+class SHAPEKEY_SETS_UL_rule_list_items(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            layout.prop(item, "enabled", text="")
+            layout.prop_search(item, "name", sets_root(context.scene), "shapekey_sets", text="", icon='SHAPEKEY_DATA')
+            layout.prop(item, "collection", text="")
+            layout.prop(item, "pattern", text="", icon='FILTER')
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon_value=icon)
+
+
 class SHAPEKEY_SETS_PT_base_ui():
     """
     Core UI for manipulating shapekey sets. Subclasses must provide access 
@@ -264,9 +310,11 @@ class SHAPEKEY_SETS_PT_base_ui():
     :param set_context_menu_class: Menu class that draw special actions for the set list
     :param key_list_actions_class: Operator class that handles key list manipulation
     :param key_context_menu_class: Menu class that draw special actions for the key list
+    :param include_list_actions_class: Operator class that handles include list manipulation
     """
 
-    def _draw(self, context, root_obj, set_list_actions_class: Type, set_context_menu_class: Type, key_list_actions_class: Type, key_context_menu_class: Type):
+    def _draw(self, context, root_obj, set_list_actions_class: Type, set_context_menu_class: Type, key_list_actions_class: Type, key_context_menu_class: Type,
+              include_list_actions_class: Type):
         layout = self.layout
 
         # Sets List
@@ -333,10 +381,50 @@ class SHAPEKEY_SETS_PT_base_ui():
                 col.operator(key_list_actions_class.bl_idname,
                              icon='TRIA_DOWN', text="").action = 'DOWN'
 
-                # Only draw the Apply button on the main UI. Not in the prefs menu
-                if (isinstance(self, Panel)):
-                    row = layout.row(align=True)
-                    row.operator(SHAPEKEY_SETS_OT_add.bl_idname)
+                active_index = active_shapekey_set.active_shapekey_index
+                if active_index < len(active_shapekey_set.shapekeys):
+                    layout.prop(active_shapekey_set.shapekeys[active_index], "aliases", icon='SYNTAX_OFF')
+
+            # Includes List
+            row = layout.row()
+            row.template_list(SHAPEKEY_SETS_UL_include_list_items.__name__, "includes_list",
+                              active_shapekey_set, "includes", active_shapekey_set, "active_include_index", rows=2)
+
+            col = row.column(align=True)
+            col.operator(include_list_actions_class.bl_idname,
+                         icon='ADD', text="").action = 'ADD'
+            col.operator(include_list_actions_class.bl_idname,
+                         icon='REMOVE', text="").action = 'REMOVE'
+
+            # The data panel resolves against every set the Scene sees, shared ones included
+            resolved = resolve_set(scene_sets(context.scene) if isinstance(self, Panel) else root_obj.shapekey_sets,
+                                   active_shapekey_set)
+            if len(active_shapekey_set.includes) > 0:
+                layout.label(text="%d keys including other sets" % len(resolved.names), icon='LINKED')
+            if resolved.cycles:
+                layout.label(text="Skipped circular includes: %s" % ", ".join(resolved.cycles), icon='ERROR')
+            if resolved.missing:
+                layout.label(text="Unknown sets: %s" % ", ".join(resolved.missing), icon='ERROR')
+
+            # Only draw the Apply button on the main UI. Not in the prefs menu
+            if len(resolved.names) > 0 and isinstance(self, Panel):
+                scene = context.scene
+                row = layout.row(align=True)
+                row.prop(scene, "shapekey_sets_source", icon='OUTLINER_OB_MESH')
+                if scene.shapekey_sets_source is not None:
+                    row.prop(scene, "shapekey_sets_transfer_mode", text="")
+                row.prop(scene, "shapekey_sets_use_mirror", text="", icon='MOD_MIRROR')
+
+                row = layout.row(align=True)
+                row.prop(scene, "shapekey_sets_scope", text="")
+                for operator_class, options in ((SHAPEKEY_SETS_OT_add, {}),
+                                                (SHAPEKEY_SETS_OT_add_modal, {"text": "", "icon": 'SORTTIME'})):
+                    props = row.operator(operator_class.bl_idname, **options)
+                    props.scope = scene.shapekey_sets_scope
+                    props.use_source_data = scene.shapekey_sets_source is not None
+                    props.transfer_mode = scene.shapekey_sets_transfer_mode
+                    props.use_mirror = scene.shapekey_sets_use_mirror
+                row.operator(SHAPEKEY_SETS_OT_sync.bl_idname, text="", icon='SORTSIZE').scope = scene.shapekey_sets_scope
 
 
 class SHAPEKEY_SETS_PT_data_ui(SHAPEKEY_SETS_PT_base_ui, Panel):
@@ -353,8 +441,287 @@ class SHAPEKEY_SETS_PT_data_ui(SHAPEKEY_SETS_PT_base_ui, Panel):
     def draw(self, context):
         # Initialize Scene state from user prefs on first draw
         if not context.scene.is_shapekey_sets_initialized:
-            bpy.app.timers.register(
-                functools.partial(initialize, context.region))
+            schedule_initialize(context.scene, context.region)
+
+        scene = context.scene
+        layout = self.layout
+        if scene.shapekey_sets_shared is not None:
+            row = layout.row(align=True)
+            row.label(text=scene.shapekey_sets_shared.name, icon='LINKED')
+            row.prop(scene, "shapekey_sets_edit_overrides", toggle=True)
+            row.operator(SHAPEKEY_SETS_OT_unshare_sets.bl_idname, text="", icon='UNLINKED')
+
+            shapekey_set = edited_set(scene)
+            if shares_sets(scene) and shapekey_set is not None:
+                if override_of(scene, shapekey_set) is not None:
+                    layout.label(text="Overridden in this Scene", icon='INFO')
+                else:
+                    layout.operator(SHAPEKEY_SETS_OT_override_set.bl_idname, icon='DUPLICATE')
+
+        self._draw(context, sets_root(scene), SHAPEKEY_SETS_OT_data_set_list_actions,
+                   SHAPEKEY_SETS_MT_data_set_list_context_menu, SHAPEKEY_SETS_OT_data_key_list_actions, SHAPEKEY_SETS_MT_data_key_list_context_menu,
+                   SHAPEKEY_SETS_OT_data_include_list_actions)
+
+
+class SHAPEKEY_SETS_PT_library_ui(Panel):
+    """
+    Browse the on-disk set library configured in the addon preferences.
+    Sets are listed from the library index, and their keys are only read
+    when a set is selected or applied.
+    """
+    bl_label = "Library"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+
+    @classmethod
+    def poll(cls, context):
+        return active_library(context) is not None
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        row = layout.row(align=True)
+        row.prop(scene, "shapekey_sets_library_set", text="")
+        row.operator(SHAPEKEY_SETS_OT_library_refresh.bl_idname,
+                     text="", icon='FILE_REFRESH')
+
+        row = layout.row(align=True)
+        row.operator(SHAPEKEY_SETS_OT_library_apply.bl_idname).scope = scene.shapekey_sets_scope
+        row.operator(SHAPEKEY_SETS_OT_library_import.bl_idname, icon='IMPORT')
+
+        layout.operator(SHAPEKEY_SETS_OT_library_save.bl_idname, icon='EXPORT')
+
+
+class SHAPEKEY_SETS_PT_debug_ui(Panel):
+    """
+    Recent operator timings, shown while instrumentation is enabled in the
+    addon preferences
+    """
+    bl_label = "Timings"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return is_enabled(context)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator(SHAPEKEY_SETS_OT_clear_timings.bl_idname, icon='TRASH')
+
+        if not history:
+            layout.label(text="Nothing recorded yet")
+
+        for entry in list(reversed(history))[:10]:
+            col = layout.box().column(align=True)
+            col.label(text="%s  %.1f ms" % (
+                entry["operator"], entry["seconds"] * 1000), icon='TIME')
+            if entry["counters"]:
+                col.label(text=", ".join("%s %d" % item for item in entry["counters"].items()))
+            if entry["message"]:
+                col.label(text=entry["message"])
+            for name, seconds in entry["slowest"]:
+                col.label(text="%s  %.1f ms" % (name, seconds * 1000), icon='OBJECT_DATA')
+
+
+class SHAPEKEY_SETS_PT_audit_ui(Panel):
+    """
+    Meshes that don't match the active Shapekey Set. Only draws cached
+    audit results, which handlers keep current as shape keys change.
+    """
+    bl_label = "Audit"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    # Rows drawn at most, the report can cover thousands of meshes
+    max_rows = 20
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        layout.operator(SHAPEKEY_SETS_OT_audit.bl_idname, icon='VIEWZOOM')
+
+        active_shapekey_set = active_set(scene)
+        if not is_audited() or active_shapekey_set is None:
+            return
+
+        failing = failing_meshes(scene_sets(scene), active_shapekey_set)
+        if not failing:
+            layout.label(text="All %d meshes match %s" % (audit_count(), active_shapekey_set.name), icon='CHECKMARK')
+            return
+
+        layout.label(text="%d of %d meshes don't match %s" % (
+            len(failing), audit_count(), active_shapekey_set.name), icon='ERROR')
+        col = layout.column(align=True)
+        for name, result in failing[:self.max_rows]:
+            row = col.box().row()
+            row.label(text=name, icon='MESH_DATA')
+            row.label(text="%d missing, %d extra, %d out of order" % (
+                len(result.missing), len(result.extra), len(result.out_of_order)))
+        if len(failing) > self.max_rows:
+            layout.label(text="and %d more" % (len(failing) - self.max_rows))
+
+
+class SHAPEKEY_SETS_PT_pose_ui(Panel):
+    """
+    Pose presets of the active Shapekey Set, stored from the active Object
+    and applied to every mesh in scope
+    """
+    bl_label = "Poses"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return edited_set(context.scene) is not None
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        active_shapekey_set = edited_set(scene)
+
+        row = layout.row()
+        row.template_list(SHAPEKEY_SETS_UL_pose_list_items.__name__, "poses_list",
+                          active_shapekey_set, "poses", active_shapekey_set, "active_pose_index", rows=3)
+
+        col = row.column(align=True)
+        col.operator_context = 'INVOKE_DEFAULT'
+        col.operator(SHAPEKEY_SETS_OT_pose_store.bl_idname, icon='ADD', text="")
+        col.operator(SHAPEKEY_SETS_OT_data_pose_list_actions.bl_idname,
+                     icon='REMOVE', text="").action = 'REMOVE'
+
+        if len(active_shapekey_set.poses) == 0:
+            return
+
+        col.separator()
+        col.operator(SHAPEKEY_SETS_OT_data_pose_list_actions.bl_idname,
+                     icon='TRIA_UP', text="").action = 'UP'
+        col.operator(SHAPEKEY_SETS_OT_data_pose_list_actions.bl_idname,
+                     icon='TRIA_DOWN', text="").action = 'DOWN'
+
+        row = layout.row(align=True)
+        row.prop_search(scene, "shapekey_sets_blend_pose", active_shapekey_set, "poses", text="", icon='ARROW_LEFTRIGHT')
+        if scene.shapekey_sets_blend_pose:
+            row.prop(scene, "shapekey_sets_blend_factor", text="")
+
+        active_pose = active_shapekey_set.poses[min(active_shapekey_set.active_pose_index,
+                                                    len(active_shapekey_set.poses) - 1)]
+        props = layout.operator(SHAPEKEY_SETS_OT_pose_apply.bl_idname, icon='POSE_HLT')
+        props.scope = scene.shapekey_sets_scope
+        props.pose = active_pose.name
+        props.blend_pose = scene.shapekey_sets_blend_pose
+        props.factor = scene.shapekey_sets_blend_factor
+
+
+class SHAPEKEY_SETS_PT_auto_apply_ui(Panel):
+    """
+    Rules that apply a Shapekey Set to new objects of a collection or with
+    matching names, such as the objects of an import
+    """
+    bl_label = "Auto Apply"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw_header(self, context):
+        self.layout.prop(context.scene, "shapekey_sets_use_auto_apply", text="")
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        layout.active = scene.shapekey_sets_use_auto_apply
+
+        row = layout.row()
+        row.template_list(SHAPEKEY_SETS_UL_rule_list_items.__name__, "auto_rules_list",
+                          scene, "shapekey_sets_auto_rules", scene, "active_shapekey_sets_auto_rule_index", rows=3)
+
+        col = row.column(align=True)
+        col.operator(SHAPEKEY_SETS_OT_data_rule_list_actions.bl_idname, icon='ADD', text="").action = 'ADD'
+        col.operator(SHAPEKEY_SETS_OT_data_rule_list_actions.bl_idname, icon='REMOVE', text="").action = 'REMOVE'
+        col.separator()
+        col.operator(SHAPEKEY_SETS_OT_data_rule_list_actions.bl_idname, icon='TRIA_UP', text="").action = 'UP'
+        col.operator(SHAPEKEY_SETS_OT_data_rule_list_actions.bl_idname, icon='TRIA_DOWN', text="").action = 'DOWN'
+
+        layout.operator(SHAPEKEY_SETS_OT_auto_apply.bl_idname, icon='FILE_REFRESH')
+
+
+class SHAPEKEY_SETS_PT_snapshot_ui(Panel):
+    """
+    Save the shape keys of the meshes in scope before applying or syncing
+    sets, and restore them without undoing everything else
+    """
+    bl_label = "Snapshots"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        layout.prop(scene, "shapekey_sets_snapshot_path", text="")
+
+        row = layout.row(align=True)
+        row.operator(SHAPEKEY_SETS_OT_snapshot_save.bl_idname, icon='FILE_TICK').scope = scene.shapekey_sets_scope
+        row.operator(SHAPEKEY_SETS_OT_snapshot_restore.bl_idname, icon='LOOP_BACK').scope = scene.shapekey_sets_scope
+
 
-        self._draw(context, context.scene, SHAPEKEY_SETS_OT_data_set_list_actions,
-                   SHAPEKEY_SETS_MT_data_set_list_context_menu, SHAPEKEY_SETS_OT_data_key_list_actions, SHAPEKEY_SETS_MT_data_key_list_context_menu)
+class SHAPEKEY_SETS_PT_drivers_ui(Panel):
+    """
+    Drive the keys of the active Shapekey Set from properties of a control
+    object, on every mesh in scope
+    """
+    bl_label = "Drivers"
+    bl_parent_id = "SHAPEKEY_SETS_PT_data_ui"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        layout.prop(scene, "shapekey_sets_driver_target", icon='OUTLINER_OB_ARMATURE')
+        layout.prop(scene, "shapekey_sets_driver_path")
+
+        props = layout.operator(SHAPEKEY_SETS_OT_wire_drivers.bl_idname, icon='DRIVER')
+        props.scope = scene.shapekey_sets_scope
+        props.data_path = scene.shapekey_sets_driver_path
+
+
+# Registered by register_ui() in __init__.py, the only place ui.py is imported
+# from besides the addon preferences' draw()
+classes = (
+    SHAPEKEY_SETS_MT_data_set_list_context_menu,
+    SHAPEKEY_SETS_MT_data_key_list_context_menu,
+    SHAPEKEY_SETS_MT_prefs_set_list_context_menu,
+    SHAPEKEY_SETS_MT_prefs_key_list_context_menu,
+    SHAPEKEY_SETS_UL_set_list_items,
+    SHAPEKEY_SETS_UL_key_list_items,
+    SHAPEKEY_SETS_UL_include_list_items,
+    SHAPEKEY_SETS_UL_pose_list_items,
+    SHAPEKEY_SETS_UL_rule_list_items,
+    SHAPEKEY_SETS_PT_data_ui,
+    SHAPEKEY_SETS_PT_library_ui,
+    SHAPEKEY_SETS_PT_debug_ui,
+    SHAPEKEY_SETS_PT_audit_ui,
+    SHAPEKEY_SETS_PT_pose_ui,
+    SHAPEKEY_SETS_PT_auto_apply_ui,
+    SHAPEKEY_SETS_PT_snapshot_ui,
+    SHAPEKEY_SETS_PT_drivers_ui,
+)
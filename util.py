@@ -1,8 +1,19 @@
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 import bpy
-from bpy.types import Region
+import functools
+import hashlib
+from bpy.app.handlers import persistent
+from bpy.types import Region, Scene
 
+from .compose import generation, invalidate_resolved, set_version
+from .pose import preset_values, store_pose
+from .storage import file_shared_sets
 
-def initialize(region: Region, force: bool = False):
+# Scenes that already have an initialization timer waiting to run
+_pending_scenes = set()
+
+
+def initialize(region: Region, force: bool = False, scene: Scene = None):
     """
     Executes once immediately after the first UI draw. This is the most
     reliable way I've found to initialize Scene state when the addon loads. 
@@ -10,17 +21,24 @@ def initialize(region: Region, force: bool = False):
 
     :param region: The region where the addon's primary UIList is located
     :param force: When True resets all addon state to user's preferences
+    :param scene: The Scene to initialize, defaults to the context's Scene
     """
-    scene = bpy.context.scene
+    scene = scene or bpy.context.scene
     prefs = bpy.context.preferences.addons[__package__].preferences
 
     if (scene.is_shapekey_sets_initialized == False or force == True):
-        scene.shapekey_sets.clear()
-        # Copy premade sets out of prefs and into the scene
-        for pref_shapekey_set in prefs.shapekey_sets:
-            shapekey_set = scene.shapekey_sets.add()
-            for k, v in pref_shapekey_set.items():
-                shapekey_set[k] = v
+        # New scenes of a file that shares its sets use them instead of a copy
+        if scene.shapekey_sets_shared is None and not force:
+            scene.shapekey_sets_shared = file_shared_sets()
+
+        if scene.shapekey_sets_shared is None:
+            # Copy premade sets out of prefs and into the scene
+            sync_sets(prefs.shapekey_sets, scene.shapekey_sets)
+        elif force:
+            # Reset the shared sets, and drop this scene's overrides of them
+            sync_sets(prefs.shapekey_sets, scene.shapekey_sets_shared.shapekey_sets)
+            scene.shapekey_sets.clear()
+        invalidate_resolved()
 
     scene.is_shapekey_sets_initialized = True
 
@@ -29,3 +47,259 @@ def initialize(region: Region, force: bool = False):
 
     # Cancels the timer
     return None
+
+
+def schedule_initialize(scene: Scene, region: Region):
+    """
+    Register the initialization timer for a Scene, unless one is already
+    waiting. Panels keep redrawing until the timer has run, and each redraw
+    would otherwise queue another full initialization.
+
+    :param scene: The Scene to initialize
+    :param region: The region where the addon's primary UIList is located
+    """
+    key = scene.as_pointer()
+    if key in _pending_scenes:
+        return
+    _pending_scenes.add(key)
+    bpy.app.timers.register(functools.partial(
+        _initialize_scheduled, key, scene.name, region))
+
+
+def _initialize_scheduled(key: int, scene_name: str, region: Region):
+    _pending_scenes.discard(key)
+    scene = bpy.data.scenes.get(scene_name)
+    if scene is not None:
+        initialize(region, scene=scene)
+    return None
+
+
+@persistent
+def clear_pending_scenes(*args):
+    """
+    Loading a file drops the initialization timers, which aren't persistent
+    since their regions and scenes belong to the old file. A scene of the
+    new file can get the pointer of one still marked as pending.
+    """
+    _pending_scenes.clear()
+
+
+# Versions and fingerprints by set pointer, valid while _fingerprints_generation is current
+_fingerprints: Dict[int, Tuple[int, str]] = {}
+_fingerprints_generation = -1
+
+
+def set_fingerprint(shapekey_set) -> str:
+    """
+    Digest of everything a ShapekeySet holds, for cheap equality checks.
+    Every edit of a set changes its compose.set_version(), from the update
+    callbacks and the operators that edit lists, so digests are kept until
+    then and comparing sets that didn't change doesn't read their keys.
+
+    :param shapekey_set: A ShapekeySet property group
+    """
+    global _fingerprints_generation
+
+    if _fingerprints_generation != generation():
+        _fingerprints.clear()
+        _fingerprints_generation = generation()
+
+    key = shapekey_set.as_pointer()
+    version = set_version(shapekey_set.name)
+    cached = _fingerprints.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    fingerprint = _digest_set(shapekey_set)
+    _fingerprints[key] = (version, fingerprint)
+    return fingerprint
+
+
+def _digest_set(shapekey_set) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(shapekey_set.name.encode())
+    for shapekey in shapekey_set.shapekeys:
+        digest.update(b"\0%s\1%d%d%s" % (shapekey.name.encode(), shapekey.enabled, shapekey.exclude,
+                                             shapekey.aliases.encode()))
+    for include in shapekey_set.includes:
+        digest.update(b"\2%s" % include.name.encode())
+    for preset in shapekey_set.poses:
+        digest.update(b"\3%s" % preset.name.encode())
+        for item in preset.values:
+            digest.update(b"\4%s\5%s" % (item.name.encode(), float(item.value).hex().encode()))
+    return digest.hexdigest()
+
+
+def sync_keys(source, target) -> int:
+    """
+    Make a key list equal another one, only writing the items that differ.
+    Returns the number of items written.
+
+    :param source: Collection of Shapekeys to copy from
+    :param target: Collection of Shapekeys to update
+    """
+    while len(target) > len(source):
+        target.remove(len(target) - 1)
+
+    written = 0
+    for index, source_key in enumerate(source):
+        target_key = target[index] if index < len(target) else target.add()
+        if (target_key.name != source_key.name or target_key.enabled != source_key.enabled
+                or target_key.exclude != source_key.exclude or target_key.aliases != source_key.aliases):
+            target_key.name = source_key.name
+            target_key.enabled = source_key.enabled
+            target_key.exclude = source_key.exclude
+            target_key.aliases = source_key.aliases
+            written += 1
+    return written
+
+
+def sync_sets(source, target) -> int:
+    """
+    Make a collection of ShapekeySets equal another one. Sets with matching
+    fingerprints are left alone, and only differing keys of the other sets
+    are written.
+    Returns the number of sets that changed.
+
+    :param source: Collection of ShapekeySets to copy from
+    :param target: Collection of ShapekeySets to update
+    """
+    while len(target) > len(source):
+        target.remove(len(target) - 1)
+
+    changed = 0
+    for index, source_set in enumerate(source):
+        if index < len(target):
+            target_set = target[index]
+            if set_fingerprint(target_set) == set_fingerprint(source_set):
+                continue
+        else:
+            target_set = target.add()
+
+        copy_set(source_set, target_set)
+        changed += 1
+
+    if changed:
+        invalidate_resolved()
+    return changed
+
+
+def copy_set(source_set, target_set):
+    """
+    Make a ShapekeySet hold the same name, keys, includes and poses as
+    another one
+
+    :param source_set: ShapekeySet to copy from
+    :param target_set: ShapekeySet to update
+    """
+    target_set.name = source_set.name
+    sync_keys(source_set.shapekeys, target_set.shapekeys)
+    target_set.includes.clear()
+    for include in source_set.includes:
+        target_set.includes.add().name = include.name
+    target_set.poses.clear()
+    for preset in source_set.poses:
+        item = target_set.poses.add()
+        item.name = preset.name
+        store_pose(item, preset_values(preset))
+    target_set.active_shapekey_index = source_set.active_shapekey_index
+
+
+# Number of removals above which rebuilding a collection beats removing items
+COMPACT_THRESHOLD = 8
+
+
+def to_python(value: Any) -> Any:
+    """
+    Convert an ID property value into plain Python data that stays valid
+    after the item it came from is removed
+    """
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "to_list"):
+        return value.to_list()
+    if isinstance(value, list):
+        return [to_python(v) for v in value]
+    return value
+
+
+def compact(collection, keep: Callable[[Any], bool]) -> List[int]:
+    """
+    Remove every item keep() rejects, through remove_indices().
+    Returns the indices of the removed items.
+
+    :param collection: A CollectionProperty of PropertyGroups
+    :param keep: Test for the items to keep
+    """
+    return remove_indices(collection, [index for index, item in enumerate(collection) if not keep(item)])
+
+
+def remove_indices(collection, indices: Iterable[int]) -> List[int]:
+    """
+    Remove the items at the given indices. Removing items one at a time
+    shifts the rest of the RNA array on every removal, which is quadratic on
+    long lists, so past a handful of removals the collection is rebuilt from
+    the kept items in a single pass instead. Kept items retain all of their
+    properties and their order.
+    Returns the removed indices, in ascending order.
+
+    :param collection: A CollectionProperty of PropertyGroups
+    :param indices: Indices of the items to remove, in any order
+    """
+    removed = sorted(set(indices))
+
+    if len(removed) <= COMPACT_THRESHOLD:
+        for index in reversed(removed):
+            collection.remove(index)
+    else:
+        skip = set(removed)
+        _rebuild(collection, [_item_values(item) for index, item in enumerate(collection) if index not in skip])
+
+    return removed
+
+
+def insert_after(collection, additions: Dict[int, List[Dict[str, Any]]]) -> int:
+    """
+    Insert new items after existing ones. Adding an item and moving it into
+    place shifts the rest of the RNA array, so past a handful of insertions
+    the collection is rebuilt in its final order in a single pass instead,
+    like remove_indices() does.
+    Returns the number of items inserted.
+
+    :param collection: A CollectionProperty of PropertyGroups
+    :param additions: Property values of the new items, by the index of the
+        existing item they follow
+    """
+    count = sum(len(rows) for rows in additions.values())
+
+    if count <= COMPACT_THRESHOLD:
+        # From the back, so the indices of earlier items stay valid
+        for index in sorted(additions, reverse=True):
+            for values in reversed(additions[index]):
+                _set_values(collection.add(), values)
+                collection.move(len(collection) - 1, index + 1)
+    else:
+        rows = []
+        for index, item in enumerate(collection):
+            rows.append(_item_values(item))
+            rows.extend(additions.get(index, ()))
+        _rebuild(collection, rows)
+
+    return count
+
+
+def _item_values(item) -> Dict[str, Any]:
+    """
+    The set properties of a collection item as plain Python data
+    """
+    return {k: to_python(item[k]) for k in item.keys()}
+
+
+def _set_values(item, values: Dict[str, Any]):
+    for k, v in values.items():
+        item[k] = v
+
+
+def _rebuild(collection, rows: List[Dict[str, Any]]):
+    collection.clear()
+    for values in rows:
+        _set_values(collection.add(), values)